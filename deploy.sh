@@ -23,13 +23,25 @@ python manage.py collectstatic --no-input
 echo "Pre-downloading PyThaiNLP models..."
 python -c "from pythainlp.word_vector import WordVector; WordVector(model_name='thai2fit_wv')"
 
+# 4b. Precompute the compound split table (skipped if already generated)
+if [ ! -f vocab_app/data/compound_splits.json ]; then
+    echo "Precomputing compound splits..."
+    python manage.py precompute_compounds
+fi
+
 # 5. Check Django deployment settings
 echo "Checking Django deployment settings..."
 python manage.py check --deploy || echo "Deployment check failed (likely missing API keys), proceeding anyway..."
 
 # 6. Start Gunicorn in the background
-echo "Starting Gunicorn..."
-gunicorn -c gunicorn.conf.py vocab_project.wsgi:application &
+# (ASGI=True: uvicorn workers and async LLM views, see gunicorn_asgi.conf.py)
+if [ "$ASGI" = "True" ]; then
+    echo "Starting Gunicorn (ASGI, uvicorn workers)..."
+    gunicorn -c gunicorn_asgi.conf.py vocab_project.asgi:application &
+else
+    echo "Starting Gunicorn..."
+    gunicorn -c gunicorn.conf.py vocab_project.wsgi:application &
+fi
 GUNICORN_PID=$!
 
 # 7. Start Nginx in the foreground
@@ -10,3 +10,21 @@ errorlog = "-"
 loglevel = "info"
 capture_output = True
 enable_stdio_inheritance = True
+
+# Load the app (and the NLP models, see when_ready) once in the master,
+# workers then share them copy-on-write instead of loading them on first request.
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master, after the app is loaded and before workers are forked
+    from vocab_app import warmup
+    server.log.info("Warming up NLP resources...")
+    warmup.preload(log=server.log.info)
+
+
+def post_fork(server, worker):
+    # HTTP connections must not be shared across processes: each worker creates its own
+    from vocab_app import llm
+    llm.reset()
+    server.log.info("Worker spawned (pid: %s) with preloaded NLP resources", worker.pid)
@@ -0,0 +1,32 @@
+# ASGI deployment (async LLM-bound views, see vocab_app/async_views.py):
+#   gunicorn -c gunicorn_asgi.conf.py vocab_project.asgi:application
+# Each uvicorn worker runs one event loop: requests waiting on the Typhoon API
+# cost a coroutine instead of a thread, so concurrency is no longer workers x threads.
+import multiprocessing
+
+bind = "unix:/tmp/gunicorn.sock"
+workers = multiprocessing.cpu_count() + 1
+worker_class = "uvicorn_worker.UvicornWorker"
+timeout = 120
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
+capture_output = True
+enable_stdio_inheritance = True
+
+# Same preload as gunicorn.conf.py: models loaded once in the master, shared copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master, after the app is loaded and before workers are forked
+    from vocab_app import warmup
+    server.log.info("Warming up NLP resources...")
+    warmup.preload(log=server.log.info)
+
+
+def post_fork(server, worker):
+    # HTTP connections must not be shared across processes: each worker creates its own
+    from vocab_app import llm
+    llm.reset()
+    server.log.info("ASGI worker spawned (pid: %s) with preloaded NLP resources", worker.pid)
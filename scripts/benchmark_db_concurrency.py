@@ -0,0 +1,155 @@
+"""
+Concurrency benchmark of the configured database backend (settings.DATABASES / DATABASE_URL).
+Runs on a throwaway database created next to it with the same settings (like the
+test runner does, e.g. test_<name> on PostgreSQL, which needs CREATEDB), never on
+the configured database itself.
+
+Replays the write-heavy mix of the app from many threads at once, like the
+gunicorn gthread workers do: AddWord-style coordinate bulk_updates over a whole
+galaxy, and quiz submissions (QuizResult insert + SRS update).
+Reports throughput, latency percentiles and "database is locked" errors.
+
+    python scripts/benchmark_db_concurrency.py --threads 16 --ops 50
+    DATABASE_URL=postgres://... python scripts/benchmark_db_concurrency.py
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import django
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vocab_project.settings')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.db import connection, connections, OperationalError
+from django.utils import timezone
+from vocab_app.models import Word, UserWordInfo, QuizResult
+
+BENCH_PREFIX = 'dbbench'
+
+
+def setup_users(n_users, n_words):
+    words = list(Word.objects.filter(thai__startswith=BENCH_PREFIX)[:n_words])
+    if len(words) < n_words:
+        Word.objects.bulk_create([
+            Word(thai=f"{BENCH_PREFIX}{i}", french=f"bench {i}") for i in range(len(words), n_words)
+        ])
+        words = list(Word.objects.filter(thai__startswith=BENCH_PREFIX)[:n_words])
+
+    users = []
+    for i in range(n_users):
+        user, created = User.objects.get_or_create(username=f"{BENCH_PREFIX}_user{i}")
+        if created or not UserWordInfo.objects.filter(user=user).exists():
+            UserWordInfo.objects.bulk_create([UserWordInfo(user=user, word=w) for w in words])
+        users.append(user)
+    return users
+
+
+def create_throwaway_database():
+    """Create and migrate the benchmark database, returns the name of the configured one."""
+    if connection.vendor == 'sqlite':
+        # A file (the test default is in memory): the benchmark measures the file locking
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+    return connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+
+def recompute_op(user):
+    """What AddWord/Delete do after the LLM call: rewrite every coordinate of the galaxy."""
+    infos = list(UserWordInfo.objects.filter(user=user))
+    for uwi in infos:
+        uwi.x, uwi.y, uwi.z = random.random(), random.random(), random.random()
+    UserWordInfo.objects.bulk_update(infos, ['x', 'y', 'z', 'cluster_id', 'cluster_label'])
+
+
+def quiz_op(user):
+    uwi = UserWordInfo.objects.filter(user=user).order_by('?').first()
+    QuizResult.objects.create(user=user, word_id=uwi.word_id, quiz_id='bench', quiz_type='fr2th', result='good')
+    uwi.srs_level += 1
+    uwi.last_review_date = timezone.now()
+    uwi.save(update_fields=['srs_level', 'last_review_date'])
+
+
+def worker(users, ops, recompute_ratio, latencies, errors, lock):
+    local_latencies = []
+    local_errors = 0
+    for _ in range(ops):
+        user = random.choice(users)
+        op = recompute_op if random.random() < recompute_ratio else quiz_op
+        start = time.perf_counter()
+        try:
+            op(user)
+            local_latencies.append(time.perf_counter() - start)
+        except OperationalError as e:
+            local_errors += 1
+            print(f"  {op.__name__} failed: {e}")
+    connections.close_all()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=50, help='Operations per thread')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--words', type=int, default=300, help='Words per benchmark galaxy')
+    parser.add_argument('--recompute-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    old_name = create_throwaway_database()
+    try:
+        benchmark(args)
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def benchmark(args):
+    db = connection.settings_dict
+    print(f"Backend: {db['ENGINE']} ({db['NAME']}), CONN_MAX_AGE={db.get('CONN_MAX_AGE')}")
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            print(f"SQLite journal_mode={cursor.fetchone()[0]}, busy timeout={db['OPTIONS'].get('timeout', 5)}s")
+
+    users = setup_users(args.users, args.words)
+    connections.close_all()
+
+    latencies, errors, lock = [], [], threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(users, args.ops, args.recompute_ratio, latencies, errors, lock))
+        for _ in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = args.threads * args.ops
+    print(f"\n{total} operations ({args.threads} threads) in {elapsed:.2f}s -> {len(latencies) / elapsed:.1f} ops/s")
+    print(
+        f"Latency p50 {percentile(latencies, 0.5) * 1000:.1f}ms, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.1f}ms, "
+        f"max {max(latencies, default=0) * 1000:.1f}ms"
+    )
+    print(f"Errors (database locked, ...): {sum(errors)}")
+
+
+if __name__ == "__main__":
+    run()
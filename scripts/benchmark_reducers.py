@@ -0,0 +1,101 @@
+"""
+Benchmark of the 3D reducer backends of services.get_3d_coordinates by
+vocabulary size: time and neighbourhood preservation (trustworthiness, cosine,
+1 = perfect) of each backend, next to the previous pipeline (UMAP, cosine
+metric, on the raw 300d vectors). Used to pick the thresholds of
+services.choose_reducer: the cheapest backend within 1% of the best quality.
+
+Trustworthiness is computed on a random subset of at most 2000 words (the full
+pairwise matrix of 20k words does not fit in memory).
+
+    python scripts/benchmark_reducers.py --sizes 10 30 100 1000 5000 20000
+    python scripts/benchmark_reducers.py --thai2fit   (real word vectors)
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import django
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vocab_project.settings')
+django.setup()
+
+from vocab_app import services
+
+QUALITY_SAMPLE = 2000
+
+
+def synthetic_vectors(n_words, dim=300, seed=0):
+    rng = np.random.default_rng(seed)
+    n_clusters = max(2, n_words // 25)
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = rng.integers(0, n_clusters, size=n_words)
+    return centers[labels] + rng.normal(scale=0.6, size=(n_words, dim))
+
+
+def thai2fit_vectors(n_words):
+    th_model = services.get_thai_model()
+    return np.array(th_model.vectors[1000:1000 + n_words])
+
+
+def previous_pipeline(vectors):
+    import umap
+    reducer = umap.UMAP(n_neighbors=15, n_components=3, min_dist=0.1, metric='cosine', random_state=42)
+    return reducer.fit_transform(vectors)
+
+
+def quality(vectors, coords):
+    from sklearn.manifold import trustworthiness
+    if len(vectors) > QUALITY_SAMPLE:
+        sample = np.random.default_rng(1).choice(len(vectors), QUALITY_SAMPLE, replace=False)
+        vectors, coords = vectors[sample], coords[sample]
+    k = min(10, len(vectors) // 2 - 1)
+    return trustworthiness(vectors, coords, n_neighbors=k, metric='cosine')
+
+
+def backends(n_words, max_previous):
+    yield 'pca', lambda v: services.get_3d_coordinates(v, method='pca')
+    if n_words > 16:
+        yield 'umap', lambda v: services.get_3d_coordinates(v, method='umap')
+    if n_words > services.LANDMARK_COUNT:
+        yield 'landmarks', lambda v: services.get_3d_coordinates(v, method='landmarks')
+    if 16 < n_words <= max_previous:
+        yield 'previous', previous_pipeline
+
+
+def run():
+    # "n_jobs overridden by setting random_state", on every fit
+    warnings.filterwarnings('ignore', category=UserWarning, module='umap')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 30, 100, 1000, 5000, 20000])
+    parser.add_argument('--max-previous', type=int, default=5000,
+                        help='Largest size also run through the previous pipeline')
+    parser.add_argument('--thai2fit', action='store_true', help='Use real thai2fit vectors')
+    args = parser.parse_args()
+
+    # JIT warm-up, so that the first timed fit does not pay numba compilation
+    warmup = synthetic_vectors(100)
+    services.get_3d_coordinates(warmup, method='umap', n_epochs=10)
+    previous_pipeline(warmup)
+
+    print(f"{'words':>7}  {'backend':<10}{'time (s)':>10}{'trust.':>9}  chosen")
+    for n_words in args.sizes:
+        vectors = thai2fit_vectors(n_words) if args.thai2fit else synthetic_vectors(n_words)
+        chosen = services.choose_reducer(n_words)
+        for name, reduce in backends(n_words, args.max_previous):
+            start = time.perf_counter()
+            coords = reduce(vectors)
+            elapsed = time.perf_counter() - start
+            marker = '*' if name == chosen else ''
+            print(f"{n_words:>7}  {name:<10}{elapsed:>10.2f}{quality(vectors, coords):>9.4f}  {marker}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,129 @@
+"""
+Parity check and benchmark of the fast galaxy/quiz serialization path
+(serializers.serialize_user_words + renderers.FastJSONRenderer) against
+UserWordInfoSerializer + DRF's JSONRenderer.
+
+Parity: for every galaxy size, both paths must produce the same data and the
+same decoded JSON. Exits with status 1 on any difference.
+
+    python scripts/benchmark_serializers.py --sizes 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+import django
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vocab_project.settings')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from vocab_app.models import Word, UserWordInfo
+from vocab_app.renderers import FastJSONRenderer, orjson
+from vocab_app.serializers import UserWordInfoSerializer, serialize_user_words
+
+BENCH_PREFIX = 'serbench'
+
+
+def setup_galaxy(n_words):
+    """A benchmark user with n_words words carrying realistic flashcard_infos."""
+    user, _ = User.objects.get_or_create(username=f"{BENCH_PREFIX}_{n_words}")
+    if UserWordInfo.objects.filter(user=user).count() == n_words:
+        return user
+    UserWordInfo.objects.filter(user=user).delete()
+
+    words = Word.objects.get_or_create_many(
+        (f"{BENCH_PREFIX}คำ{i}", f"mot {i}") for i in range(n_words)
+    )
+    rng = random.Random(n_words)
+    now = timezone.now()
+    infos = []
+    for i, word in enumerate(words.values()):
+        infos.append(UserWordInfo(
+            user=user, word=word,
+            x=rng.uniform(-1, 1), y=rng.uniform(-1, 1), z=rng.uniform(-1, 1),
+            cluster_id=rng.randint(1, 12), cluster_label=f"Cluster {rng.randint(1, 12)}",
+            flashcard_infos={
+                "romanization": f"kham {i}",
+                "word_type": rng.choice(["noun", "verb", "adjective"]),
+                "thai_sentence": "ฉันดื่มน้ำทุกวัน",
+                "french_sentence": "Je bois de l'eau tous les jours",
+                "sentence_romanization": "chan duem nam thuk wan",
+                "sub_words": [["ฉัน", "chan"], ["ดื่ม", "duem"], ["น้ำ", "nam"]],
+                "components": [["น้ำ"], ["eau"]],
+            },
+            is_favorite=rng.random() < 0.1,
+            srs_level=rng.randint(0, 8),
+            tags=["bench"] if i % 3 == 0 else [],
+            last_review_date=now - timedelta(minutes=rng.randint(0, 100000)) if i % 2 else None,
+        ))
+    UserWordInfo.objects.bulk_create(infos, batch_size=1000)
+    return user
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3, help='Best of N runs')
+    parser.add_argument('--keep', action='store_true', help='Keep the benchmark users')
+    args = parser.parse_args()
+
+    print(f"orjson: {'installed' if orjson else 'not installed (DRF encoder fallback)'}\n")
+    print(f"{'words':>7}  {'path':<6}{'query+serialize':>17}{'render':>9}{'total':>9}  parity")
+    failed = False
+    for n_words in args.sizes:
+        user = setup_galaxy(n_words)
+
+        drf_data, drf_serialize = timed(
+            lambda: UserWordInfoSerializer(
+                UserWordInfo.objects.filter(user=user).select_related('word'), many=True
+            ).data, args.repeat
+        )
+        drf_json, drf_render = timed(lambda: JSONRenderer().render(drf_data), args.repeat)
+
+        fast_data, fast_serialize = timed(
+            lambda: serialize_user_words(UserWordInfo.objects.filter(user=user)), args.repeat
+        )
+        fast_json, fast_render = timed(lambda: FastJSONRenderer().render(fast_data), args.repeat)
+
+        same_data = json.loads(json.dumps(drf_data)) == fast_data
+        same_json = json.loads(drf_json) == json.loads(fast_json)
+        parity = 'ok' if same_data and same_json else f'DIFFERENT (data {same_data}, json {same_json})'
+        failed |= not (same_data and same_json)
+
+        for name, serialize, render in (
+            ('drf', drf_serialize, drf_render), ('fast', fast_serialize, fast_render)
+        ):
+            print(
+                f"{n_words:>7}  {name:<6}{serialize * 1000:>15.1f}ms{render * 1000:>7.1f}ms"
+                f"{(serialize + render) * 1000:>7.1f}ms  {parity if name == 'fast' else ''}"
+            )
+        speedup = (drf_serialize + drf_render) / (fast_serialize + fast_render)
+        print(f"{'':>9}x{speedup:.1f} faster\n")
+
+    if not args.keep:
+        User.objects.filter(username__startswith=f"{BENCH_PREFIX}_").delete()
+        Word.objects.filter(thai__startswith=BENCH_PREFIX).delete()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,111 @@
+"""
+Benchmark of warm-started UMAP refits (services.get_optimized_3d_coordinates
+with `previous`) against cold starts (spectral init).
+
+Scenario: a galaxy laid out once, then a few words are added and the galaxy is
+refitted. For several epoch budgets it reports, for cold and warm refits:
+- the time of the refit,
+- the trustworthiness of the 3D layout (neighbourhood preservation, 1 = perfect),
+- how far the existing words moved on the sphere (layout stability).
+"Epochs to converge" is the smallest budget reaching 99% of the trustworthiness
+of a full cold fit.
+
+    python scripts/benchmark_umap_warm_start.py --words 300 --added 5
+    python scripts/benchmark_umap_warm_start.py --thai2fit   (real word vectors)
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import django
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vocab_project.settings')
+django.setup()
+
+from vocab_app import services
+
+EPOCH_BUDGETS = [5, 25, 50, 100, 200, 500]
+
+
+def synthetic_vectors(n_words, dim=300, n_clusters=12, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = rng.integers(0, n_clusters, size=n_words)
+    return centers[labels] + rng.normal(scale=0.6, size=(n_words, dim))
+
+
+def thai2fit_vectors(n_words):
+    th_model = services.get_thai_model()
+    return np.array(th_model.vectors[1000:1000 + n_words])
+
+
+def sphere(coords):
+    centered = coords - coords.mean(axis=0)
+    return centered / np.linalg.norm(centered, axis=1, keepdims=True)
+
+
+def refit(vectors, previous, warm, n_epochs):
+    """One refit, as get_optimized_3d_coordinates does it (without the slow repulsion step)."""
+    init = services.seed_positions(vectors, previous) if warm else None
+    learning_rate = services.WARM_START_LEARNING_RATE if warm else 1.0
+    start = time.perf_counter()
+    raw = services.get_3d_coordinates(vectors, init=init, n_epochs=n_epochs, learning_rate=learning_rate)
+    coords = services.align_to_previous(sphere(raw), previous)
+    return coords, time.perf_counter() - start
+
+
+def run():
+    from sklearn.manifold import trustworthiness
+    # "n_jobs overridden by setting random_state", on every fit
+    warnings.filterwarnings('ignore', category=UserWarning, module='umap')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--added', type=int, default=5, help='Words added before the refit')
+    parser.add_argument('--thai2fit', action='store_true', help='Use real thai2fit vectors')
+    args = parser.parse_args()
+
+    vectors = thai2fit_vectors(args.words) if args.thai2fit else synthetic_vectors(args.words)
+    n_old = args.words - args.added
+
+    # JIT warm-up, so that the first timed fit does not pay numba compilation
+    services.get_3d_coordinates(vectors[:50], n_epochs=10)
+
+    print(f"Layout of the first {n_old} words (cold, default epochs)...")
+    previous = np.zeros((args.words, 3))
+    previous[:n_old] = services.get_optimized_3d_coordinates(vectors[:n_old])
+
+    reference, reference_time = refit(vectors, previous, warm=False, n_epochs=None)
+    target = 0.99 * trustworthiness(vectors, reference, n_neighbors=10, metric='cosine')
+    print(f"Full cold refit: {reference_time:.2f}s, trustworthiness target {target:.4f}\n")
+
+    print(f"{'mode':<6}{'epochs':>8}{'time (s)':>10}{'trust.':>9}{'moved':>9}")
+    converged = {}
+    for warm in (False, True):
+        mode = 'warm' if warm else 'cold'
+        for n_epochs in EPOCH_BUDGETS:
+            coords, elapsed = refit(vectors, previous, warm, n_epochs)
+            trust = trustworthiness(vectors, coords, n_neighbors=10, metric='cosine')
+            # Mean distance travelled on the unit sphere by the words already placed
+            moved = np.linalg.norm(coords[:n_old] - previous[:n_old], axis=1).mean()
+            print(f"{mode:<6}{n_epochs:>8}{elapsed:>10.2f}{trust:>9.4f}{moved:>9.3f}")
+            if trust >= target and mode not in converged:
+                converged[mode] = (n_epochs, elapsed)
+
+    print()
+    for mode in ('cold', 'warm'):
+        if mode in converged:
+            n_epochs, elapsed = converged[mode]
+            print(f"{mode}: converged in {n_epochs} epochs ({elapsed:.2f}s)")
+        else:
+            print(f"{mode}: did not reach the target within {EPOCH_BUDGETS[-1]} epochs")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Word, UserWordInfo, QuizResult
+from .models import Word, UserWordInfo, QuizResult, QuizDailyStat, WordComponent, WordNeighbour, UserGalaxy, ClusterTree
 
 @admin.register(Word)
 class WordAdmin(admin.ModelAdmin):
@@ -9,7 +9,7 @@ class WordAdmin(admin.ModelAdmin):
 @admin.register(UserWordInfo)
 class UserWordInfoAdmin(admin.ModelAdmin):
     list_display = ('user', 'word_thai', 'word_french', 'srs_level', 'next_review_date', 'last_review_date', 'add_date', 'is_favorite')
-    list_filter = ('user', 'is_favorite', 'srs_level', 'cluster_label', 'add_date', 'last_review_date')
+    list_filter = ('user', 'is_favorite', 'srs_level', 'cluster_label', 'word_type', 'add_date', 'last_review_date')
     search_fields = ('word__thai', 'word__french', 'user__username', 'cluster_label')
     date_hierarchy = 'add_date'
     ordering = ('-add_date',)
@@ -35,3 +35,33 @@ class QuizResultAdmin(admin.ModelAdmin):
         return obj.word.thai
     word_thai.short_description = 'Word'
     word_thai.admin_order_field = 'word__thai'
+
+@admin.register(QuizDailyStat)
+class QuizDailyStatAdmin(admin.ModelAdmin):
+    list_display = ('user', 'day', 'quiz_type', 'cluster_label', 'reviews', 'fail', 'hard', 'good', 'easy')
+    list_filter = ('user', 'quiz_type')
+    search_fields = ('user__username', 'cluster_label')
+    date_hierarchy = 'day'
+
+@admin.register(WordComponent)
+class WordComponentAdmin(admin.ModelAdmin):
+    list_display = ('text', 'translation', 'user_word', 'user', 'position')
+    list_filter = ('user',)
+    search_fields = ('text', 'translation', 'user_word__word__thai')
+
+@admin.register(WordNeighbour)
+class WordNeighbourAdmin(admin.ModelAdmin):
+    list_display = ('user_word', 'neighbour', 'rank', 'user')
+    list_filter = ('user',)
+    search_fields = ('user_word__word__thai',)
+
+@admin.register(UserGalaxy)
+class UserGalaxyAdmin(admin.ModelAdmin):
+    list_display = ('user', 'uses_shared_seed', 'layout_version', 'recomputed_at', 'created_at')
+    list_filter = ('uses_shared_seed',)
+    search_fields = ('user__username',)
+
+@admin.register(ClusterTree)
+class ClusterTreeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'version', 'updated_at')
+    search_fields = ('user__username',)
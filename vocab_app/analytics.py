@@ -0,0 +1,104 @@
+"""
+Learning analytics served from the daily rollups (models.QuizDailyStat).
+
+Every quiz submission increments its (user, day, quiz type, cluster) rollup row,
+so the statistics read at most a few rows per day of the period and never scan
+the raw QuizResult log (which compact_quiz_results archives and trims).
+The due forecast reads UserWordInfo.next_review_date through its (user,
+next_review_date) index, over the forecast window only.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import QuizDailyStat, UserWordInfo
+
+RESULTS = ('fail', 'hard', 'good', 'easy')
+FORECAST_DAYS = 14
+MAX_DAYS = 365
+
+
+def record_review(user, quiz_type, result, user_word=None, at=None):
+    """Count one quiz answer in its daily rollup (user_word: the UserWordInfo reviewed, for its cluster)."""
+    if result not in RESULTS:
+        return
+    key = {
+        'user': user,
+        'day': timezone.localdate(at),
+        'quiz_type': quiz_type,
+        'cluster_label': (user_word.cluster_label or '') if user_word is not None else '',
+    }
+    increments = {'reviews': F('reviews') + 1, result: F(result) + 1}
+    if QuizDailyStat.objects.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            QuizDailyStat.objects.create(**key, reviews=1, **{result: 1})
+    except IntegrityError:
+        # Created concurrently by another submission of the same day
+        QuizDailyStat.objects.filter(**key).update(**increments)
+
+
+def _summary(row):
+    reviews = row['total_reviews'] or 0
+    return {
+        'reviews': reviews,
+        'accuracy': round((reviews - (row['total_fail'] or 0)) / reviews, 4) if reviews else None,
+        'results': {result: row[f'total_{result}'] or 0 for result in RESULTS},
+    }
+
+
+def _due_forecast(user, today):
+    """Words never reviewed, overdue, and due on each of the next FORECAST_DAYS days."""
+    start = timezone.make_aware(datetime.combine(today, time.min))
+    end = start + timedelta(days=FORECAST_DAYS)
+    words = UserWordInfo.objects.filter(user=user)
+    due = dict(
+        words.filter(next_review_date__gte=start, next_review_date__lt=end)
+        .annotate(day=TruncDate('next_review_date'))
+        .values('day').annotate(n=Count('id'))
+        .values_list('day', 'n')
+    )
+    return {
+        'new': words.filter(next_review_date__isnull=True).count(),
+        'overdue': words.filter(next_review_date__lt=start).count(),
+        'days': [
+            {'day': day.isoformat(), 'due': due.get(day, 0)}
+            for day in (today + timedelta(days=i) for i in range(FORECAST_DAYS))
+        ],
+    }
+
+
+def get_analytics(user, days=30):
+    """
+    Statistics of the last `days` days: totals, daily reviews, accuracy by quiz
+    type and by cluster, and the due forecast.
+    """
+    days = max(1, min(int(days), MAX_DAYS))
+    today = timezone.localdate()
+    stats = QuizDailyStat.objects.filter(user=user, day__gt=today - timedelta(days=days))
+    sums = {f'total_{field}': Sum(field) for field in ('reviews',) + RESULTS}
+
+    daily = {row['day']: _summary(row) for row in stats.values('day').annotate(**sums)}
+    by_quiz_type = [
+        {'quiz_type': row['quiz_type'], **_summary(row)}
+        for row in stats.values('quiz_type').annotate(**sums).order_by('-total_reviews')
+    ]
+    by_cluster = [
+        {'cluster_label': row['cluster_label'], **_summary(row)}
+        for row in stats.values('cluster_label').annotate(**sums).order_by('-total_reviews')
+    ]
+    return {
+        'days': days,
+        'totals': _summary(stats.aggregate(**sums)),
+        'daily': [
+            {'day': day.isoformat(), **daily[day]}
+            for day in sorted(daily)
+        ],
+        'by_quiz_type': by_quiz_type,
+        'by_cluster': by_cluster,
+        'due_forecast': _due_forecast(user, today),
+    }
@@ -8,12 +8,13 @@ class VocabAppConfig(AppConfig):
     def ready(self):
         import os
         from . import signals  # Import signals
+        from . import middleware  # Query budget wrapper on every new DB connection
         
         # Only load in the main process (avoids double-load with runserver --reload)
+        # (gunicorn preloads in its master process instead, see gunicorn.conf.py)
         if os.environ.get('RUN_MAIN') == 'true':
-            from . import services
+            from . import warmup
             print("🔄 Pre-loading Thai models at startup...")
-            services.get_thai_model()
-            services.get_thai_word_set()
+            warmup.preload()
             print("✅ Thai models loaded!")
 
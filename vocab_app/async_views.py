@@ -0,0 +1,241 @@
+"""
+Async versions of the LLM-bound endpoints (preview, add, their streaming
+variants, suggestions), served under ASGI (vocab_project/asgi.py,
+gunicorn_asgi.conf.py) in place of the DRF views of views.py. A request waiting on the Typhoon API only holds a coroutine,
+not a worker thread; the ORM is reached through sync_to_async.
+Same URLs, payloads and responses as the sync views.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.http import JsonResponse
+from django.views import View
+
+from .models import Word, UserWordInfo, normalize_thai
+from .serializers import UserWordInfoSerializer
+from . import services, guest_seed
+from .views import _recompute_coordinates, sse_event, sse_response
+
+
+def _error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _detail(message, status):
+    """The errors DRF raises itself (authentication, parsing) come as {"detail": ...}."""
+    return JsonResponse({"detail": message}, status=status)
+
+
+# Content types of DRF's default parsers
+_FORM_CONTENT_TYPES = ('application/x-www-form-urlencoded', 'multipart/form-data')
+
+
+def _read_data(request):
+    """
+    (data, error response) of the request body, parsed as DRF's default parsers
+    do: JSON or a form; an empty body is no data.
+    """
+    if not request.body:
+        return {}, None
+    if request.content_type in _FORM_CONTENT_TYPES:
+        return request.POST.dict(), None
+    if request.content_type != 'application/json':
+        return None, _detail(f'Unsupported media type "{request.content_type}" in request.', 415)
+    try:
+        return json.loads(request.body), None
+    except ValueError as e:
+        return None, _detail(f"JSON parse error - {e}", 400)
+
+
+class AsyncLLMView(View):
+    """Requires an authenticated user (the async counterpart of IsAuthenticated)."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return _detail("Authentication credentials were not provided.", 403)
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncPreviewWordView(AsyncLLMView):
+    """Generate flashcard info for review WITHOUT saving to DB."""
+
+    async def post(self, request):
+        data, error = _read_data(request)
+        if error is not None:
+            return error
+        thai = data.get('thai')
+        french = data.get('french')
+        sentence = data.get('sentence', '')
+
+        if not thai or not french:
+            return _error("Thai and French words are required.", 400)
+
+        try:
+            flashcard_infos = await services.aget_flashcard_infos(thai, french, sentence)
+        except Exception as e:
+            print(f"Error generating flashcard info: {e}")
+            flashcard_infos = {}
+
+        return JsonResponse(flashcard_infos, status=200)
+
+
+@sync_to_async
+def _existing_user_word(user, thai, french):
+    guest_seed.ensure_own_galaxy(user)
+    word = Word.objects.get_or_create_one(thai, french)
+    existing = UserWordInfo.objects.filter(user=user, word=word).select_related('word').first()
+    return word, (UserWordInfoSerializer(existing).data if existing else None)
+
+
+class AsyncAddWordView(AsyncLLMView):
+
+    async def post(self, request):
+        data, error = _read_data(request)
+        if error is not None:
+            return error
+        thai = data.get('thai')
+        french = data.get('french')
+        sentence = data.get('sentence', '')
+
+        # Only spaces or invisible characters: nothing to store
+        if not normalize_thai(thai) or not french:
+            return _error("Thai and French words are required.", 400)
+
+        word, existing = await _existing_user_word(request.user, thai, french)
+        if existing is not None:
+            return JsonResponse(existing, status=200)
+
+        # Use pre-reviewed flashcard_infos if provided, otherwise generate
+        flashcard_infos = data.get('flashcard_infos')
+        if not flashcard_infos:
+            try:
+                flashcard_infos = await services.aget_flashcard_infos(thai, french, sentence)
+            except Exception as e:
+                print(f"Error generating flashcard info: {e}")
+                flashcard_infos = {}
+
+        user_word, saved, was_created = await _save_user_word(request.user, word, flashcard_infos)
+        if not was_created:
+            return JsonResponse(saved, status=200)
+        created = await _place_user_word(request.user, user_word)
+        return JsonResponse(created, status=201)
+
+
+class AsyncPreviewWordStreamView(AsyncLLMView):
+    """Async PreviewWordStreamView (server-sent events)."""
+
+    async def post(self, request):
+        data, error = _read_data(request)
+        if error is not None:
+            return error
+        thai = data.get('thai')
+        french = data.get('french')
+        sentence = data.get('sentence', '')
+
+        if not thai or not french:
+            return _error("Thai and French words are required.", 400)
+
+        async def events():
+            try:
+                async for step, fields in services.astream_flashcard_infos(thai, french, sentence):
+                    yield sse_event(step, fields)
+            except Exception as e:
+                print(f"Error generating flashcard info: {e}")
+                yield sse_event("error", {"error": "Failed to generate info"})
+
+        return sse_response(events())
+
+
+@sync_to_async
+def _save_user_word(user, word, flashcard_infos):
+    """(user_word, serialized, created): the row a concurrent request stored, if any."""
+    user_word, created = UserWordInfo.objects.get_or_create(
+        user=user, word=word, defaults={'flashcard_infos': flashcard_infos}
+    )
+    return user_word, UserWordInfoSerializer(user_word).data, created
+
+
+@sync_to_async(thread_sensitive=False)
+def _place_user_word(user, user_word):
+    """
+    Update Coordinates & Clusters for the whole user universe. Seconds of CPU: run
+    on a thread of its own, not on the worker's single thread-sensitive thread that
+    every other sync_to_async ORM call of the process waits on.
+    """
+    try:
+        _recompute_coordinates(user)
+        user_word.refresh_from_db()
+        return UserWordInfoSerializer(user_word).data
+    finally:
+        # The request cycle only closes the connections of its own thread
+        connections.close_all()
+
+
+class AsyncAddWordStreamView(AsyncLLMView):
+    """Async AddWordStreamView (server-sent events)."""
+
+    async def post(self, request):
+        data, error = _read_data(request)
+        if error is not None:
+            return error
+        thai = data.get('thai')
+        french = data.get('french')
+        sentence = data.get('sentence', '')
+        flashcard_infos = data.get('flashcard_infos')
+
+        # Only spaces or invisible characters: nothing to store
+        if not normalize_thai(thai) or not french:
+            return _error("Thai and French words are required.", 400)
+
+        user = request.user
+        word, existing = await _existing_user_word(user, thai, french)
+
+        async def events():
+            nonlocal flashcard_infos
+            if existing is not None:
+                yield sse_event("done", existing)
+                return
+
+            if not flashcard_infos:
+                flashcard_infos = {}
+                try:
+                    async for step, fields in services.astream_flashcard_infos(thai, french, sentence):
+                        if step == "done":
+                            flashcard_infos = fields
+                        else:
+                            yield sse_event(step, fields)
+                except Exception as e:
+                    print(f"Error generating flashcard info: {e}")
+
+            user_word, saved, created = await _save_user_word(user, word, flashcard_infos)
+            if not created:
+                yield sse_event("done", saved)
+                return
+            yield sse_event("saved", saved)
+
+            placed = await _place_user_word(user, user_word)
+            yield sse_event("placed", placed)
+            yield sse_event("done", placed)
+
+        return sse_response(events())
+
+
+@sync_to_async
+def _user_vocabulary(user, cluster):
+    if guest_seed.uses_shared_seed(user):
+        return guest_seed.seed_vocabulary(cluster)
+    user_words_qs = UserWordInfo.objects.filter(user=user)
+    if cluster != 'all':
+        user_words_qs = user_words_qs.filter(cluster_id=cluster)
+    return list(user_words_qs.values_list('word__thai', flat=True))
+
+
+class AsyncWordSuggestionView(AsyncLLMView):
+
+    async def get(self, request):
+        vocabulary = await _user_vocabulary(request.user, request.GET.get('cluster', 'all'))
+        suggestions = await services.asuggest_new_words(vocabulary)
+        return JsonResponse(suggestions, safe=False)
@@ -0,0 +1,137 @@
+"""
+Persisted cluster hierarchy of each galaxy (models.ClusterTree).
+
+Every recompute saves the ward linkage tree of services.hierarchical_clustering
+under a new version. Any granularity (number of clusters) is then a cut of that
+tree: no clustering, only an fcluster over the cached linkage matrix.
+A cluster of any cut is a node of the tree, so its label is resolved (LLM) the
+first time that node is shown, and kept for every later cut containing it.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.db import transaction
+
+from .models import ClusterTree, UserWordInfo
+
+# Parsed trees, {user_id: (version, word_ids, Z)}
+_TREES = OrderedDict()
+_TREES_SIZE = 256
+_TREES_LOCK = threading.Lock()
+
+
+def save_tree(user, tree, word_to_id):
+    """
+    Store the tree returned by services.hierarchical_clustering.
+    word_to_id: maps the Thai words of the tree leaves to their UserWordInfo ids.
+    """
+    if tree is None:
+        ClusterTree.objects.filter(user=user).delete()
+        return
+    words, Z, node_labels = tree
+    with transaction.atomic():
+        cluster_tree, _ = ClusterTree.objects.select_for_update().get_or_create(user=user)
+        cluster_tree.version += 1
+        cluster_tree.word_ids = [word_to_id[w] for w in words]
+        cluster_tree.linkage = np.asarray(Z).tolist()
+        cluster_tree.node_labels = {str(node): label for node, label in node_labels.items()}
+        cluster_tree.save()
+
+
+def _load(user):
+    """(version, word_ids, Z) of the user's tree, parsed once per version, None if there is none."""
+    version = ClusterTree.objects.filter(user=user).values_list('version', flat=True).first()
+    if version is None:
+        return None
+    with _TREES_LOCK:
+        cached = _TREES.get(user.pk)
+        if cached is not None and cached[0] == version:
+            _TREES.move_to_end(user.pk)
+            return cached
+
+    row = ClusterTree.objects.filter(user=user).values('version', 'word_ids', 'linkage').first()
+    if row is None:
+        return None
+    loaded = (row['version'], row['word_ids'], np.array(row['linkage'], dtype=float))
+    with _TREES_LOCK:
+        _TREES[user.pk] = loaded
+        _TREES.move_to_end(user.pk)
+        if len(_TREES) > _TREES_SIZE:
+            _TREES.popitem(last=False)
+    return loaded
+
+
+def cut(Z, n_clusters):
+    """
+    Cut the tree into (at most) n_clusters clusters.
+    Returns (leaf cluster assignment, {cluster: tree node}).
+    """
+    from scipy.cluster.hierarchy import fcluster, leaders
+    assignment = fcluster(Z, t=n_clusters, criterion='maxclust')
+    nodes, cluster_ids = leaders(Z, assignment)
+    return assignment, {int(c): int(node) for node, c in zip(nodes, cluster_ids)}
+
+
+def _resolve_labels(user, version, members):
+    """Labels of the given tree nodes ({node: word ids}), asking the LLM only for the nodes never named."""
+    from . import services
+    known = ClusterTree.objects.filter(user=user).values_list('node_labels', flat=True).first() or {}
+    labels = {node: known[str(node)] for node in members if str(node) in known}
+    missing_ids = {node: ids for node, ids in members.items() if node not in labels}
+    if not missing_ids:
+        return labels
+
+    thai_by_id = dict(
+        UserWordInfo.objects
+        .filter(user=user, id__in=[i for ids in missing_ids.values() for i in ids])
+        .values_list('id', 'word__thai')
+    )
+    missing = {node: [thai_by_id[i] for i in ids if i in thai_by_id] for node, ids in missing_ids.items()}
+
+    # One LLM call per new node, concurrently (bounded by the llm gateway semaphore)
+    with ThreadPoolExecutor(max_workers=min(8, len(missing))) as pool:
+        for node, label in zip(missing, pool.map(services.get_cluster_label, missing.values())):
+            labels[node] = label
+
+    with transaction.atomic():
+        cluster_tree = ClusterTree.objects.select_for_update().filter(user=user).first()
+        # Only for the tree they were computed on: a recompute may have replaced it meanwhile
+        if cluster_tree is not None and cluster_tree.version == version:
+            cluster_tree.node_labels.update({str(node): labels[node] for node in missing})
+            cluster_tree.save(update_fields=['node_labels'])
+    return labels
+
+
+def get_clusters(user, n_clusters, with_labels=True):
+    """
+    The galaxy cut into n_clusters clusters: {"version", "n_clusters", "max_clusters",
+    "clusters": [{"id" (tree node), "label", "size", "word_ids"}]}, largest first.
+    None if the user has no tree yet.
+    """
+    loaded = _load(user)
+    if loaded is None:
+        return None
+    version, word_ids, Z = loaded
+    n_words = len(word_ids)
+    n_clusters = max(1, min(int(n_clusters), n_words))
+
+    assignment, cluster_nodes = cut(Z, n_clusters)
+    members = {}
+    for word_id, cluster_id in zip(word_ids, assignment):
+        members.setdefault(cluster_nodes[int(cluster_id)], []).append(word_id)
+
+    labels = _resolve_labels(user, version, members) if with_labels else {}
+
+    clusters = [
+        {"id": node, "label": labels.get(node), "size": len(ids), "word_ids": ids}
+        for node, ids in members.items()
+    ]
+    clusters.sort(key=lambda c: -c["size"])
+    return {
+        "version": version,
+        "n_clusters": len(clusters),
+        "max_clusters": n_words,
+        "clusters": clusters,
+    }
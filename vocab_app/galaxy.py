@@ -0,0 +1,138 @@
+"""
+Full recompute of a user's galaxy: layout, clusters and cluster tree, quiz
+neighbour table (models.WordNeighbour).
+
+Split into `compute` (reads the words, returns a picklable result) and `save`
+(writes it in bulk, word vectors looked up by `compute` included), so that
+recompute_galaxies can compute in worker processes and write from the parent. Every write goes through RECOMPUTES, the per-user
+coalescer also used by the AddWord/Delete recomputes: a batch result is dropped
+if a request-time recompute started after it was computed.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import services, cluster_tree, single_flight
+from .models import Word, UserWordInfo, UserGalaxy, WordNeighbour
+
+# Bump when a change to the layout/clustering code or parameters should reach the
+# existing galaxies: recompute_galaxies processes the older versions first
+LAYOUT_VERSION = 1
+
+# Overlapping AddWord/Delete requests of a user recompute the galaxy once, see single_flight.py
+RECOMPUTES = single_flight.Coalescer('recompute')
+
+
+def compute(user_id):
+    """
+    The recomputed galaxy of a user, None if fewer than 3 of their words have a vector:
+    {"started", "ids", "coords", "clusters": [(cluster_id, label)], "tree",
+    "word_to_id", "neighbours", "vectors"}, lists in the order of "ids", "vectors"
+    being the {word_id: vector} looked up in the model, not saved yet.
+    """
+    started = time.time()
+    user_infos = list(UserWordInfo.objects.filter(user_id=user_id).select_related('word'))
+
+    valid_infos = []
+    vectors = []
+    word_to_vector_map = {}
+    new_vectors = {}
+    for uwi in user_infos:
+        stored = bool(uwi.word.vector)
+        vec = services.get_word_vector(uwi.word, save=False)
+        if vec is not None:
+            if not stored:
+                new_vectors[uwi.word_id] = [float(v) for v in vec]
+            valid_infos.append(uwi)
+            vectors.append(vec)
+            word_to_vector_map[uwi.word.thai] = vec
+
+    if len(vectors) <= 2:
+        return None
+
+    optimized_coords = services.get_optimized_3d_coordinates(
+        vectors, previous=[(u.x, u.y, u.z) for u in valid_infos]
+    )
+    word_to_cluster, cluster_labels, tree = services.hierarchical_clustering(
+        [u.word.thai for u in valid_infos],
+        existing_vectors=word_to_vector_map
+    )
+
+    clusters = []
+    for uwi in valid_infos:
+        c_id = word_to_cluster.get(uwi.word.thai)
+        if c_id:
+            clusters.append((c_id, cluster_labels.get(c_id, "General")))
+        else:
+            clusters.append((uwi.cluster_id, uwi.cluster_label))
+
+    return {
+        "started": started,
+        "ids": [u.id for u in valid_infos],
+        "coords": [tuple(float(c) for c in coords[:3]) for coords in optimized_coords],
+        "clusters": clusters,
+        "tree": tree,
+        "word_to_id": {u.word.thai: u.id for u in valid_infos},
+        "neighbours": services.nearest_neighbours(vectors, services.QUIZ_NEIGHBOURS),
+        "vectors": new_vectors,
+    }
+
+
+def save(user_id, result):
+    """Write a result of `compute` (words deleted since are skipped) and mark the galaxy up to date."""
+    with transaction.atomic():
+        Word.objects.bulk_update(
+            [Word(id=word_id, vector=vector) for word_id, vector in result["vectors"].items()],
+            ['vector'], batch_size=500
+        )
+        by_id = UserWordInfo.objects.filter(user_id=user_id, id__in=result["ids"]).in_bulk()
+        user_words = [by_id.get(uwi_id) for uwi_id in result["ids"]]
+        for uwi, (x, y, z), (c_id, label) in zip(user_words, result["coords"], result["clusters"]):
+            if uwi is not None:
+                uwi.x, uwi.y, uwi.z = x, y, z
+                uwi.cluster_id, uwi.cluster_label = c_id, label
+        UserWordInfo.objects.bulk_update(
+            list(by_id.values()), ['x', 'y', 'z', 'cluster_id', 'cluster_label'], batch_size=500
+        )
+
+        user = User(pk=user_id)
+        cluster_tree.save_tree(user, result["tree"], result["word_to_id"])
+
+        # Re-index the neighbours over the words still there
+        kept = [i for i, uwi in enumerate(user_words) if uwi is not None]
+        position = {i: n for n, i in enumerate(kept)}
+        WordNeighbour.replace_for(user, [user_words[i] for i in kept], [
+            [position[j] for j in result["neighbours"][i] if j in position] for i in kept
+        ])
+
+        UserGalaxy.objects.update_or_create(
+            user_id=user_id,
+            defaults={'recomputed_at': timezone.now(), 'layout_version': LAYOUT_VERSION},
+        )
+
+
+def recompute(user):
+    """
+    Recalculate the coordinates, clusters and quiz neighbours of all of a user's words.
+    Skipped when a recompute of the same user started after this call was made:
+    it already includes every change made before this call.
+    """
+    def run():
+        try:
+            result = compute(user.pk)
+            if result is not None:
+                save(user.pk, result)
+        except Exception as e:
+            print(f"Error recomputing coordinates: {e}")
+
+    RECOMPUTES.run(user.pk, run)
+
+
+def save_if_current(user_id, result):
+    """
+    Write a result computed earlier (recompute_galaxies), unless a recompute of
+    the user started since it was computed. Returns True if it was written.
+    """
+    return RECOMPUTES.run(user_id, lambda: save(user_id, result), since=result["started"])
@@ -0,0 +1,144 @@
+"""
+Guest seed galaxy (static/vocab_app/data/guest_galaxy.json).
+
+The seed is parsed once per process and shared by the guest map, the signup copy
+and the copy-on-write of users on the shared seed (settings.GUEST_SEED_SHARED).
+"""
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Word, UserWordInfo, WordComponent, WordNeighbour, UserGalaxy
+
+GUEST_GALAXY_PATH = os.path.join(
+    settings.BASE_DIR, 'vocab_app', 'static', 'vocab_app', 'data', 'guest_galaxy.json'
+)
+
+GUEST_MANIFEST_PATH = os.path.join(os.path.dirname(GUEST_GALAXY_PATH), 'guest_galaxy.manifest.json')
+
+_SEED = None
+_MANIFEST = None
+_SEED_LOCK = threading.Lock()
+
+
+def get_guest_seed():
+    """The parsed guest galaxy (read-only, do not mutate), [] if there is none."""
+    global _SEED
+    if _SEED is None:
+        with _SEED_LOCK:
+            if _SEED is None:
+                if os.path.exists(GUEST_GALAXY_PATH):
+                    with open(GUEST_GALAXY_PATH, 'r', encoding='utf-8') as f:
+                        _SEED = json.load(f)
+                else:
+                    _SEED = []
+    return _SEED
+
+
+def get_guest_manifest():
+    """
+    File names of the content-hashed guest artifacts written by export_guest_galaxy
+    ({'full': ..., 'geometry': ...}), {} if it was never run.
+    """
+    global _MANIFEST
+    if _MANIFEST is None:
+        if os.path.exists(GUEST_MANIFEST_PATH):
+            with open(GUEST_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                _MANIFEST = json.load(f)
+        else:
+            _MANIFEST = {}
+    return _MANIFEST
+
+
+def copy_seed_to(user):
+    """Give `user` their own copy of the seed galaxy, with fresh SRS progress."""
+    seed = get_guest_seed()
+    if not seed:
+        return
+
+    words = Word.objects.get_or_create_many((item['word']['thai'], item['word']['french']) for item in seed)
+
+    user_infos = []
+    for item in seed:
+        # Preserve coordinates but RESET progress
+        uwi = UserWordInfo(
+            user=user,
+            word=words[item['word']['thai']],
+            x=item['x'],
+            y=item['y'],
+            z=item['z'],
+            cluster_id=item['cluster_id'],
+            cluster_label=item['cluster_label'],
+            flashcard_infos=item['flashcard_infos'],
+            is_favorite=False,
+            srs_level=0,
+            next_review_date=None,
+            last_review_date=None,
+            tags=item.get('tags', [])
+        )
+        uwi.sync_search_fields()
+        user_infos.append(uwi)
+
+    UserWordInfo.objects.bulk_create(user_infos, ignore_conflicts=True)
+    # bulk_create bypasses save(): index the components explicitly
+    WordComponent.sync_for(UserWordInfo.objects.filter(user=user))
+
+    # Quiz distractors, from the vectors already stored (no model load at signup)
+    with_vectors = [
+        uwi for uwi in UserWordInfo.objects.filter(user=user).select_related('word')
+        if uwi.word.vector
+    ]
+    if with_vectors:
+        WordNeighbour.rebuild_for(user, with_vectors, [uwi.word.vector for uwi in with_vectors])
+
+
+def uses_shared_seed(user):
+    return UserGalaxy.objects.filter(user=user, uses_shared_seed=True).exists()
+
+
+def ensure_own_galaxy(user):
+    """
+    Copy-on-write: materialize the seed for a user still on the shared galaxy,
+    before their first change. Returns True if the copy happened in this call.
+    """
+    with transaction.atomic():
+        # The UPDATE claims the copy: concurrent requests wait on it and then see False
+        claimed = UserGalaxy.objects.filter(user=user, uses_shared_seed=True).update(uses_shared_seed=False)
+        if claimed:
+            copy_seed_to(user)
+    return bool(claimed)
+
+
+def seed_word_thai(seed_id):
+    """Thai word of the seed entry with id `seed_id` (ids the shared galaxy was served with)."""
+    for item in get_guest_seed():
+        if item.get('id') == seed_id:
+            return item['word']['thai']
+    return None
+
+
+def seed_word_thai_for_word(word_id):
+    """Thai word of the seed entry whose Word id (as served with the shared galaxy) is `word_id`."""
+    for item in get_guest_seed():
+        if item['word'].get('id') == word_id:
+            return item['word']['thai']
+    return None
+
+
+def seed_vocabulary(cluster='all'):
+    """Thai words of the seed galaxy (of one of its clusters): the vocabulary of a user on the shared seed."""
+    return [
+        item['word']['thai'] for item in get_guest_seed()
+        if cluster == 'all' or str(item.get('cluster_id')) == str(cluster)
+    ]
+
+
+def seed_quiz_words(count):
+    """
+    Words to quiz a user on the shared seed with, without copying it: every seed
+    word is new to them (the copy resets the progress), taken in seed order.
+    """
+    return get_guest_seed()[:count]
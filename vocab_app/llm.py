@@ -0,0 +1,252 @@
+"""
+Gateway to the Typhoon LLM API (OpenAI compatible).
+
+Every LLM call of the app goes through `chat()` (sync, gthread workers) or
+`achat()` (async views). Both share the same guards so that a slow or failing
+upstream cannot tie up the workers:
+- pooled keep-alive HTTP connections, one client per process (per event loop for async),
+- a bounded number of concurrent requests per process,
+- a timeout per request, retries with jittered exponential backoff,
+- a circuit breaker that fails fast while the upstream is down.
+Failures raise `LLMError`, the callers in services.py fall back to their defaults.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+
+BASE_URL = "https://api.opentyphoon.ai/v1"
+MODEL = "typhoon-v2.5-30b-a3b-instruct"
+
+REQUEST_TIMEOUT = float(os.environ.get("TYPHOON_TIMEOUT", 20))
+MAX_RETRIES = int(os.environ.get("TYPHOON_MAX_RETRIES", 2))
+MAX_CONCURRENCY = int(os.environ.get("TYPHOON_MAX_CONCURRENCY", 8))
+# How long a call may wait for a free concurrency slot before giving up
+QUEUE_TIMEOUT = float(os.environ.get("TYPHOON_QUEUE_TIMEOUT", 10))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+MAX_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30
+
+
+class LLMError(Exception):
+    """The LLM call failed (after retries) or was refused by the guards."""
+
+
+class CircuitOpenError(LLMError):
+    """The circuit breaker is open: the call was not even attempted."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. Then a single trial call is let through (half-open):
+    success closes the circuit, failure opens it again. A trial ending without
+    an outcome (cancelled) is released by `end_call`, leaving the circuit open.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def before_call(self):
+        """Returns a token to pass to `end_call`: the trial call's, or None."""
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial is not None:
+                raise CircuitOpenError("Typhoon API circuit is open")
+            self._trial = object()
+            return self._trial
+
+    def end_call(self, token):
+        """Release the trial slot of a call that ended without recording an outcome."""
+        with self._lock:
+            if token is not None and self._trial is token:
+                self._trial = None
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial = None
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"Typhoon API circuit opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get("TYPHOON_BREAKER_THRESHOLD", 5)),
+    reset_timeout=float(os.environ.get("TYPHOON_BREAKER_RESET", 30)),
+)
+
+# Per-process state, reset after fork (see gunicorn.conf.py)
+_CLIENT = None
+_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENCY)
+# Async clients and semaphores are bound to an event loop
+_ASYNC_STATE = weakref.WeakKeyDictionary()
+
+
+def _http_limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client():
+    """Return the sync client of this process, created on first use."""
+    import httpx
+    from openai import OpenAI
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = OpenAI(
+            api_key=os.environ.get("TYPHOON_API_KEY"),
+            base_url=BASE_URL,
+            timeout=REQUEST_TIMEOUT,
+            max_retries=0,  # Retries are handled here, with the circuit breaker
+            http_client=httpx.Client(limits=_http_limits(), timeout=REQUEST_TIMEOUT),
+        )
+    return _CLIENT
+
+
+def _get_async_state():
+    import httpx
+    from openai import AsyncOpenAI
+    loop = asyncio.get_running_loop()
+    state = _ASYNC_STATE.get(loop)
+    if state is None:
+        client = AsyncOpenAI(
+            api_key=os.environ.get("TYPHOON_API_KEY"),
+            base_url=BASE_URL,
+            timeout=REQUEST_TIMEOUT,
+            max_retries=0,
+            http_client=httpx.AsyncClient(limits=_http_limits(), timeout=REQUEST_TIMEOUT),
+        )
+        state = (client, asyncio.Semaphore(MAX_CONCURRENCY))
+        _ASYNC_STATE[loop] = state
+    return state
+
+
+def reset():
+    """Drop the per-process state. Called in each worker after fork."""
+    global _CLIENT, _SLOTS
+    _CLIENT = None
+    _SLOTS = threading.BoundedSemaphore(MAX_CONCURRENCY)
+    _ASYNC_STATE.clear()
+
+
+def _is_retryable(exc):
+    import openai
+    return isinstance(exc, (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    ))
+
+
+def _backoff(attempt):
+    # "Full jitter" exponential backoff
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _request_kwargs(messages, temperature, response_format):
+    kwargs = {"model": MODEL, "messages": messages, "temperature": temperature}
+    if response_format:
+        kwargs["response_format"] = response_format
+    return kwargs
+
+
+def chat(messages, temperature=0, response_format=None):
+    """Send a chat completion request and return the message content."""
+    if not _SLOTS.acquire(timeout=QUEUE_TIMEOUT):
+        raise LLMError("Too many concurrent Typhoon API calls")
+    trial = None
+    try:
+        trial = breaker.before_call()
+        kwargs = _request_kwargs(messages, temperature, response_format)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = get_client().chat.completions.create(**kwargs)
+                breaker.record_success()
+                return response.choices[0].message.content
+            except Exception as e:
+                if not _is_retryable(e):
+                    # The upstream answered (e.g. a 4xx): it is not down
+                    breaker.record_success()
+                    raise LLMError(str(e)) from e
+                if attempt == MAX_RETRIES:
+                    breaker.record_failure()
+                    raise LLMError(f"Typhoon API unavailable: {e}") from e
+                time.sleep(_backoff(attempt))
+    finally:
+        breaker.end_call(trial)
+        _SLOTS.release()
+
+
+async def _acquire_slot(slots):
+    """
+    Take an async concurrency slot, waiting at most QUEUE_TIMEOUT.
+    Not asyncio.wait_for: before Python 3.12 it can time out after the
+    semaphore was acquired, leaking the slot.
+    """
+    task = asyncio.ensure_future(slots.acquire())
+    try:
+        await asyncio.wait({task}, timeout=QUEUE_TIMEOUT)
+    except BaseException:
+        if task.done() and not task.cancelled():
+            slots.release()
+        else:
+            task.cancel()
+        raise
+    if not task.done():
+        # A cancelled Semaphore.acquire() gives back a slot it was just handed
+        task.cancel()
+        raise LLMError("Too many concurrent Typhoon API calls")
+
+
+async def achat(messages, temperature=0, response_format=None):
+    """Async version of `chat()`."""
+    client, slots = _get_async_state()
+    await _acquire_slot(slots)
+    trial = None
+    try:
+        trial = breaker.before_call()
+        kwargs = _request_kwargs(messages, temperature, response_format)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = await client.chat.completions.create(**kwargs)
+                breaker.record_success()
+                return response.choices[0].message.content
+            except Exception as e:
+                if not _is_retryable(e):
+                    # The upstream answered (e.g. a 4xx): it is not down
+                    breaker.record_success()
+                    raise LLMError(str(e)) from e
+                if attempt == MAX_RETRIES:
+                    breaker.record_failure()
+                    raise LLMError(f"Typhoon API unavailable: {e}") from e
+                await asyncio.sleep(_backoff(attempt))
+    finally:
+        # Also on cancellation (client disconnect): the trial must not stay taken
+        breaker.end_call(trial)
+        slots.release()
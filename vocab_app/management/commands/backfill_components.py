@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from vocab_app.models import UserWordInfo, WordComponent
+
+class Command(BaseCommand):
+    help = 'Rebuilds the WordComponent index from the components stored in flashcard_infos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        user_words = UserWordInfo.objects.only('id', 'user_id', 'flashcard_infos').order_by('id')
+        total = user_words.count()
+        self.stdout.write(f"Indexing components of {total} user words...")
+
+        batch = []
+        for i, uwi in enumerate(user_words.iterator(chunk_size=batch_size)):
+            batch.append(uwi)
+            if len(batch) >= batch_size:
+                WordComponent.sync_for(batch)
+                batch = []
+                self.stdout.write(f"Processed {i+1}/{total}...")
+
+        if batch:
+            WordComponent.sync_for(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully indexed {WordComponent.objects.count()} components."
+        ))
@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from vocab_app.models import QuizResult
+
+ARCHIVE_DIR = os.path.join(settings.BASE_DIR, 'vocab_app', 'data', 'quiz_archive')
+
+
+class Command(BaseCommand):
+    help = (
+        'Archives (gzipped JSON lines) and deletes the raw QuizResult rows older than --days. '
+        'The statistics come from the daily rollups (QuizDailyStat), which keep them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=180, help='Raw results kept, in days')
+        parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+        parser.add_argument('--no-archive', action='store_true', help='Delete without archiving')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows to compact')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        old_results = QuizResult.objects.filter(review_date__lt=cutoff)
+        total = old_results.count()
+        if options['dry_run'] or not total:
+            self.stdout.write(self.style.SUCCESS(f"{total} quiz results older than {cutoff:%Y-%m-%d} to compact."))
+            return
+
+        archive = None
+        if not options['no_archive']:
+            os.makedirs(options['archive_dir'], exist_ok=True)
+            path = os.path.join(
+                options['archive_dir'],
+                f"quiz_results-before-{cutoff:%Y%m%d}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz"
+            )
+            archive = gzip.open(path, 'wt', encoding='utf-8')
+
+        done = 0
+        last_id = 0
+        try:
+            while True:
+                # Keyset pagination: each batch is archived, then deleted
+                batch = list(
+                    old_results.filter(id__gt=last_id).order_by('id')
+                    .values('id', 'user_id', 'word_id', 'quiz_id', 'quiz_type', 'result', 'review_date', thai=F('word__thai'))
+                    [:options['batch_size']]
+                )
+                if not batch:
+                    break
+                if archive is not None:
+                    for row in batch:
+                        row['review_date'] = row['review_date'].isoformat()
+                        archive.write(json.dumps(row, ensure_ascii=False) + '\n')
+                    archive.flush()
+                last_id = batch[-1]['id']
+                QuizResult.objects.filter(id__in=[row['id'] for row in batch]).delete()
+                done += len(batch)
+                self.stdout.write(f"Compacted {done}/{total}...")
+        finally:
+            if archive is not None:
+                archive.close()
+
+        if archive is not None:
+            self.stdout.write(self.style.SUCCESS(f"Archived and deleted {done} quiz results into {path}."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {done} quiz results."))
@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from vocab_app.models import Word, UserWordInfo, QuizResult, normalize_thai
+
+
+def _progress(uwi):
+    return (uwi.srs_level, uwi.last_review_date.timestamp() if uwi.last_review_date else 0)
+
+
+def merge_duplicate_words(Word, UserWordInfo, QuizResult, dry_run=False, log=print):
+    """
+    Merge the Word rows sharing the same normalized Thai text into the oldest one
+    and store every Word.thai normalized.
+    UserWordInfo and QuizResult rows are re-pointed to the kept word; when a user
+    had several of the duplicates, the copy with the most SRS progress is kept.
+    Returns the number of duplicate words merged.
+    """
+    ids_by_key = defaultdict(list)
+    for word_id, thai in Word.objects.order_by('id').values_list('id', 'thai').iterator():
+        ids_by_key[normalize_thai(thai)].append((word_id, thai))
+
+    merged = 0
+    for key, rows in ids_by_key.items():
+        keeper_id = rows[0][0]
+        duplicate_ids = [word_id for word_id, _ in rows[1:]]
+        if not duplicate_ids:
+            if rows[0][1] != key and not dry_run:
+                Word.objects.filter(id=keeper_id).update(thai=key)
+            continue
+
+        log(f"{key}: merging words {duplicate_ids} into {keeper_id}")
+        merged += len(duplicate_ids)
+        if dry_run:
+            continue
+
+        with transaction.atomic():
+            keeper = Word.objects.get(id=keeper_id)
+            kept_by_user = {uwi.user_id: uwi for uwi in UserWordInfo.objects.filter(word_id=keeper_id)}
+            for uwi in UserWordInfo.objects.filter(word_id__in=duplicate_ids).order_by('id'):
+                current = kept_by_user.get(uwi.user_id)
+                if current is None:
+                    uwi.word_id = keeper_id
+                    uwi.save(update_fields=['word'])
+                    kept_by_user[uwi.user_id] = uwi
+                elif _progress(uwi) > _progress(current):
+                    current.delete()
+                    uwi.word_id = keeper_id
+                    uwi.save(update_fields=['word'])
+                    kept_by_user[uwi.user_id] = uwi
+                else:
+                    uwi.delete()
+
+            QuizResult.objects.filter(word_id__in=duplicate_ids).update(word_id=keeper_id)
+
+            for duplicate in Word.objects.filter(id__in=duplicate_ids):
+                if not keeper.vector and duplicate.vector:
+                    keeper.vector = duplicate.vector
+                if not keeper.french and duplicate.french:
+                    keeper.french = duplicate.french
+            Word.objects.filter(id__in=duplicate_ids).delete()
+            Word.objects.filter(id=keeper_id).update(thai=key, french=keeper.french, vector=keeper.vector)
+    return merged
+
+
+class Command(BaseCommand):
+    help = 'Merges the Word rows duplicating the same (normalized) Thai word and normalizes Word.thai'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the duplicates')
+
+    def handle(self, *args, **options):
+        merged = merge_duplicate_words(
+            Word, UserWordInfo, QuizResult, dry_run=options['dry_run'], log=self.stdout.write
+        )
+        verb = 'Found' if options['dry_run'] else 'Merged'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {merged} duplicate words."))
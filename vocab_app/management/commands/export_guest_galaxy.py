@@ -1,36 +1,142 @@
+import glob
+import gzip
+import hashlib
 import json
 import os
-from django.core.management.base import BaseCommand
-from django.conf import settings
-from vocab_app.models import UserWordInfo, Word
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db.models import Count
+from vocab_app.models import UserWordInfo
 from vocab_app.serializers import UserWordInfoSerializer
+from vocab_app import guest_seed
+
+# Fields kept in the geometry-only variant (enough to draw and label the galaxy)
+GEOMETRY_FIELDS = ['id', 'word', 'x', 'y', 'z', 'cluster_id', 'cluster_label']
+
+
+def representative_sample(coords, cluster_ids, count):
+    """
+    Pick `count` well-spread points: first the most central word of each cluster
+    (largest clusters first) so that every cluster is represented, then
+    farthest-point sampling over the coordinates to fill the gaps.
+    Returns the selected indices, in selection order.
+    """
+    n = len(coords)
+    if n <= count:
+        return list(range(n))
+
+    coords = np.asarray(coords, dtype=float)
+    cluster_ids = np.asarray(cluster_ids)
+
+    selected = []
+    clusters, sizes = np.unique(cluster_ids, return_counts=True)
+    for cluster in clusters[np.argsort(-sizes, kind='stable')][:count]:
+        members = np.flatnonzero(cluster_ids == cluster)
+        centroid = coords[members].mean(axis=0)
+        selected.append(int(members[np.argmin(np.linalg.norm(coords[members] - centroid, axis=1))]))
+
+    # Distance of every point to its closest selected point
+    min_dist = np.full(n, np.inf)
+    for i in selected:
+        min_dist = np.minimum(min_dist, np.linalg.norm(coords - coords[i], axis=1))
+
+    while len(selected) < count:
+        i = int(np.argmax(min_dist))
+        selected.append(i)
+        min_dist = np.minimum(min_dist, np.linalg.norm(coords - coords[i], axis=1))
+
+    return selected
+
 
 class Command(BaseCommand):
-    help = 'Exports a subset of UserWordInfo to a static JSON for guests.'
+    help = (
+        'Exports a representative sample of a user\'s galaxy as the static guest galaxy: '
+        'guest_galaxy.json (the seed of new users) plus content-hashed, minified and '
+        'precompressed full and geometry-only artifacts for guests (brotli needs the '
+        '"brotli" package).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=str, help='Username to export from (default: the user with the most words)')
+        parser.add_argument('--count', type=int, default=100, help='Number of words in the guest galaxy')
+        parser.add_argument('--output-dir', type=str, default=os.path.dirname(guest_seed.GUEST_GALAXY_PATH))
 
     def handle(self, *args, **options):
-        # We need to pick a user's collection to export. 
-        # For a "seed" file, we can either take calculations from a specific admin user 
-        # or just take the first 100 UserWordInfo objects if they are representative.
-        # Alternatively, if we want high quality, we might want to run UMAP on the first 100 Words.
-        
-        # Let's take the first UserWordInfo objects found in the DB (assuming they are already optimized)
-        # Or better: Pick the most populated user's collection.
-        
-        target_user_info = UserWordInfo.objects.all().select_related('word')[:100]
-        
-        if not target_user_info:
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist.")
+        else:
+            user = (
+                User.objects.annotate(n_words=Count('userwordinfo'))
+                .filter(n_words__gt=0).order_by('-n_words').first()
+            )
+
+        if user is None:
             self.stdout.write(self.style.WARNING("No UserWordInfo found in database. Exporting empty list."))
             data = []
         else:
-            serializer = UserWordInfoSerializer(target_user_info, many=True)
-            data = serializer.data
+            user_words = list(UserWordInfo.objects.filter(user=user).select_related('word').order_by('id'))
+            selected = representative_sample(
+                [(uwi.x, uwi.y, uwi.z) for uwi in user_words],
+                [uwi.cluster_id for uwi in user_words],
+                options['count']
+            )
+            sample = sorted((user_words[i] for i in selected), key=lambda uwi: uwi.id)
+            data = UserWordInfoSerializer(sample, many=True).data
+            clusters = len({uwi.cluster_id for uwi in sample})
+            self.stdout.write(f"Sampled {len(sample)}/{len(user_words)} words of '{user.username}' across {clusters} clusters")
 
-        output_dir = os.path.join(settings.BASE_DIR, 'vocab_app', 'static', 'vocab_app', 'data')
+        output_dir = options['output_dir']
         os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, 'guest_galaxy.json')
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        full = self.dump(data)
+        geometry = self.dump([{field: item[field] for field in GEOMETRY_FIELDS} for item in data])
+
+        # Stable name: the seed read by guest_seed.py
+        with open(os.path.join(output_dir, 'guest_galaxy.json'), 'wb') as f:
+            f.write(full)
+
+        # Remove the artifacts of previous exports before writing the new ones
+        for pattern in ('guest_galaxy.*.json*', 'guest_geometry.*.json*'):
+            for path in glob.glob(os.path.join(output_dir, pattern)):
+                os.remove(path)
+
+        manifest = {
+            "count": len(data),
+            "full": self.write_artifact(output_dir, 'guest_galaxy', full),
+            "geometry": self.write_artifact(output_dir, 'guest_geometry', geometry),
+        }
+        with open(os.path.join(output_dir, 'guest_galaxy.manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=4)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully exported {len(data)} words to {output_dir} "
+            f"(full: {manifest['full']}, geometry: {manifest['geometry']})"
+        ))
+
+    def dump(self, data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def write_artifact(self, output_dir, name, content):
+        """Write `content` as <name>.<hash>.json plus its .gz/.br siblings. Returns the file name."""
+        filename = f"{name}.{hashlib.sha256(content).hexdigest()[:12]}.json"
+        path = os.path.join(output_dir, filename)
+
+        with open(path, 'wb') as f:
+            f.write(content)
+        compressed = {'gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        try:
+            import brotli
+            compressed['br'] = brotli.compress(content, quality=11)
+        except ImportError:
+            self.stdout.write(self.style.WARNING("brotli not installed, skipping the .br artifact"))
+        for ext, blob in compressed.items():
+            with open(f"{path}.{ext}", 'wb') as f:
+                f.write(blob)
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully exported {len(data)} words to {output_path}'))
+        sizes = ", ".join(f"{ext} {len(blob) / 1024:.1f} KB" for ext, blob in compressed.items())
+        self.stdout.write(f"  {filename}: {len(content) / 1024:.1f} KB ({sizes})")
+        return filename
@@ -1,25 +1,64 @@
 
-from django.core.management.base import BaseCommand
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
-from vocab_app.models import Word, UserWordInfo
-from vocab_app import services
-import pandas as pd
-import numpy as np
+from vocab_app.models import Word, UserWordInfo, WordComponent, WordNeighbour
+from vocab_app import services, nlp_cache, cluster_tree
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+
 
 class Command(BaseCommand):
-    help = 'Populates the database with initial 100 words and sentences'
+    help = (
+        'Populates the database with initial 100 words and sentences (or a CSV seed file), '
+        'enriching them in parallel batches. Progress is checkpointed: reruns skip completed words.'
+    )
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-file', type=str, help='CSV with thai,french[,sentence] columns (with a header row)')
+        parser.add_argument('--user', type=str, default='admin', help='Owner of the populated galaxy')
+        parser.add_argument('--workers', type=int, default=4, help='Batches enriched concurrently')
+        parser.add_argument('--batch-size', type=int, default=services.BATCH_SIZE)
+        parser.add_argument('--checkpoint', type=str, help='Progress file (default: data/populate_checkpoint_<user>.json)')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and enrich every word again')
+
+    def handle(self, *args, **options):
         # 1. Create Superuser
-        user, created = User.objects.get_or_create(username='admin')
+        user, created = User.objects.get_or_create(username=options['user'])
         if created:
             user.set_password('password')
             user.save()
-            self.stdout.write(self.style.SUCCESS('Superuser "admin" created'))
+            self.stdout.write(self.style.SUCCESS(f'Superuser "{user.username}" created'))
         else:
-            self.stdout.write('Superuser "admin" already exists')
+            self.stdout.write(f'Superuser "{user.username}" already exists')
 
         # 2. Define Data
+        if options['seed_file']:
+            entries = self.read_seed_file(options['seed_file'])
+        else:
+            entries = self.default_entries()
+
+        self.populate(user, entries, options)
+
+    def read_seed_file(self, path):
+        """(thai, french, sentence) entries of a CSV seed file, deduplicated on thai."""
+        if not os.path.exists(path):
+            raise CommandError(f"Seed file '{path}' does not exist.")
+        entries = {}
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                thai = (row.get('thai') or '').strip()
+                french = (row.get('french') or '').strip()
+                if thai and french and thai not in entries:
+                    entries[thai] = (thai, french, (row.get('sentence') or '').strip())
+        self.stdout.write(f'Read {len(entries)} words from {path}')
+        return list(entries.values())
+
+    def default_entries(self):
         words_data = {
             "thai": [
                 "ฉัน","คุณ","เขา","เธอ","เรา","พวกเรา","พวกเขา","นี่","นั่น","ที่นี่",
@@ -70,69 +109,155 @@ class Command(BaseCommand):
             "Où sont les toilettes ?", "Excusez-moi.", "Merci pour tout.", "Bonjour.", "Au revoir, à bientôt."
         ]
 
+        return [
+            (thai, french, fr_sentences[i] if i < len(fr_sentences) else "")
+            for i, (thai, french) in enumerate(zip(words_data['thai'], words_data['french']))
+        ]
+
+    def populate(self, user, entries, options):
         # 3. Iterate and Populate
         self.stdout.write('Starting population... (This may take a while using LLM)')
-        
-        # Load models once
-        th_model = services.get_thai_model()
 
-        for i in range(len(words_data['thai'])):
-            thai_word = words_data['thai'][i]
-            french_word = words_data['french'][i]
-            sentence = fr_sentences[i] if i < len(fr_sentences) else ""
+        # Words and UserWordInfos of the whole seed in a few queries
+        words = Word.objects.get_or_create_many((thai, french) for thai, french, _ in entries)
+        user_words = {uwi.word_id: uwi for uwi in UserWordInfo.objects.filter(user=user)}
+        # Keyed by word: two spellings of the same word give one UserWordInfo
+        missing = {
+            words[thai].id: UserWordInfo(user=user, word=words[thai])
+            for thai, _, _ in entries if words[thai].id not in user_words
+        }
+        if missing:
+            UserWordInfo.objects.bulk_create(missing.values())
+            user_words = {uwi.word_id: uwi for uwi in UserWordInfo.objects.filter(user=user)}
 
-            # Create or Update Word
-            word_obj, created = Word.objects.get_or_create(
-                thai=thai_word, 
-                defaults={'french': french_word}
-            )
+        checkpoint_path = options['checkpoint'] or os.path.join(CHECKPOINT_DIR, f'populate_checkpoint_{user.username}.json')
+        completed = set() if options['restart'] else self.load_checkpoint(checkpoint_path, user)
+
+        to_refresh = []
+        for entry in entries:
+            uwi = user_words[words[entry[0]].id]
+            # Missing flashcard data (e.g. french_sentence) and not done by a previous run.
+            # A row without any flashcard data is enriched even if checkpointed (e.g. recreated since)
+            done_before = entry[0] in completed and uwi.flashcard_infos
+            if options['restart'] or ('french_sentence' not in uwi.flashcard_infos and not done_before):
+                to_refresh.append((uwi, entry))
+        skipped = len(entries) - len(to_refresh)
+        if skipped:
+            self.stdout.write(f'Skipping {skipped} words already enriched')
 
-            # Get or Create UserWordInfo
-            uwi, uwi_created = UserWordInfo.objects.get_or_create(user=user, word=word_obj)
-            
-            # If newly created OR missing flashcard data (e.g. french_sentence)
-            if uwi_created or 'french_sentence' not in uwi.flashcard_infos:
-                self.stdout.write(f'Refreshing info for: {thai_word}')
+        # Generate the flashcards by batches (one LLM request per step for the whole batch),
+        # several batches in flight; the DB writes stay on this thread
+        batches = [to_refresh[i:i + options['batch_size']] for i in range(0, len(to_refresh), options['batch_size'])]
+        done = 0
+        failed = 0
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {
+                pool.submit(services.get_flashcard_infos_batch, [entry for _, entry in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
                 try:
-                    uwi.flashcard_infos = services.get_flashcard_infos(thai_word, french_word, sentence)
-                    uwi.save()
+                    infos = future.result()
                 except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'Error generating info for {thai_word}: {e}'))
+                    failed += len(batch)
+                    self.stdout.write(self.style.ERROR(f'Error generating info for batch starting at {batch[0][1][0]}: {e}'))
+                    continue
+
+                for (uwi, _), flashcard_infos in zip(batch, infos):
+                    uwi.flashcard_infos = flashcard_infos
+                    uwi.sync_search_fields()
+                UserWordInfo.objects.bulk_update(
+                    [uwi for uwi, _ in batch], ['flashcard_infos', 'word_type', 'romanization']
+                )
+                WordComponent.sync_for([uwi for uwi, _ in batch])
+
+                completed.update(entry[0] for _, entry in batch)
+                self.save_checkpoint(checkpoint_path, user, completed)
+
+                done += len(batch)
+                elapsed = time.perf_counter() - start_time
+                rate = done / elapsed * 60 if elapsed else 0
+                remaining = len(to_refresh) - done - failed
+                eta = f", ETA {remaining / rate:.1f} min" if rate and remaining else ""
+                self.stdout.write(
+                    f'[{done + failed}/{len(to_refresh)}] {", ".join(entry[0] for _, entry in batch)} '
+                    f'({rate:.1f} words/min{eta})'
+                )
+
+        if to_refresh:
+            elapsed = time.perf_counter() - start_time
+            self.stdout.write(self.style.SUCCESS(
+                f'Enriched {done} words in {elapsed:.1f}s ({done / elapsed * 60 if elapsed else 0:.1f} words/min), {failed} failed'
+            ))
 
         # 4. Update Coordinates & Clusters
         self.stdout.write('Updating 3D Map (Normalized) and Clusters...')
+        th_model = services.get_thai_model()
         all_user_infos = UserWordInfo.objects.filter(user=user).select_related('word')
-        valid_infos = []
-        vectors = []
+        valid_infos = [uwi for uwi in all_user_infos if uwi.word.thai in th_model.key_to_index]
 
-        for uwi in all_user_infos:
-            w_text = uwi.word.thai
-            if w_text in th_model.key_to_index:
-                valid_infos.append(uwi)
-                vectors.append(th_model.get_vector(w_text))
+        if len(valid_infos) > 2:
+            # One vector matrix for both the layout and the clustering
+            vectors = th_model[[uwi.word.thai for uwi in valid_infos]]
 
-        if len(vectors) > 2:
             # Optimized: UMAP -> Normalization -> Spacing Optimization
-            optimized_coords = services.get_optimized_3d_coordinates(vectors)
-            
-            word_to_cluster, cluster_labels = services.auto_clustering([u.word.thai for u in valid_infos])
+            optimized_coords = services.get_optimized_3d_coordinates(
+                vectors, previous=[(uwi.x, uwi.y, uwi.z) for uwi in valid_infos]
+            )
+
+            word_to_cluster, cluster_labels, tree = services.hierarchical_clustering(
+                [u.word.thai for u in valid_infos],
+                existing_vectors={uwi.word.thai: vec for uwi, vec in zip(valid_infos, vectors)}
+            )
 
             to_update = []
             for i, uwi in enumerate(valid_infos):
                 uwi.x = float(optimized_coords[i][0])
                 uwi.y = float(optimized_coords[i][1])
                 uwi.z = float(optimized_coords[i][2])
-                
+
                 c_id = word_to_cluster.get(uwi.word.thai)
                 if c_id:
                     uwi.cluster_id = c_id
                     uwi.cluster_label = cluster_labels.get(c_id, "General")
-                
+
                 to_update.append(uwi)
-            
-            UserWordInfo.objects.bulk_update(to_update, ['x', 'y', 'z', 'cluster_id', 'cluster_label'])
+
+            UserWordInfo.objects.bulk_update(to_update, ['x', 'y', 'z', 'cluster_id', 'cluster_label'], batch_size=500)
+            cluster_tree.save_tree(user, tree, {uwi.word.thai: uwi.id for uwi in valid_infos})
+            WordNeighbour.rebuild_for(user, valid_infos, vectors)
             self.stdout.write(self.style.SUCCESS('Map updated successfully'))
         else:
             self.stdout.write(self.style.WARNING('Not enough vectors to update map'))
 
+        for kind, cache_stats in nlp_cache.stats().items():
+            self.stdout.write(
+                f"NLP cache {kind}: {cache_stats['lookups']} lookups, hit rate {cache_stats['hit_rate']:.0%}"
+            )
+
         self.stdout.write(self.style.SUCCESS('Database population/update finished!'))
+
+    def load_checkpoint(self, path, user):
+        if not os.path.exists(path):
+            return set()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            self.stdout.write(self.style.WARNING(f'Ignoring unreadable checkpoint {path}: {e}'))
+            return set()
+        # Written for another user of the same name (database reset, user recreated)
+        if checkpoint.get('user_id') != user.pk:
+            self.stdout.write(self.style.WARNING(f'Ignoring checkpoint {path} of another user'))
+            return set()
+        return set(checkpoint.get('completed', []))
+
+    def save_checkpoint(self, path, user, completed):
+        # Write then rename: a crash never leaves a truncated checkpoint
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'user_id': user.pk, 'completed': sorted(completed)}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,45 @@
+import json
+import os
+import time
+from django.core.management.base import BaseCommand
+from vocab_app import services
+
+class Command(BaseCommand):
+    help = 'Runs the compound split analysis over the whole thai2fit vocabulary and stores the lookup table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=services.COMPOUND_TABLE_PATH,
+                            help='Path of the JSON lookup table')
+
+    def handle(self, *args, **options):
+        output_path = options['output']
+        th_model = services.get_thai_model()
+        services.get_thai_word_set()
+
+        vocabulary = th_model.index_to_key
+        total = len(vocabulary)
+        self.stdout.write(f"Analyzing {total} words...")
+
+        table = {}
+        start = time.perf_counter()
+        for i, word in enumerate(vocabulary):
+            try:
+                result = services.compute_compound_split(word)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Skipping {word}: {e}"))
+                continue
+            if result:
+                parts, score = result
+                table[word] = {"parts": parts, "score": round(score, 4)}
+
+            if (i + 1) % 5000 == 0:
+                self.stdout.write(f"Processed {i+1}/{total} ({len(table)} candidates)...")
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {len(table)} compound candidates out of {total} words in {output_path} ({elapsed:.1f}s)'
+        ))
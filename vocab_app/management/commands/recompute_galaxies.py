@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from vocab_app import galaxy, warmup
+from vocab_app.models import UserWordInfo, UserGalaxy
+
+
+def _init_worker(numba_threads):
+    import django
+    django.setup()
+    # Inherited connections (fork) must not be shared with the parent
+    connections.close_all()
+    try:
+        import numba
+        numba.set_num_threads(numba_threads)
+    except (ImportError, ValueError):
+        pass
+
+
+def _compute(user_id):
+    return galaxy.compute(user_id)
+
+
+def _staleness(row):
+    """Sort key: older layout version first, then never / least recently recomputed."""
+    if row is None:
+        return (0, datetime.min.replace(tzinfo=dt_timezone.utc))
+    return (row['layout_version'], row['recomputed_at'] or datetime.min.replace(tzinfo=dt_timezone.utc))
+
+
+def _is_stale(row):
+    return row is None or row['layout_version'] < galaxy.LAYOUT_VERSION or row['recomputed_at'] is None
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the galaxies (layout, clusters, quiz neighbours) of every user, stale ones first, '
+        'in a pool of worker processes, within a time budget'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--budget', type=float, default=60,
+                            help='Minutes after which no new galaxy is started (0: no limit)')
+        parser.add_argument('--stale-only', action='store_true',
+                            help='Only the galaxies never recomputed or of an older galaxy.LAYOUT_VERSION')
+        parser.add_argument('--users', nargs='+', help='Usernames (default: every user with words)')
+        parser.add_argument('--limit', type=int, help='At most this many galaxies')
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        deadline = start_time + options['budget'] * 60 if options['budget'] else None
+
+        users = UserWordInfo.objects.values_list('user_id', flat=True).distinct()
+        if options['users']:
+            users = users.filter(user__username__in=options['users'])
+        state = {
+            row['user_id']: row
+            for row in UserGalaxy.objects.filter(user_id__in=users).values('user_id', 'layout_version', 'recomputed_at')
+        }
+        user_ids = sorted(users, key=lambda user_id: _staleness(state.get(user_id)))
+        if options['stale_only']:
+            user_ids = [user_id for user_id in user_ids if _is_stale(state.get(user_id))]
+        if options['limit']:
+            user_ids = user_ids[:options['limit']]
+        if not user_ids:
+            self.stdout.write(self.style.SUCCESS('No galaxy to recompute.'))
+            return
+        usernames = dict(User.objects.filter(id__in=user_ids).values_list('id', 'username'))
+
+        workers = max(1, min(options['workers'], len(user_ids)))
+        self.stdout.write(f"Recomputing {len(user_ids)} galaxies with {workers} workers...")
+
+        # Loaded once here: forked workers inherit the embeddings and the compiled UMAP
+        warmup.preload(log=self.stdout.write)
+        connections.close_all()
+        context = (
+            multiprocessing.get_context('fork')
+            if 'fork' in multiprocessing.get_all_start_methods() else None
+        )
+        numba_threads = max(1, (os.cpu_count() or 1) // workers)
+        pool_start = time.perf_counter()
+
+        done = skipped = failed = 0
+        queue = iter(user_ids)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context,
+            initializer=_init_worker, initargs=(numba_threads,)
+        ) as pool:
+            pending = {}
+
+            def submit():
+                # A couple of galaxies queued per worker; none started past the budget
+                while len(pending) < workers * 2 and (deadline is None or time.perf_counter() < deadline):
+                    user_id = next(queue, None)
+                    if user_id is None:
+                        return
+                    pending[pool.submit(_compute, user_id)] = user_id
+
+            submit()
+            while pending:
+                # Woken up at the deadline to drop what is still queued
+                now = time.perf_counter()
+                timeout = deadline - now if deadline is not None and now < deadline else None
+                finished, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    user_id = pending.pop(future)
+                    name = usernames.get(user_id, user_id)
+                    try:
+                        result = future.result()
+                        # Written from this process only: one writer, bulk updates
+                        if result is None or not galaxy.save_if_current(user_id, result):
+                            skipped += 1
+                        else:
+                            done += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f"{name}: {e}"))
+
+                    processed = done + skipped + failed
+                    if processed % 10 == 0:
+                        elapsed = time.perf_counter() - pool_start
+                        self.stdout.write(
+                            f"{processed}/{len(user_ids)} galaxies ({processed / elapsed * 60:.1f} users/min)"
+                        )
+                if deadline is not None and time.perf_counter() >= deadline:
+                    # Past the budget: the queued galaxies no worker has started are left for the next run
+                    for future in [future for future in pending if future.cancel()]:
+                        del pending[future]
+                submit()
+
+        elapsed = time.perf_counter() - pool_start
+        processed = done + skipped + failed
+        left = len(user_ids) - processed
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {done} galaxies in {elapsed:.1f}s ({processed / elapsed * 60:.1f} users/min, "
+            f"{time.perf_counter() - start_time:.1f}s with the warm-up), "
+            f"{skipped} skipped, {failed} failed"
+            + (f", {left} left for the next run (time budget)" if left else '')
+        ))
@@ -0,0 +1,89 @@
+"""
+Per-request query budget: counts and times the SQL queries of every request and
+logs the endpoints going over settings.QUERY_BUDGET_COUNT / QUERY_BUDGET_MS.
+
+Works for sync and async requests: every connection gets a wrapper (at creation)
+that reports to the counter of the current request, found through a context
+variable, so the queries run by sync_to_async threads are counted too.
+"""
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+_current_counter = ContextVar('query_budget_counter', default=None)
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counter.count += 1
+        counter.seconds += time.perf_counter() - start
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+connection_created.connect(_install_wrapper, dispatch_uid='vocab_app_query_budget')
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_count = getattr(settings, 'QUERY_BUDGET_COUNT', 50)
+        self.max_ms = getattr(settings, 'QUERY_BUDGET_MS', 500)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = _QueryCounter()
+        token = _current_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_counter.reset(token)
+        return self.report(request, response, counter, start)
+
+    async def __acall__(self, request):
+        counter = _QueryCounter()
+        token = _current_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_counter.reset(token)
+        return self.report(request, response, counter, start)
+
+    def report(self, request, response, counter, start):
+        query_ms = counter.seconds * 1000
+        if counter.count > self.max_count or query_ms > self.max_ms:
+            total_ms = (time.perf_counter() - start) * 1000
+            print(
+                f"Query budget exceeded: {request.method} {request.path} -> "
+                f"{counter.count} queries, {query_ms:.0f}ms in SQL ({total_ms:.0f}ms total)"
+            )
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(counter.count)
+            response['X-Query-Time-Ms'] = f"{query_ms:.1f}"
+        return response
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_search_fields(apps, schema_editor):
+    UserWordInfo = apps.get_model('vocab_app', 'UserWordInfo')
+    WordComponent = apps.get_model('vocab_app', 'WordComponent')
+
+    batch = []
+    components = []
+    for uwi in UserWordInfo.objects.all().iterator(chunk_size=500):
+        infos = uwi.flashcard_infos or {}
+        uwi.word_type = (infos.get('word_type') or '')[:100]
+        uwi.romanization = (infos.get('romanization') or '')[:255]
+        batch.append(uwi)
+        parts = (infos.get('components') or [[]])[0] or []
+        components.extend(
+            WordComponent(user_word_id=uwi.id, text=part[:255], position=i)
+            for i, part in enumerate(parts) if part
+        )
+        if len(batch) >= 500:
+            UserWordInfo.objects.bulk_update(batch, ['word_type', 'romanization'])
+            WordComponent.objects.bulk_create(components)
+            batch = []
+            components = []
+
+    if batch:
+        UserWordInfo.objects.bulk_update(batch, ['word_type', 'romanization'])
+        WordComponent.objects.bulk_create(components)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab_app', '0002_userwordinfo_last_review_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(db_index=True, max_length=255)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['user_word', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='userwordinfo',
+            name='romanization',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='userwordinfo',
+            name='word_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='userwordinfo',
+            index=models.Index(fields=['user', 'cluster_id'], name='vocab_app_u_user_id_1eeb86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userwordinfo',
+            index=models.Index(fields=['user', 'word_type'], name='vocab_app_u_user_id_bb5bd1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userwordinfo',
+            index=models.Index(fields=['user', 'srs_level'], name='vocab_app_u_user_id_4c04f1_idx'),
+        ),
+        migrations.AddField(
+            model_name='wordcomponent',
+            name='user_word',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='components', to='vocab_app.userwordinfo'),
+        ),
+        migrations.RunPython(backfill_search_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_user_and_translation(apps, schema_editor):
+    WordComponent = apps.get_model('vocab_app', 'WordComponent')
+
+    batch = []
+    for comp in WordComponent.objects.select_related('user_word').iterator(chunk_size=500):
+        comp.user_id = comp.user_word.user_id
+        components = (comp.user_word.flashcard_infos or {}).get('components') or []
+        translations = components[1] if len(components) > 1 and components[1] else []
+        if comp.position < len(translations):
+            comp.translation = str(translations[comp.position] or '')[:255]
+        batch.append(comp)
+        if len(batch) >= 500:
+            WordComponent.objects.bulk_update(batch, ['user', 'translation'])
+            batch = []
+
+    if batch:
+        WordComponent.objects.bulk_update(batch, ['user', 'translation'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab_app', '0003_search_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordcomponent',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='wordcomponent',
+            name='translation',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(fill_user_and_translation, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='wordcomponent',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='wordcomponent',
+            index=models.Index(fields=['user', 'text'], name='vocab_app_w_user_id_a0831f_idx'),
+        ),
+    ]
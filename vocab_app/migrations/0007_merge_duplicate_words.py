@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:46
+
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.db import migrations, transaction
+
+_INVISIBLE = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+
+
+def _normalize_thai(text):
+    # Frozen copy of models.normalize_thai as of this migration
+    text = unicodedata.normalize('NFC', text or '')
+    text = _INVISIBLE.sub('', text).replace('\u0e4d\u0e32', '\u0e33')
+    return ' '.join(text.split())
+
+
+def _progress(uwi):
+    return (uwi.srs_level, uwi.last_review_date.timestamp() if uwi.last_review_date else 0)
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Word.thai becomes unique in 0008: merge the Word rows sharing the same
+    normalized Thai text into the oldest one and store every Word.thai normalized
+    (see the dedupe_words command). When a user had several of the duplicates,
+    the copy with the most SRS progress is kept.
+    """
+    Word = apps.get_model('vocab_app', 'Word')
+    UserWordInfo = apps.get_model('vocab_app', 'UserWordInfo')
+    QuizResult = apps.get_model('vocab_app', 'QuizResult')
+
+    ids_by_key = defaultdict(list)
+    for word_id, thai in Word.objects.order_by('id').values_list('id', 'thai').iterator():
+        ids_by_key[_normalize_thai(thai)].append((word_id, thai))
+
+    for key, rows in ids_by_key.items():
+        keeper_id = rows[0][0]
+        duplicate_ids = [word_id for word_id, _ in rows[1:]]
+        if not duplicate_ids:
+            if rows[0][1] != key:
+                Word.objects.filter(id=keeper_id).update(thai=key)
+            continue
+
+        with transaction.atomic():
+            keeper = Word.objects.get(id=keeper_id)
+            kept_by_user = {uwi.user_id: uwi for uwi in UserWordInfo.objects.filter(word_id=keeper_id)}
+            for uwi in UserWordInfo.objects.filter(word_id__in=duplicate_ids).order_by('id'):
+                current = kept_by_user.get(uwi.user_id)
+                if current is None:
+                    uwi.word_id = keeper_id
+                    uwi.save(update_fields=['word'])
+                    kept_by_user[uwi.user_id] = uwi
+                elif _progress(uwi) > _progress(current):
+                    current.delete()
+                    uwi.word_id = keeper_id
+                    uwi.save(update_fields=['word'])
+                    kept_by_user[uwi.user_id] = uwi
+                else:
+                    uwi.delete()
+
+            QuizResult.objects.filter(word_id__in=duplicate_ids).update(word_id=keeper_id)
+
+            for duplicate in Word.objects.filter(id__in=duplicate_ids):
+                if not keeper.vector and duplicate.vector:
+                    keeper.vector = duplicate.vector
+                if not keeper.french and duplicate.french:
+                    keeper.french = duplicate.french
+            Word.objects.filter(id__in=duplicate_ids).delete()
+            Word.objects.filter(id=keeper_id).update(thai=key, french=keeper.french, vector=keeper.vector)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab_app', '0006_cluster_tree'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab_app', '0007_merge_duplicate_words'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='word',
+            name='thai',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab_app', '0008_word_thai_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(default=0)),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='vocab_app.userwordinfo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('user_word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='vocab_app.userwordinfo')),
+            ],
+            options={
+                'ordering': ['user_word', 'rank'],
+                'indexes': [models.Index(fields=['user_word', 'rank'], name='vocab_app_w_user_wo_54c665_idx')],
+            },
+        ),
+    ]
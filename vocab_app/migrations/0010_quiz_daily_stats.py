@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:55
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+RESULTS = ('fail', 'hard', 'good', 'easy')
+
+
+def rollup_existing_results(apps, schema_editor):
+    """
+    The statistics are read from the rollups only: start them with the whole
+    QuizResult history, the cluster being the word's current one.
+    """
+    QuizResult = apps.get_model('vocab_app', 'QuizResult')
+    UserWordInfo = apps.get_model('vocab_app', 'UserWordInfo')
+    QuizDailyStat = apps.get_model('vocab_app', 'QuizDailyStat')
+
+    labels = {
+        (user_id, word_id): label or ''
+        for user_id, word_id, label in UserWordInfo.objects.values_list('user_id', 'word_id', 'cluster_label')
+    }
+    stats = defaultdict(lambda: dict.fromkeys(RESULTS, 0))
+    grouped = (
+        QuizResult.objects
+        .annotate(day=TruncDate('review_date'))
+        .values('user_id', 'word_id', 'day', 'quiz_type', 'result')
+        .annotate(n=Count('id'))
+    )
+    for row in grouped.iterator():
+        if row['result'] not in RESULTS:
+            continue
+        label = labels.get((row['user_id'], row['word_id']), '')
+        stats[(row['user_id'], row['day'], row['quiz_type'], label)][row['result']] += row['n']
+
+    QuizDailyStat.objects.bulk_create([
+        QuizDailyStat(
+            user_id=user_id, day=day, quiz_type=quiz_type, cluster_label=label,
+            reviews=sum(counts.values()), **counts
+        )
+        for (user_id, day, quiz_type, label), counts in stats.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab_app', '0009_word_neighbours'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quiz_type', models.CharField(choices=[('fr2th', 'French to Thai'), ('th2fr', 'Thai to French'), ('audio', 'Audio'), ('sentence', 'Sentence Completion')], max_length=20)),
+                ('cluster_label', models.CharField(blank=True, default='', max_length=255)),
+                ('reviews', models.PositiveIntegerField(default=0)),
+                ('fail', models.PositiveIntegerField(default=0)),
+                ('hard', models.PositiveIntegerField(default=0)),
+                ('good', models.PositiveIntegerField(default=0)),
+                ('easy', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='userwordinfo',
+            index=models.Index(fields=['user', 'next_review_date'], name='vocab_app_u_user_id_3ae9f4_idx'),
+        ),
+        migrations.AddField(
+            model_name='quizdailystat',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_stats', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='quizdailystat',
+            constraint=models.UniqueConstraint(fields=('user', 'day', 'quiz_type', 'cluster_label'), name='unique_quiz_daily_stat'),
+        ),
+        migrations.RunPython(rollup_existing_results, migrations.RunPython.noop),
+    ]
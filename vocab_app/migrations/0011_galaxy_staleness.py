@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab_app', '0010_quiz_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usergalaxy',
+            name='layout_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usergalaxy',
+            name='recomputed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
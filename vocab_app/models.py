@@ -1,15 +1,69 @@
 from django.db import models
 from django.contrib.auth.models import User
-import json
+import re
+import unicodedata
+
+# Invisible characters pasted along with Thai text (zero-width space/joiners, BOM)
+_INVISIBLE = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+
+def normalize_thai(text):
+    """
+    Canonical form of a Thai word, the key of Word.thai: NFC, no invisible
+    characters, SARA AM as one character (nikhahit + sara aa is a common typing
+    variant), single inner spaces, stripped.
+    """
+    text = unicodedata.normalize('NFC', text or '')
+    text = _INVISIBLE.sub('', text).replace('\u0e4d\u0e32', '\u0e33')
+    return ' '.join(text.split())
+
+
+class WordManager(models.Manager):
+    def get_or_create_many(self, pairs):
+        """
+        Bulk get_or_create of (thai, french) pairs: one SELECT, one INSERT for
+        the missing words (conflicts with concurrent inserts ignored), one SELECT
+        to read them back. Returns {thai as given: Word}.
+        """
+        pairs = list(pairs)
+        french_by_key = {}
+        for thai, french in pairs:
+            key = normalize_thai(thai)
+            if key:
+                french_by_key.setdefault(key, french or '')
+
+        words = {w.thai: w for w in self.filter(thai__in=french_by_key)}
+        missing = [key for key in french_by_key if key not in words]
+        if missing:
+            self.bulk_create(
+                [self.model(thai=key, french=french_by_key[key]) for key in missing],
+                ignore_conflicts=True
+            )
+            words.update({w.thai: w for w in self.filter(thai__in=missing)})
+        return {thai: words[normalize_thai(thai)] for thai, _ in pairs if normalize_thai(thai) in words}
+
+    def get_or_create_one(self, thai, french=''):
+        """
+        The Word of `thai` (normalized), created with `french` if it does not
+        exist. None if nothing is left of `thai` once normalized.
+        """
+        return self.get_or_create_many([(thai, french)]).get(thai)
+
 
 class Word(models.Model):
-    thai = models.CharField(max_length=255)
+    # Stored normalized (normalize_thai), unique
+    thai = models.CharField(max_length=255, unique=True)
     french = models.CharField(max_length=255)
     vector = models.JSONField(default=list)
 
+    objects = WordManager()
+
     def __str__(self):
         return self.thai
 
+    def save(self, *args, **kwargs):
+        self.thai = normalize_thai(self.thai)
+        super().save(*args, **kwargs)
+
 class UserWordInfo(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     word = models.ForeignKey(Word, on_delete=models.CASCADE)
@@ -37,8 +91,173 @@ class UserWordInfo(models.Model):
 
     tags = models.JSONField(default=list)
 
+    # Searchable flashcard_infos fields, copied into indexed columns (see sync_search_fields)
+    word_type = models.CharField(max_length=100, blank=True, default='')
+    # Matched with icontains (GalaxyFilterView search): a b-tree index would not be used
+    romanization = models.CharField(max_length=255, blank=True, default='')
+
     class Meta:
         unique_together = ('user', 'word')
+        indexes = [
+            models.Index(fields=['user', 'cluster_id']),
+            models.Index(fields=['user', 'word_type']),
+            models.Index(fields=['user', 'srs_level']),
+            models.Index(fields=['user', 'next_review_date']),
+        ]
+
+    def sync_search_fields(self):
+        """Copy the searchable flashcard_infos fields into their indexed columns."""
+        infos = self.flashcard_infos or {}
+        self.word_type = (infos.get('word_type') or '')[:100]
+        self.romanization = (infos.get('romanization') or '')[:255]
+
+    def component_parts(self):
+        components = (self.flashcard_infos or {}).get('components') or []
+        return list(components[0]) if components and components[0] else []
+
+    def component_translations(self):
+        components = (self.flashcard_infos or {}).get('components') or []
+        return list(components[1]) if len(components) > 1 and components[1] else []
+
+    # Components the WordComponent rows were built from: a new word has none,
+    # a loaded one those of its stored flashcard_infos (see from_db)
+    _indexed_components = ([], [])
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'flashcard_infos' in instance.__dict__:
+            instance._indexed_components = (instance.component_parts(), instance.component_translations())
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        infos_saved = update_fields is None or 'flashcard_infos' in update_fields
+        if infos_saved:
+            self.sync_search_fields()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'word_type', 'romanization'}
+        super().save(*args, **kwargs)
+        if infos_saved:
+            # Rewrite the component rows only when the components changed
+            components = (self.component_parts(), self.component_translations())
+            if components != self._indexed_components:
+                WordComponent.sync_for([self])
+                self._indexed_components = components
+
+
+class WordComponent(models.Model):
+    """
+    Component index: one row per component part of a user word
+    (flashcard_infos['components'], as returned by services.get_french_components).
+    The user is denormalized so "which of my words contain X" is a single index lookup.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user_word = models.ForeignKey(UserWordInfo, on_delete=models.CASCADE, related_name='components')
+    text = models.CharField(max_length=255, db_index=True)
+    translation = models.CharField(max_length=255, blank=True, default='')
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['user_word', 'position']
+        indexes = [
+            models.Index(fields=['user', 'text']),
+        ]
+
+    def __str__(self):
+        return self.text
+
+    @classmethod
+    def sync_for(cls, user_words):
+        """Rebuild the component rows of `user_words` from their flashcard_infos."""
+        user_words = [uwi for uwi in user_words if uwi.pk]
+        if not user_words:
+            return
+        cls.objects.filter(user_word__in=user_words).delete()
+        rows = []
+        for uwi in user_words:
+            translations = uwi.component_translations()
+            for i, part in enumerate(uwi.component_parts()):
+                if not part:
+                    continue
+                translation = translations[i] if i < len(translations) else ''
+                rows.append(cls(
+                    user_id=uwi.user_id, user_word=uwi, text=part[:255],
+                    translation=str(translation or '')[:255], position=i
+                ))
+        cls.objects.bulk_create(rows)
+
+class WordNeighbour(models.Model):
+    """
+    Nearest-neighbour table: the closest words (word vectors, cosine) of each user
+    word within the user's vocabulary, closest first. Rebuilt at every galaxy
+    recompute; the quiz draws its distractors from it.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user_word = models.ForeignKey(UserWordInfo, on_delete=models.CASCADE, related_name='neighbours')
+    neighbour = models.ForeignKey(UserWordInfo, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['user_word', 'rank']
+        indexes = [
+            models.Index(fields=['user_word', 'rank']),
+        ]
+
+    @classmethod
+    def rebuild_for(cls, user, user_words, vectors):
+        """Replace the user's table with the neighbours of `user_words` (same order as `vectors`)."""
+        from . import services
+        if len(user_words) < 2:
+            cls.objects.filter(user=user).delete()
+            return
+        cls.replace_for(user, user_words, services.nearest_neighbours(vectors, services.QUIZ_NEIGHBOURS))
+
+    @classmethod
+    def replace_for(cls, user, user_words, nearest):
+        """Replace the user's table: nearest[i] are the indices in `user_words` of the neighbours of user_words[i]."""
+        cls.objects.filter(user=user).delete()
+        cls.objects.bulk_create([
+            cls(user=user, user_word=uwi, neighbour=user_words[j], rank=rank)
+            for uwi, row in zip(user_words, nearest)
+            for rank, j in enumerate(row)
+        ], batch_size=1000)
+
+class UserGalaxy(models.Model):
+    """
+    Per-user galaxy state.
+    `uses_shared_seed`: the user still looks at the shared guest galaxy (read-only,
+    see guest_seed.py) and has no UserWordInfo rows of their own yet.
+    `recomputed_at`/`layout_version`: staleness, for recompute_galaxies.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='galaxy')
+    uses_shared_seed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last full recompute, and the galaxy.LAYOUT_VERSION it was made with
+    recomputed_at = models.DateTimeField(null=True, blank=True)
+    layout_version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Galaxy of {self.user}"
+
+
+class ClusterTree(models.Model):
+    """
+    Ward linkage tree of a user's galaxy, saved at every recompute, so the galaxy
+    can be re-cut at any granularity without clustering again (see cluster_tree.py).
+    `word_ids`: the UserWordInfo ids of the tree leaves, in linkage order.
+    `node_labels`: label of each tree node already named, {node id: label}.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cluster_tree')
+    version = models.PositiveIntegerField(default=0)
+    word_ids = models.JSONField(default=list)
+    linkage = models.JSONField(default=list)
+    node_labels = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Cluster tree of {self.user} (v{self.version})"
+
 
 class QuizResult(models.Model):
     QUIZ_TYPES = [
@@ -61,3 +280,30 @@ class QuizResult(models.Model):
     quiz_type = models.CharField(max_length=20, choices=QUIZ_TYPES)
     result = models.CharField(max_length=20, choices=RESULT_TYPES)
     review_date = models.DateTimeField(auto_now_add=True)
+
+
+class QuizDailyStat(models.Model):
+    """
+    Daily rollup of a user's quiz results, per quiz type and cluster (label of the
+    word when it was reviewed). Incremented on every submission (analytics.record_review):
+    the statistics never scan QuizResult, which can be compacted (compact_quiz_results).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_stats')
+    day = models.DateField()
+    quiz_type = models.CharField(max_length=20, choices=QuizResult.QUIZ_TYPES)
+    cluster_label = models.CharField(max_length=255, blank=True, default='')
+    reviews = models.PositiveIntegerField(default=0)
+    fail = models.PositiveIntegerField(default=0)
+    hard = models.PositiveIntegerField(default=0)
+    good = models.PositiveIntegerField(default=0)
+    easy = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day', 'quiz_type', 'cluster_label'], name='unique_quiz_daily_stat'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.day} {self.quiz_type} {self.cluster_label}: {self.reviews}"
@@ -0,0 +1,162 @@
+"""
+Memoized Thai NLP primitives (romanization, POS tags, tokenization).
+
+The same words come back in thousands of example sentences, so every result is
+kept in a bounded in-memory LRU per process, backed by a persistent SQLite store
+shared by all the workers (and kept across restarts).
+`stats()` reports the hit rates of each cache.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+NLP_CACHE_PATH = os.environ.get(
+    'NLP_CACHE_PATH',
+    os.path.join(os.path.dirname(__file__), 'data', 'nlp_cache.sqlite3')
+)
+LRU_SIZE = 10000
+
+_local = threading.local()
+
+
+def _connection():
+    """One SQLite connection per thread (and per process, connections must not cross a fork)."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.pid != os.getpid():
+        os.makedirs(os.path.dirname(NLP_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(NLP_CACHE_PATH, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS nlp_cache ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (kind, key))"
+        )
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+class NLPCache:
+    def __init__(self, kind, compute, maxsize=LRU_SIZE):
+        self.kind = kind
+        self.compute = compute
+        self.maxsize = maxsize
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, value):
+        # Called with the lock held
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def _load_persistent(self, keys):
+        try:
+            conn = _connection()
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT key, value FROM nlp_cache WHERE kind = ? AND key IN ({placeholders})",
+                [self.kind, *keys]
+            ).fetchall()
+            return {key: json.loads(value) for key, value in rows}
+        except sqlite3.Error as e:
+            print(f"NLP cache read error: {e}")
+            return {}
+
+    def _store_persistent(self, values):
+        try:
+            conn = _connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO nlp_cache (kind, key, value) VALUES (?, ?, ?)",
+                    [(self.kind, key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()]
+                )
+        except sqlite3.Error as e:
+            print(f"NLP cache write error: {e}")
+
+    def get_many(self, keys):
+        """Return the values of `keys`, in order, computing only what no cache level knows."""
+        results = {}
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    results[key] = self._lru[key]
+        self.hits += sum(1 for key in keys if key in results)
+
+        missing = list(dict.fromkeys(key for key in keys if key not in results))
+        if missing:
+            stored = self._load_persistent(missing)
+            computed = {key: self.compute(key) for key in missing if key not in stored}
+            self.persistent_hits += sum(1 for key in keys if key in stored)
+            self.misses += sum(1 for key in keys if key in computed)
+            if computed:
+                self._store_persistent(computed)
+            with self._lock:
+                for key, value in {**stored, **computed}.items():
+                    self._remember(key, value)
+            results.update(stored)
+            results.update(computed)
+
+        return [results[key] for key in keys]
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def stats(self):
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+            "size": len(self._lru),
+        }
+
+
+def _th2roman(word):
+    import tltk
+    return tltk.nlp.th2roman(word).replace(' <s/>', '')
+
+
+def _pos_tag(text):
+    import tltk
+    return tltk.nlp.pos_tag(text)
+
+
+def _word_tokenize(text):
+    from pythainlp.tokenize import word_tokenize
+    return word_tokenize(text, engine="newmm")
+
+
+_romanization = NLPCache("th2roman", _th2roman)
+_pos_tags = NLPCache("pos_tag", _pos_tag)
+_tokenization = NLPCache("word_tokenize", _word_tokenize)
+
+
+def romanize(word):
+    return _romanization.get(word)
+
+
+def romanize_many(words):
+    """Romanize all the sub-words of a sentence with a single cache lookup."""
+    return _romanization.get_many(words)
+
+
+def pos_tag(text):
+    # Tuples come back as lists from the persistent store, index access works on both
+    return _pos_tags.get(text)
+
+
+def word_tokenize(text):
+    return list(_tokenization.get(text))
+
+
+def stats():
+    return {cache.kind: cache.stats() for cache in (_romanization, _pos_tags, _tokenization)}
@@ -0,0 +1,33 @@
+"""
+JSON renderer of the API (settings.REST_FRAMEWORK): the output of DRF's
+JSONRenderer, encoded by orjson when it is installed (several times faster on
+the large galaxy and quiz payloads), by DRF's encoder otherwise.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Dates, decimals, lazy strings, ... go through DRF's encoder, for identical output
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class FastJSONRenderer(JSONRenderer):
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Indented output (browsable API, ?indent) is not a hot path
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=self._encoder.default, option=ORJSON_OPTIONS)
+        # Like JSONRenderer: U+2028/U+2029 are valid JSON but not valid JavaScript
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
@@ -1,6 +1,17 @@
+import json
+
+from django.conf import settings
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Word, UserWordInfo, QuizResult
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 class WordSerializer(serializers.ModelSerializer):
     class Meta:
         model = Word
@@ -13,6 +24,49 @@ class UserWordInfoSerializer(serializers.ModelSerializer):
         model = UserWordInfo
         fields = ['id', 'word', 'x', 'y', 'z', 'cluster_id', 'cluster_label', 'flashcard_infos', 'is_favorite', 'srs_level', 'tags', 'add_date', 'last_review_date']
 
+# Fast path of UserWordInfoSerializer(many=True) for the large payloads (galaxy,
+# quiz): one .values() query and plain dicts, same fields, order and formats.
+# The JSON columns are read as text and decoded by orjson (Django's JSONField
+# decoding with the json module was most of the time).
+USER_WORD_VALUES = [
+    'id', 'word_id', 'word__thai', 'word__french', 'x', 'y', 'z', 'cluster_id', 'cluster_label',
+    'is_favorite', 'srs_level', 'add_date', 'last_review_date',
+]
+USER_WORD_JSON_VALUES = {
+    'flashcard_infos_json': Cast('flashcard_infos', output_field=TextField()),
+    'tags_json': Cast('tags', output_field=TextField()),
+}
+
+def _datetime(value, tz):
+    """DateTimeField.to_representation (ISO 8601, 'Z' for UTC)."""
+    if value is None:
+        return None
+    if tz is not None and timezone.is_aware(value):
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+def serialize_user_words(queryset):
+    """UserWordInfoSerializer(queryset, many=True).data without the per-field DRF machinery."""
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    return [{
+        'id': row['id'],
+        'word': {'id': row['word_id'], 'thai': row['word__thai'], 'french': row['word__french']},
+        'x': row['x'],
+        'y': row['y'],
+        'z': row['z'],
+        'cluster_id': row['cluster_id'],
+        'cluster_label': row['cluster_label'],
+        'flashcard_infos': _json_loads(row['flashcard_infos_json']),
+        'is_favorite': row['is_favorite'],
+        'srs_level': row['srs_level'],
+        'tags': _json_loads(row['tags_json']),
+        'add_date': _datetime(row['add_date'], tz),
+        'last_review_date': _datetime(row['last_review_date'], tz),
+    } for row in queryset.values(*USER_WORD_VALUES, **USER_WORD_JSON_VALUES)]
+
 class QuizResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuizResult
@@ -1,20 +1,20 @@
 import os
 import json
+import asyncio
+import threading
+from collections import OrderedDict
 import numpy as np
-import pandas as pd
-from scipy.spatial.distance import cosine
-from scipy.cluster.hierarchy import linkage, fcluster
-from openai import OpenAI
-
-# Initialize OpenAI Client (Typhoon)
-client = OpenAI(
-    api_key=os.environ.get("TYPHOON_API_KEY"),
-    base_url="https://api.opentyphoon.ai/v1"
-)
-
-# Global variable to store the model
+from . import llm, nlp_cache, single_flight
+
+# Lookup table of the compound splits of the whole thai2fit vocabulary,
+# generated offline by `python manage.py precompute_compounds`
+COMPOUND_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'compound_splits.json')
+
+# Global variables to store the models.
+# Everything heavy is loaded lazily (see warmup.py for the startup preload).
 _TH_MODEL = None
 _TH_WORD_SET = None
+_COMPOUND_TABLE = None
 
 def get_thai_model():
     from pythainlp import word_vector
@@ -31,11 +31,22 @@ def get_thai_word_set():
         _TH_WORD_SET = thai_words()
     return _TH_WORD_SET
 
+def get_compound_table():
+    """
+    Return the precomputed {word: {"parts": [...], "score": float}} table,
+    or None if it has not been generated (the splits are then computed online).
+    """
+    global _COMPOUND_TABLE
+    if _COMPOUND_TABLE is None and os.path.exists(COMPOUND_TABLE_PATH):
+        with open(COMPOUND_TABLE_PATH, 'r', encoding='utf-8') as f:
+            _COMPOUND_TABLE = json.load(f)
+    return _COMPOUND_TABLE
+
 # ==========================================
 # 1. Flashcard Generation Logic
 # ==========================================
 
-def generate_example_sentence_pair(french_word, thai_word):
+def _sentence_pair_messages(french_word, thai_word):
     prompt = f"""Generate a short, natural French example sentence using the word "{french_word}" (meaning "{thai_word}" in Thai).
     Then provide the natural Thai translation of that sentence.
     
@@ -44,25 +55,27 @@ def generate_example_sentence_pair(french_word, thai_word):
         "french": "string",
         "thai": "string"
     }}"""
+    return [
+        {"role": "system", "content": "You are a Thai-French linguistic expert."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _sentence_pair_fallback(french_word, thai_word):
+    return {"french": f"C'est {french_word}.", "thai": f"นั่คือ{thai_word}"}
+
+def generate_example_sentence_pair(french_word, thai_word):
     try:
-        response = client.chat.completions.create(
-            model="typhoon-v2.5-30b-a3b-instruct",
-            messages=[
-                {"role": "system", "content": "You are a Thai-French linguistic expert."},
-                {"role": "user", "content": prompt}
-            ],
+        content = llm.chat(
+            _sentence_pair_messages(french_word, thai_word),
             temperature=0.7,
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)
+        return json.loads(content)
     except Exception as e:
         print(f"Sentence generation error: {e}")
-        return {"french": f"C'est {french_word}.", "thai": f"นั่คือ{thai_word}"}
+        return _sentence_pair_fallback(french_word, thai_word)
 
-def translate_french_sentence(french_word, thai_word, french_sentence):
-    if not french_sentence:
-        return ""
-    
+def _translation_messages(french_word, thai_word, french_sentence):
     examples = [
         {
             "f_word": "Relâcher",
@@ -101,26 +114,26 @@ def translate_french_sentence(french_word, thai_word, french_sentence):
         f"Thai Translation:<|im_end|>\n"
         f"<|im_start|>assistant\n"
     )
+    return [
+        {"role": "system", "content": "You are a Thai-French linguistic expert. You focus on literal component meanings."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _clean_translation(content):
+    return content.replace('/ค่ะ','').replace('?','')
+
+def translate_french_sentence(french_word, thai_word, french_sentence):
+    if not french_sentence:
+        return ""
 
     try:
-        response = client.chat.completions.create(
-            model="typhoon-v2.5-30b-a3b-instruct",
-            messages=[
-                {"role": "system", "content": "You are a Thai-French linguistic expert. You focus on literal component meanings."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-        )
-        output = response.choices[0].message.content
-        output = output.replace('/ค่ะ','').replace('?','')
-        return output
+        content = llm.chat(_translation_messages(french_word, thai_word, french_sentence), temperature=0)
+        return _clean_translation(content)
     except Exception as e:
         print(f"Translation error: {e}")
         return ""
 
 def get_word_type(word):
-    import tltk
-    from pythainlp.tokenize import word_tokenize
     mapping = {
         'PRON': 'Pronom',
         'NOUN': 'Nom',
@@ -135,13 +148,13 @@ def get_word_type(word):
     }
 
     try:
-        pos_tags = tltk.nlp.pos_tag(word)
+        pos_tags = nlp_cache.pos_tag(word)
         raw_tag = pos_tags[0][0][1]
         readable_type = mapping.get(raw_tag, "Inconnu")
         
         if readable_type == 'Nom propre':
              # Secondary check
-            tokens = word_tokenize(word, engine="newmm")
+            tokens = nlp_cache.word_tokenize(word)
             # Simple fallback if complex tagging fails or is not available in this context
             # For now, sticking to tltk mostly, but let's try a basic check if needed
             readable_type = 'Inconnu' # Fallback for strictly proper nouns logic in notebook
@@ -153,33 +166,42 @@ def get_word_type(word):
         return "Inconnu"
 
 def find_best_split(word, syllables, th_model):
-    best_score = -1
-    best_parts = None
-
-    # 1. Evaluate Granular Split
+    # Candidate splits: the granular one, then every binary split
+    candidates = []
     if all(s in th_model for s in syllables):
-        vec_word = th_model[word]
-        vec_sum = np.sum([th_model[s] for s in syllables], axis=0)
-        best_score = 1 - cosine(vec_word, vec_sum)
-        best_parts = syllables
-
-    # 2. Evaluate Binary Splits
+        candidates.append(list(syllables))
     for i in range(1, len(syllables)):
         part1 = "".join(syllables[:i])
         part2 = "".join(syllables[i:])
-
         if part1 in th_model and part2 in th_model:
-            vec_word = th_model[word]
-            vec_sum = th_model[part1] + th_model[part2]
-            score = 1 - cosine(vec_word, vec_sum)
+            candidates.append([part1, part2])
 
-            if score > best_score:
-                best_score = score
-                best_parts = [part1, part2]
+    if not candidates:
+        return None, -1
 
-    return best_parts, best_score
+    # Score all the candidates at once: the summed vector of each split is
+    # (split x part counts) @ (part vectors), then one cosine per row
+    parts = list(dict.fromkeys(p for split in candidates for p in split))
+    part_index = {p: i for i, p in enumerate(parts)}
+    counts = np.zeros((len(candidates), len(parts)))
+    for row, split in enumerate(candidates):
+        for p in split:
+            counts[row, part_index[p]] += 1
+    vec_sums = counts @ np.array([th_model[p] for p in parts])
+    vec_word = th_model[word]
 
-def get_french_components(word):
+    norms = np.linalg.norm(vec_sums, axis=1) * np.linalg.norm(vec_word)
+    scores = np.where(norms > 0, vec_sums @ vec_word / np.where(norms > 0, norms, 1), -1)
+
+    # argmax keeps the first best, so the granular split wins ties as before
+    best = int(np.argmax(scores))
+    return candidates[best], float(scores[best])
+
+def compute_compound_split(word):
+    """
+    Run the split analysis of `word` (no LLM call).
+    Returns (best_parts, score) if it is a compound candidate, else None.
+    """
     from pythainlp.tokenize import syllable_tokenize
     th_model = get_thai_model()
     th_word_set = get_thai_word_set()
@@ -204,7 +226,25 @@ def get_french_components(word):
     if False in check_dict:
         return None
 
-    parts_str = " + ".join(best_parts)
+    return best_parts, score
+
+def find_compound_split(word):
+    """
+    Local part of the compound analysis (no LLM call).
+    Returns the best split of `word` into known words, or None if it is not a compound candidate.
+    Uses the precomputed table when available: it covers the whole vocabulary,
+    so a word missing from it is not a candidate.
+    """
+    table = get_compound_table()
+    if table is not None:
+        entry = table.get(word)
+        return entry["parts"] if entry else None
+
+    result = compute_compound_split(word)
+    return result[0] if result else None
+
+def _compound_messages(word, parts):
+    parts_str = " + ".join(parts)
     prompt = f"""Analyze the Thai word "{word}" composed of [{parts_str}].
 
     1. Is this a 'True Semantic Compound'? (Yes, if the components contribute to the meaning).
@@ -217,65 +257,431 @@ def get_french_components(word):
         "component_translations": ["french_1", "french_2"],
         "full_word_french": "string"
     }}"""
+    return [
+        {"role": "system", "content": "You are a Thai-French linguistic expert. You focus on literal component meanings."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _parse_compound(content, parts):
+    res = json.loads(content)
+    if res.get("is_true_compound"):
+        return list(parts), res.get("component_translations", [])
+    return None
+
+# LLM analyses of the compound candidates, shared by the sync and async paths.
+# Errors are raised by the callers (and so not cached).
+_COMPOUND_ANALYSES = OrderedDict()
+_COMPOUND_ANALYSES_SIZE = 4096
+_COMPOUND_LOCK = threading.Lock()
+_MISSING = object()
+
+def _cached_compound(key):
+    with _COMPOUND_LOCK:
+        value = _COMPOUND_ANALYSES.get(key, _MISSING)
+        if value is not _MISSING:
+            _COMPOUND_ANALYSES.move_to_end(key)
+        return value
+
+def _remember_compound(key, value):
+    with _COMPOUND_LOCK:
+        _COMPOUND_ANALYSES[key] = value
+        if len(_COMPOUND_ANALYSES) > _COMPOUND_ANALYSES_SIZE:
+            _COMPOUND_ANALYSES.popitem(last=False)
+    return value
+
+def _analyze_compound(word, parts):
+    """LLM analysis of a compound candidate. Errors are raised (and so not cached)."""
+    cached = _cached_compound((word, parts))
+    if cached is not _MISSING:
+        return cached
+    content = llm.chat(_compound_messages(word, parts), temperature=0, response_format={"type": "json_object"})
+    return _remember_compound((word, parts), _parse_compound(content, parts))
+
+def get_french_components(word):
+    best_parts = find_compound_split(word)
+    if not best_parts:
+        return None
 
     try:
-        response = client.chat.completions.create(
-            model="typhoon-v2.5-30b-a3b-instruct",
-            messages=[
-                {"role": "system", "content": "You are a Thai-French linguistic expert. You focus on literal component meanings."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            response_format={"type": "json_object"}
-        )
-        res = json.loads(response.choices[0].message.content)
-        if res.get("is_true_compound"):
-            return best_parts, res.get("component_translations", [])
+        return _analyze_compound(word, tuple(best_parts))
     except Exception as e:
-        pass
+        return None
 
-    return None
+def _word_fields(thai_word):
+    """Flashcard fields of the word alone: available before any LLM answer."""
+    try:
+        romanization = nlp_cache.romanize(thai_word)
+    except:
+        romanization = ""
+    return {"romanization": romanization, "word_type": get_word_type(thai_word)}
 
-def get_flashcard_infos(thai_word, french_word, french_sentence):
-    import tltk
-    from pythainlp.tokenize import word_tokenize
-    # 1) Handle empty sentence by generating a pair
-    if not french_sentence:
-        pair = generate_example_sentence_pair(french_word, thai_word)
-        french_sentence = pair.get("french", "")
-        thai_sentence = pair.get("thai", "")
-    else:
-        # Translate the provided french sentence
-        thai_sentence = translate_french_sentence(french_word, thai_word, french_sentence)
-    
+def _sentence_fields(thai_sentence):
+    """Tokenization and romanization of the Thai example sentence."""
     # 2) Tokenize
-    sub_words = word_tokenize(thai_sentence)
-    
-    # 3) Romanization
-    # tltk.nlp.th2roman might fail if not fully initialized, ensure tltk is imported
+    sub_words = nlp_cache.word_tokenize(thai_sentence)
+
+    # 3) Romanization (all the sub-words in a single cache lookup)
+    # tltk.nlp.th2roman might fail if not fully initialized
     try:
-        romanization = tltk.nlp.th2roman(thai_word).replace(' <s/>', '')
-        sentence_romanization = " ".join([tltk.nlp.th2roman(w).replace(' <s/>', '') for w in sub_words])
+        sentence_romanization = " ".join(nlp_cache.romanize_many(sub_words))
     except:
-        romanization = ""
         sentence_romanization = ""
+    return {"sub_words": sub_words, "sentence_romanization": sentence_romanization}
 
-    # 4) Word Type
-    word_type = get_word_type(thai_word)
-
-    # 5) Components
-    components = get_french_components(thai_word)
+def build_flashcard_infos(thai_word, french_sentence, thai_sentence, components):
+    """Local NLP part of the flashcard (tokenization, romanization, word type)."""
+    sentence_fields = _sentence_fields(thai_sentence)
+    word_fields = _word_fields(thai_word)
 
     return {
         "thai_sentence": thai_sentence,
         "french_sentence": french_sentence,
-        "sub_words": sub_words,
-        "romanization": romanization,
-        "sentence_romanization": sentence_romanization,
-        "word_type": word_type,
+        "sub_words": sentence_fields["sub_words"],
+        "romanization": word_fields["romanization"],
+        "sentence_romanization": sentence_fields["sentence_romanization"],
+        "word_type": word_fields["word_type"],
         "components": components
     }
 
+def _sentences(thai_word, french_word, french_sentence):
+    """(french_sentence, thai_sentence), generating the pair when no sentence is given."""
+    # 1) Handle empty sentence by generating a pair
+    if not french_sentence:
+        pair = generate_example_sentence_pair(french_word, thai_word)
+        return pair.get("french", ""), pair.get("thai", "")
+    # Translate the provided french sentence
+    return french_sentence, translate_french_sentence(french_word, thai_word, french_sentence)
+
+def _is_complete_flashcard(key, infos):
+    """
+    Whether a generated flashcard can be shared with other workers: not built from
+    the fallbacks of a failed LLM call (no or placeholder sentence, components of a
+    compound candidate missing because its analysis failed, circuit open).
+    """
+    thai_word, french_word, _ = key
+    if llm.breaker.is_open:
+        return False
+    if not infos.get("french_sentence") or not infos.get("thai_sentence"):
+        return False
+    fallback = _sentence_pair_fallback(french_word, thai_word)
+    if (infos["french_sentence"], infos["thai_sentence"]) == (fallback["french"], fallback["thai"]):
+        return False
+    if infos.get("components") is None:
+        parts = find_compound_split(thai_word)
+        # Successful analyses are remembered, failed ones are not
+        if parts and _cached_compound((thai_word, tuple(parts))) is _MISSING:
+            return False
+    return True
+
+# Identical generations in flight (double clicks, several users adding the same
+# new word) run once and share their result, see single_flight.py
+FLASHCARDS = single_flight.SingleFlight('flashcards', shareable=_is_complete_flashcard)
+
+def get_flashcard_infos(thai_word, french_word, french_sentence):
+    return FLASHCARDS.run(
+        (thai_word, french_word, french_sentence),
+        lambda: _generate_flashcard_infos(thai_word, french_word, french_sentence)
+    )
+
+def _generate_flashcard_infos(thai_word, french_word, french_sentence):
+    french_sentence, thai_sentence = _sentences(thai_word, french_word, french_sentence)
+
+    # 5) Components
+    components = get_french_components(thai_word)
+
+    return build_flashcard_infos(thai_word, french_sentence, thai_sentence, components)
+
+def stream_flashcard_infos(thai_word, french_word, french_sentence):
+    """
+    Progressive `get_flashcard_infos`: yields (step, fields) as soon as each part
+    of the flashcard is ready ("word", then "sentence" and "components" in
+    completion order), then ("done", flashcard_infos).
+    A request joining an identical generation in flight only gets ("done", ...).
+    """
+    yield from FLASHCARDS.stream(
+        (thai_word, french_word, french_sentence),
+        lambda: _stream_flashcard_infos(thai_word, french_word, french_sentence)
+    )
+
+def _stream_flashcard_infos(thai_word, french_word, french_sentence):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    infos = {}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        sentences = pool.submit(_sentences, thai_word, french_word, french_sentence)
+        components = pool.submit(get_french_components, thai_word)
+
+        infos.update(_word_fields(thai_word))
+        yield "word", dict(infos)
+
+        for future in as_completed([sentences, components]):
+            if future is sentences:
+                french_sentence, thai_sentence = future.result()
+                fields = {"french_sentence": french_sentence, "thai_sentence": thai_sentence,
+                          **_sentence_fields(thai_sentence)}
+                infos.update(fields)
+                yield "sentence", fields
+            else:
+                infos["components"] = future.result()
+                yield "components", {"components": infos["components"]}
+
+    yield "done", infos
+
+# ==========================================
+# 1b. Batched Flashcard Generation
+# ==========================================
+# One structured-JSON request for several words. Every result is validated
+# and the items missing or invalid in the batch answer are retried one by one
+# with the single-word functions above (which have their own fallbacks).
+
+BATCH_SIZE = 10
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _batch_chat(system_message, task, result_format, items, temperature=0):
+    """
+    Send `items` (list of dicts) in a single request.
+    Returns a dict mapping item index -> raw result dict (items absent from the answer are missing).
+    """
+    payload = [{"id": i, **item} for i, item in enumerate(items)]
+    prompt = f"""{task}
+
+    Items:
+    {json.dumps(payload, ensure_ascii=False)}
+
+    Return ONLY a JSON object with one result per item, in this format:
+    {{
+        "results": [{{"id": <item id>, {result_format}}}]
+    }}"""
+    try:
+        content = llm.chat(
+            [
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            response_format={"type": "json_object"}
+        )
+        results = json.loads(content).get("results", [])
+    except Exception as e:
+        print(f"Batch request error: {e}")
+        return {}
+
+    by_id = {}
+    for res in results:
+        if isinstance(res, dict) and isinstance(res.get("id"), int) and 0 <= res["id"] < len(items):
+            by_id[res["id"]] = res
+    return by_id
+
+def _is_text(value):
+    return isinstance(value, str) and value.strip() != ""
+
+def generate_example_sentence_pairs(words):
+    """
+    Batched `generate_example_sentence_pair`.
+    words: list of (french_word, thai_word). Returns a list of {"french", "thai"} in the same order.
+    """
+    pairs = []
+    for chunk in _chunks(words, BATCH_SIZE):
+        results = _batch_chat(
+            "You are a Thai-French linguistic expert.",
+            "For each item, generate a short, natural French example sentence using the French word "
+            "(meaning the Thai word), then provide the natural Thai translation of that sentence.",
+            '"french": "string", "thai": "string"',
+            [{"french_word": f, "thai_word": t} for f, t in chunk],
+            temperature=0.7
+        )
+        for i, (french_word, thai_word) in enumerate(chunk):
+            res = results.get(i)
+            if res and _is_text(res.get("french")) and _is_text(res.get("thai")):
+                pairs.append({"french": res["french"], "thai": res["thai"]})
+            else:
+                pairs.append(generate_example_sentence_pair(french_word, thai_word))
+    return pairs
+
+def translate_french_sentences(items):
+    """
+    Batched `translate_french_sentence`.
+    items: list of (french_word, thai_word, french_sentence). Returns the Thai translations in the same order.
+    """
+    translations = [""] * len(items)
+    to_translate = [i for i, item in enumerate(items) if item[2]]
+    for chunk in _chunks(to_translate, BATCH_SIZE):
+        results = _batch_chat(
+            "You are an expert French-to-Thai translator.",
+            "For each item, translate the French sentence into natural Thai. "
+            "You MUST use the provided Thai word to represent the French word.",
+            '"thai_translation": "string"',
+            [{"french_word": items[i][0], "thai_word": items[i][1], "french_sentence": items[i][2]} for i in chunk]
+        )
+        for j, i in enumerate(chunk):
+            res = results.get(j)
+            if res and _is_text(res.get("thai_translation")):
+                translations[i] = res["thai_translation"].replace('/ค่ะ','').replace('?','')
+            else:
+                translations[i] = translate_french_sentence(*items[i])
+    return translations
+
+def get_french_components_batch(words):
+    """
+    Batched `get_french_components`. Returns the components (or None) of each word, in the same order.
+    """
+    components = [None] * len(words)
+    candidates = []
+    for i, word in enumerate(words):
+        parts = find_compound_split(word)
+        if parts:
+            candidates.append((i, parts))
+
+    for chunk in _chunks(candidates, BATCH_SIZE):
+        results = _batch_chat(
+            "You are a Thai-French linguistic expert. You focus on literal component meanings.",
+            "For each Thai word and its components: "
+            "1. Is this a 'True Semantic Compound'? (Yes, if the components contribute to the meaning). "
+            "2. Provide the literal French translation for each component separately. "
+            "3. Provide the natural French translation for the whole word.",
+            '"is_true_compound": boolean, "component_translations": ["french_1", "french_2"], "full_word_french": "string"',
+            [{"word": words[i], "components": parts} for i, parts in chunk]
+        )
+        for j, (i, parts) in enumerate(chunk):
+            res = results.get(j) or {}
+            is_compound = res.get("is_true_compound")
+            translations = res.get("component_translations")
+            if is_compound is False:
+                continue
+            if (is_compound is True and isinstance(translations, list)
+                    and len(translations) == len(parts) and all(_is_text(t) for t in translations)):
+                components[i] = (parts, translations)
+            else:
+                components[i] = get_french_components(words[i])
+    return components
+
+def get_flashcard_infos_batch(entries):
+    """
+    Batched `get_flashcard_infos`.
+    entries: list of (thai_word, french_word, french_sentence). Returns the flashcard infos in the same order.
+    """
+    to_generate = [i for i, (_, _, sentence) in enumerate(entries) if not sentence]
+    to_translate = [i for i, (_, _, sentence) in enumerate(entries) if sentence]
+
+    sentences = {}
+    pairs = generate_example_sentence_pairs([(entries[i][1], entries[i][0]) for i in to_generate])
+    for i, pair in zip(to_generate, pairs):
+        sentences[i] = (pair.get("french", ""), pair.get("thai", ""))
+    translations = translate_french_sentences([(entries[i][1], entries[i][0], entries[i][2]) for i in to_translate])
+    for i, thai_sentence in zip(to_translate, translations):
+        sentences[i] = (entries[i][2], thai_sentence)
+
+    components = get_french_components_batch([thai for thai, _, _ in entries])
+
+    return [
+        build_flashcard_infos(thai, sentences[i][0], sentences[i][1], components[i])
+        for i, (thai, _, _) in enumerate(entries)
+    ]
+
+# ==========================================
+# 1c. Async Flashcard Generation
+# ==========================================
+# Same prompts and fallbacks as section 1, for the async views (async_views.py):
+# the LLM calls are awaited (llm.achat) and the local CPU-bound NLP runs in a
+# worker thread, so the event loop only ever waits on the network.
+
+async def agenerate_example_sentence_pair(french_word, thai_word):
+    try:
+        content = await llm.achat(
+            _sentence_pair_messages(french_word, thai_word),
+            temperature=0.7,
+            response_format={"type": "json_object"}
+        )
+        return json.loads(content)
+    except Exception as e:
+        print(f"Sentence generation error: {e}")
+        return _sentence_pair_fallback(french_word, thai_word)
+
+async def atranslate_french_sentence(french_word, thai_word, french_sentence):
+    if not french_sentence:
+        return ""
+
+    try:
+        content = await llm.achat(_translation_messages(french_word, thai_word, french_sentence), temperature=0)
+        return _clean_translation(content)
+    except Exception as e:
+        print(f"Translation error: {e}")
+        return ""
+
+async def aget_french_components(word):
+    best_parts = await asyncio.to_thread(find_compound_split, word)
+    if not best_parts:
+        return None
+
+    parts = tuple(best_parts)
+    cached = _cached_compound((word, parts))
+    if cached is not _MISSING:
+        return cached
+    try:
+        content = await llm.achat(_compound_messages(word, parts), temperature=0, response_format={"type": "json_object"})
+        return _remember_compound((word, parts), _parse_compound(content, parts))
+    except Exception as e:
+        return None
+
+async def _asentences(thai_word, french_word, french_sentence):
+    """(french_sentence, thai_sentence), generating the pair when no sentence is given."""
+    if not french_sentence:
+        pair = await agenerate_example_sentence_pair(french_word, thai_word)
+        return pair.get("french", ""), pair.get("thai", "")
+    return french_sentence, await atranslate_french_sentence(french_word, thai_word, french_sentence)
+
+async def aget_flashcard_infos(thai_word, french_word, french_sentence):
+    return await FLASHCARDS.arun(
+        (thai_word, french_word, french_sentence),
+        lambda: _agenerate_flashcard_infos(thai_word, french_word, french_sentence)
+    )
+
+async def _agenerate_flashcard_infos(thai_word, french_word, french_sentence):
+    # The sentence and the components do not depend on each other: both requests run at once
+    (french_sentence, thai_sentence), components = await asyncio.gather(
+        _asentences(thai_word, french_word, french_sentence),
+        aget_french_components(thai_word)
+    )
+    return await asyncio.to_thread(build_flashcard_infos, thai_word, french_sentence, thai_sentence, components)
+
+async def astream_flashcard_infos(thai_word, french_word, french_sentence):
+    """Async `stream_flashcard_infos`."""
+    async for step, fields in FLASHCARDS.astream(
+        (thai_word, french_word, french_sentence),
+        lambda: _astream_flashcard_infos(thai_word, french_word, french_sentence)
+    ):
+        yield step, fields
+
+async def _astream_flashcard_infos(thai_word, french_word, french_sentence):
+    infos = {}
+    sentences = asyncio.ensure_future(_asentences(thai_word, french_word, french_sentence))
+    components = asyncio.ensure_future(aget_french_components(thai_word))
+    try:
+        infos.update(await asyncio.to_thread(_word_fields, thai_word))
+        yield "word", dict(infos)
+
+        pending = {sentences, components}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is sentences:
+                    french_sentence, thai_sentence = task.result()
+                    fields = {"french_sentence": french_sentence, "thai_sentence": thai_sentence,
+                              **(await asyncio.to_thread(_sentence_fields, thai_sentence))}
+                    infos.update(fields)
+                    yield "sentence", fields
+                else:
+                    infos["components"] = task.result()
+                    yield "components", {"components": infos["components"]}
+    finally:
+        # The client went away: do not leave the LLM requests running
+        for task in (sentences, components):
+            task.cancel()
+
+    yield "done", infos
+
 # ==========================================
 # 2. Coordinates & Clustering
 # ==========================================
@@ -308,28 +714,174 @@ def apply_repulsion(coords, min_dist=0.15, iterations=100):
             break
     return new_coords
 
-def get_optimized_3d_coordinates(vectors_list):
+# Refits start UMAP from the stored layout (warm start): fewer epochs, and the
+# galaxy does not jump around after every add (see scripts/benchmark_umap_warm_start.py)
+WARM_START = os.environ.get('GALAXY_WARM_START', 'True') == 'True'
+WARM_START_EPOCHS = 50
+# Smaller steps from a good start: the existing words move less
+WARM_START_LEARNING_RATE = 0.25
+# A new word starts at the mean position of its nearest already-placed words
+WARM_START_NEIGHBOURS = 3
+
+def _placed_mask(previous):
+    """Rows of `previous` holding a stored position (new words are at the origin)."""
+    return np.linalg.norm(previous, axis=1) > 1e-6
+
+def seed_positions(vectors, previous):
+    """
+    Initial layout of a warm-started refit: the stored positions, and for the new
+    words the mean position of their nearest (cosine) placed neighbours.
+    """
+    vectors = np.asarray(vectors, dtype=float)
+    init = np.array(previous, dtype=float)
+    placed = _placed_mask(init)
+    if placed.all():
+        return init
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1, norms)
+    similarities = unit[~placed] @ unit[placed].T
+    k = min(WARM_START_NEIGHBOURS, int(placed.sum()))
+    nearest = np.argsort(-similarities, axis=1)[:, :k]
+    # Small deterministic jitter: new words sharing neighbours must not start on the same point
+    jitter = np.random.default_rng(42).normal(scale=1e-2, size=(len(nearest), 3))
+    init[~placed] = init[placed][nearest].mean(axis=1) + jitter
+    return init
+
+def align_to_previous(coords, previous):
+    """Rotate `coords` onto the previous layout (orthogonal Procrustes over the placed words)."""
+    from scipy.linalg import orthogonal_procrustes
+    previous = np.asarray(previous, dtype=float)
+    placed = _placed_mask(previous)
+    if placed.sum() < 3:
+        return coords
+    rotation, _ = orthogonal_procrustes(coords[placed], previous[placed])
+    return coords @ rotation
+
+def get_optimized_3d_coordinates(vectors_list, previous=None):
     """
-    High-level function: UMAP -> Normalization -> Repulsion
+    High-level function: 3D reduction -> Normalization -> Alignment -> Repulsion
+    previous: optional stored (x, y, z) of each vector ((0, 0, 0) for new words).
+    With enough stored positions UMAP is warm-started from them, and the result is
+    aligned to the previous layout either way.
     """
-    raw_coords = get_3d_coordinates(vectors_list)
+    init = n_epochs = None
+    learning_rate = 1.0
+    if previous is not None:
+        previous = np.asarray(previous, dtype=float)
+        placed = _placed_mask(previous)
+        # Warm start only when most of the galaxy already has a position
+        if WARM_START and placed.sum() >= max(3, len(previous) // 2):
+            init = seed_positions(vectors_list, previous)
+            n_epochs = WARM_START_EPOCHS
+            learning_rate = WARM_START_LEARNING_RATE
+
+    raw_coords = get_3d_coordinates(vectors_list, init=init, n_epochs=n_epochs, learning_rate=learning_rate)
     
     # 1. Normalize to unit sphere
     centered = raw_coords - np.mean(raw_coords, axis=0)
     norms = np.linalg.norm(centered, axis=1, keepdims=True)
     initial_sphere_coords = centered / np.where(norms == 0, 1, norms)
+
+    # 2. Keep the orientation of the previous layout
+    if previous is not None:
+        initial_sphere_coords = align_to_previous(initial_sphere_coords, previous)
     
-    # 2. Apply spacing optimization
+    # 3. Apply spacing optimization
     final_coords = apply_repulsion(initial_sphere_coords)
     
     return final_coords
 
-def get_3d_coordinates(vectors_list):
+# Reducer backend by vocabulary size (see scripts/benchmark_reducers.py):
+# - 'pca': exact PCA of the unit vectors (classical MDS of the cosine geometry),
+#   for galaxies too small for a UMAP neighbour graph;
+# - 'umap': PCA to PCA_DIMENSIONS, then UMAP;
+# - 'landmarks': UMAP fitted on a sample of LANDMARK_COUNT words, each other
+#   word placed at the distance-weighted mean of its nearest landmarks.
+PCA_MAX_WORDS = 30
+LANDMARKS_MIN_WORDS = 3000
+LANDMARK_COUNT = 2000
+LANDMARK_NEIGHBOURS = 5
+PCA_DIMENSIONS = 50
+
+def choose_reducer(n_words):
+    if n_words <= PCA_MAX_WORDS:
+        return 'pca'
+    if n_words >= LANDMARKS_MIN_WORDS:
+        return 'landmarks'
+    return 'umap'
+
+def _unit_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def _pca(unit_vectors, n_components):
+    """Principal components of the rows (SVD), padded with zeros when there are fewer."""
+    centered = unit_vectors - unit_vectors.mean(axis=0)
+    u, s, _ = np.linalg.svd(centered, full_matrices=False)
+    projected = u[:, :n_components] * s[:n_components]
+    if projected.shape[1] < n_components:
+        projected = np.pad(projected, ((0, 0), (0, n_components - projected.shape[1])))
+    return projected
+
+def _umap(vectors, init=None, n_epochs=None, learning_rate=1.0):
     import umap
-    # Vectors list should be a list of lists or numpy array
-    reducer = umap.UMAP(n_neighbors=15, n_components=3, min_dist=0.1, metric='cosine', random_state=42)
-    embeddings_3d = reducer.fit_transform(vectors_list)
-    return embeddings_3d
+    reducer = umap.UMAP(
+        n_neighbors=min(15, len(vectors) - 1), n_components=3, min_dist=0.1, metric='euclidean',
+        random_state=42, init=init if init is not None else 'spectral',
+        n_epochs=n_epochs, learning_rate=learning_rate
+    )
+    return reducer.fit_transform(vectors)
+
+def _interpolate_from_landmarks(vectors, landmark_vectors, landmark_coords, chunk_size=4096):
+    """Place each vector at the inverse-distance weighted mean of its nearest landmarks."""
+    k = min(LANDMARK_NEIGHBOURS, len(landmark_vectors))
+    landmark_sq = (landmark_vectors ** 2).sum(axis=1)
+    coords = np.empty((len(vectors), 3), dtype=landmark_coords.dtype)
+    for start in range(0, len(vectors), chunk_size):
+        chunk = vectors[start:start + chunk_size]
+        sq_dist = (chunk ** 2).sum(axis=1)[:, None] - 2 * chunk @ landmark_vectors.T + landmark_sq
+        nearest = np.argpartition(sq_dist, k - 1, axis=1)[:, :k]
+        dist = np.sqrt(np.maximum(np.take_along_axis(sq_dist, nearest, axis=1), 0))
+        weights = 1.0 / (dist + 1e-6)
+        weights /= weights.sum(axis=1, keepdims=True)
+        coords[start:start + chunk_size] = (landmark_coords[nearest] * weights[:, :, None]).sum(axis=1)
+    return coords
+
+def get_3d_coordinates(vectors_list, init=None, n_epochs=None, learning_rate=1.0, method=None):
+    """
+    Reduce the word vectors to 3D with the backend suited to their number
+    (`method` forces one, see choose_reducer).
+    `init`: optional initial layout (n, 3) instead of the spectral one;
+    `n_epochs`: optional number of optimization epochs (UMAP picks otherwise).
+    Cosine geometry throughout: the vectors are normalized first, Euclidean
+    distances between unit vectors then order like cosine distances.
+    """
+    unit = _unit_rows(vectors_list)
+    method = method or choose_reducer(len(unit))
+    if method == 'pca':
+        return _pca(unit, 3)
+
+    if unit.shape[1] > PCA_DIMENSIONS and len(unit) > PCA_DIMENSIONS:
+        from sklearn.decomposition import PCA
+        unit = PCA(n_components=PCA_DIMENSIONS, random_state=42).fit_transform(unit)
+
+    if method == 'umap':
+        return _umap(unit, init, n_epochs, learning_rate)
+
+    # Landmarks: fit on a fixed random sample, then interpolate the other words
+    n_words = len(unit)
+    order = np.random.default_rng(42).permutation(n_words)
+    landmarks, others = order[:LANDMARK_COUNT], order[LANDMARK_COUNT:]
+    landmark_coords = _umap(
+        unit[landmarks], None if init is None else np.asarray(init)[landmarks], n_epochs, learning_rate
+    )
+    coords = np.empty((n_words, 3), dtype=landmark_coords.dtype)
+    coords[landmarks] = landmark_coords
+    if len(others):
+        coords[others] = _interpolate_from_landmarks(unit[others], unit[landmarks], landmark_coords)
+    return coords
 
 def get_cluster_label(words_list):
     words_str = ", ".join(words_list)
@@ -338,24 +890,24 @@ def get_cluster_label(words_list):
     Output ONLY the category name.
     """
     try:
-        response = client.chat.completions.create(
-            model="typhoon-v2.5-30b-a3b-instruct",
-            messages=[
+        content = llm.chat(
+            [
                 {"role": "system", "content": "You are a linguist assistant. You categorize groups of words accurately."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.1,
+            temperature=0.1
         )
-        return response.choices[0].message.content.strip()
+        return content.strip()
     except Exception:
         return "Unknown Category"
 
 
-def get_word_vector(word_obj):
+def get_word_vector(word_obj, save=True):
     """
     Get the vector for a Word object.
     1. If word_obj.vector is set and valid, return it.
     2. Otherwise, load the model, get the vector, save it to word_obj, and return it.
+    With save=False it is only set on word_obj, for the caller to save in bulk.
     """
     if word_obj.vector and isinstance(word_obj.vector, list) and len(word_obj.vector) > 0:
         return np.array(word_obj.vector)
@@ -365,16 +917,48 @@ def get_word_vector(word_obj):
         vec = th_model.get_vector(word_obj.thai)
         # Convert to list for JSON storage
         word_obj.vector = vec.tolist()
-        word_obj.save(update_fields=['vector'])
+        if save:
+            word_obj.save(update_fields=['vector'])
         return vec
     return None
 
+# Neighbours kept per word in the quiz distractor table (models.WordNeighbour)
+QUIZ_NEIGHBOURS = 8
+
+def nearest_neighbours(vectors, k, chunk_size=2048):
+    """Indices of the k nearest (cosine) other rows of each row of `vectors`, closest first."""
+    unit = _unit_rows(vectors)
+    k = min(k, len(unit) - 1)
+    nearest = np.empty((len(unit), k), dtype=np.int64)
+    for start in range(0, len(unit), chunk_size):
+        similarities = unit[start:start + chunk_size] @ unit.T
+        rows = np.arange(len(similarities))
+        similarities[rows, start + rows] = -np.inf
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(similarities, top, axis=1), axis=1)
+        nearest[start:start + chunk_size] = np.take_along_axis(top, order, axis=1)
+    return nearest
+
+# Default cut of the ward tree, as a fraction of its height
+CLUSTER_THRESHOLD_RATIO = 0.65
+
 def auto_clustering(words_list, existing_vectors=None):
     """
     words_list: List of word strings.
     existing_vectors: Optional dict mapping word_string -> vector (numpy array).
                       If provided, we use these instead of fetching again.
     """
+    word_to_cluster, cluster_labels, _ = hierarchical_clustering(words_list, existing_vectors)
+    return word_to_cluster, cluster_labels
+
+def hierarchical_clustering(words_list, existing_vectors=None):
+    """
+    auto_clustering, also returning the ward tree for later re-cuts (cluster_tree.py):
+    (word_to_cluster, cluster_labels, tree), tree being (valid_words, Z, node_labels)
+    with node_labels mapping the tree node of each default cluster to its label
+    (None when there are too few words for a tree).
+    """
+    from scipy.cluster.hierarchy import linkage, fcluster, leaders
     th_model = get_thai_model()
     
     # Filter valid words & Collect vectors
@@ -392,17 +976,17 @@ def auto_clustering(words_list, existing_vectors=None):
             vectors.append(th_model.get_vector(w))
 
     if not valid_words:
-        return {}, {}
+        return {}, {}, None
 
     vectors = np.array(vectors)
     
     if len(vectors) < 2:
          # Not enough data to cluster
-         return {w: 1 for w in valid_words}, {1: "General"}
+         return {w: 1 for w in valid_words}, {1: "General"}, None
 
     Z = linkage(vectors, method='ward')
     max_dist = np.max(Z[:, 2])
-    threshold = 0.65 * max_dist
+    threshold = CLUSTER_THRESHOLD_RATIO * max_dist
     clusters = fcluster(Z, t=threshold, criterion='distance')
 
     category_groups = {}
@@ -417,38 +1001,44 @@ def auto_clustering(words_list, existing_vectors=None):
         cluster_labels[int(cluster_id)] = label
 
     word_to_cluster = {word: int(cluster_id) for word, cluster_id in zip(valid_words, clusters)}
+
+    nodes, cluster_ids = leaders(Z, clusters)
+    node_labels = {int(node): cluster_labels[int(c)] for node, c in zip(nodes, cluster_ids)}
     
-    return word_to_cluster, cluster_labels
+    return word_to_cluster, cluster_labels, (valid_words, Z, node_labels)
 
 # ==========================================
 # 3. Suggestions
 # ==========================================
 
-def translate_thai_words_to_french(words):
-    """Batch translate a list of Thai words to French using the LLM."""
-    if not words:
-        return {}
+def _word_translation_messages(words):
     words_str = ", ".join(words)
     prompt = f"""Translate each of these Thai words to French. Return ONLY a JSON object mapping each Thai word to its French translation.
 Words: {words_str}
 
 Example format: {{"น้ำ": "eau", "ไฟ": "feu"}}"""
+    return [
+        {"role": "system", "content": "You are a Thai-French translator. Return only JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+def translate_thai_words_to_french(words):
+    """Batch translate a list of Thai words to French using the LLM."""
+    if not words:
+        return {}
     try:
-        response = client.chat.completions.create(
-            model="typhoon-v2.5-30b-a3b-instruct",
-            messages=[
-                {"role": "system", "content": "You are a Thai-French translator. Return only JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        content = llm.chat(
+            _word_translation_messages(words),
             temperature=0,
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)
+        return json.loads(content)
     except Exception as e:
         print(f"Batch translation error: {e}")
         return {}
 
-def suggest_new_words(vocab_list):
+def _suggestion_candidates(vocab_list):
+    """Nearest thai2fit words of the vocabulary (local part of the suggestions)."""
     th_model = get_thai_model()
     
     # Filter existing vocab in model
@@ -468,7 +1058,11 @@ def suggest_new_words(vocab_list):
         
         if len(suggestions) >= 10:
             break
-    
+    return suggestions
+
+def suggest_new_words(vocab_list):
+    suggestions = _suggestion_candidates(vocab_list)
+
     # Batch translate all suggested words
     if suggestions:
         words_to_translate = [s["word"] for s in suggestions]
@@ -478,3 +1072,26 @@ def suggest_new_words(vocab_list):
             
     return suggestions
 
+async def atranslate_thai_words_to_french(words):
+    if not words:
+        return {}
+    try:
+        content = await llm.achat(
+            _word_translation_messages(words),
+            temperature=0,
+            response_format={"type": "json_object"}
+        )
+        return json.loads(content)
+    except Exception as e:
+        print(f"Batch translation error: {e}")
+        return {}
+
+async def asuggest_new_words(vocab_list):
+    """Async `suggest_new_words`."""
+    suggestions = await asyncio.to_thread(_suggestion_candidates, vocab_list)
+    if suggestions:
+        translations = await atranslate_thai_words_to_french([s["word"] for s in suggestions])
+        for s in suggestions:
+            s["french"] = translations.get(s["word"], "")
+    return suggestions
+
@@ -0,0 +1,402 @@
+"""
+Single-flight deduplication of identical work in flight.
+
+`SingleFlight` groups identical calls (same key) so that only one of them runs
+and the others share its result:
+- within a process, callers of a key already running wait for that call
+  (threads: `run`/`stream`, coroutines: `arun`/`astream`);
+- across the gunicorn workers, the running call holds a file lock on the key
+  and stores its result: a worker that was waiting for the lock (or asks for
+  the same key at most `ttl` seconds after the result was stored) finds it
+  instead of computing it again. It is not a cache: a later call computes again.
+Used for the flashcard generation of Preview/AddWord (double clicks, several
+users adding the same new word). A result the `shareable` predicate rejects
+(e.g. a fallback after an LLM failure) is only given to the in-process waiters,
+never stored.
+
+`Coalescer` serializes a recomputation per key across threads and workers, and
+skips it when another one started after it was requested (its result already
+covers the request). Used for the per-user galaxy recompute.
+
+`stats()` reports how many calls were collapsed (the details are logged at
+debug level).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-worker locking (Windows dev server): in-process deduplication only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_DIR = os.environ.get(
+    'SINGLE_FLIGHT_DIR',
+    os.path.join(os.path.dirname(__file__), 'data', 'single_flight')
+)
+# How long a call waits for the lock held by another worker before running anyway
+LOCK_TIMEOUT = 60
+LOCK_POLL_INTERVAL = 0.05
+# Stored results and lock files are pruned every PRUNE_EVERY stores
+PRUNE_EVERY = 200
+STALE_LOCK_AGE = 3600
+
+_GROUPS = {}
+_MISSING = object()
+
+
+def _digest(key):
+    return hashlib.sha1(json.dumps(key, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _path(name, digest, ext):
+    return os.path.join(SINGLE_FLIGHT_DIR, f"{name}-{digest}.{ext}")
+
+
+@contextmanager
+def _file_lock(path, timeout=LOCK_TIMEOUT):
+    """Exclusive lock on `path` across processes (and threads: one open file each)."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(SINGLE_FLIGHT_DIR, exist_ok=True)
+    with open(path, 'a') as f:
+        deadline = time.monotonic() + timeout
+        locked = False
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    logger.warning("Single-flight: gave up waiting for %s", os.path.basename(path))
+                    break
+                time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            if locked:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_stamped(path, fresh_after):
+    """The value stored at `path` if it was computed after `fresh_after`, else _MISSING."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return _MISSING
+    return stored['value'] if stored.get('at', 0) >= fresh_after else _MISSING
+
+
+def _write_stamped(path, value, at):
+    os.makedirs(SINGLE_FLIGHT_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'at': at, 'value': value}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _prune(name, ttl):
+    """Remove the expired results of group `name`, and its lock files unused for an hour."""
+    now = time.time()
+    try:
+        entries = list(os.scandir(SINGLE_FLIGHT_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        if not entry.name.startswith(f"{name}-"):
+            continue
+        try:
+            age = now - entry.stat().st_mtime
+            if (entry.name.endswith('.json') and age > ttl) or age > STALE_LOCK_AGE:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    ttl: seconds after it was stored during which a result is shared with the
+    calls of other workers (those waiting for the lock get it right away).
+    shareable: optional predicate (key, result) -> bool, False for a result that
+    must not be shared across workers.
+    """
+    def __init__(self, name, ttl=5, shareable=None):
+        self.name = name
+        self.ttl = ttl
+        self.shareable = shareable
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.collapsed = 0
+        self.shared = 0
+        self.unshared = 0
+        self._stores = 0
+        _GROUPS[name] = self
+
+    def _count(self, collapsed=False, shared=False):
+        with self._lock:
+            self.calls += 1
+            self.collapsed += collapsed or shared
+            self.shared += shared
+        if collapsed or shared:
+            logger.debug("Single-flight %s: result of %s reused", self.name,
+                         "another worker's call" if shared else "an identical call in flight")
+
+    def _shared_result(self, digest, requested_at):
+        """The result another worker stored after this call was made (or at most ttl seconds before)."""
+        return _read_stamped(_path(self.name, digest, 'json'), requested_at - self.ttl)
+
+    def _store(self, key, digest, result):
+        if self.shareable is not None and not self.shareable(key, result):
+            with self._lock:
+                self.unshared += 1
+            logger.debug("Single-flight %s: degraded result not stored", self.name)
+            return
+        try:
+            # Dated when stored: the calls waiting for the lock were all made before
+            _write_stamped(_path(self.name, digest, 'json'), result, time.time())
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Single-flight %s: could not store the result: %s", self.name, e)
+        with self._lock:
+            self._stores += 1
+            prune = self._stores % PRUNE_EVERY == 0
+        if prune:
+            _prune(self.name, self.ttl)
+
+    def _compute(self, key, digest, fn):
+        """Leader: fn() under the cross-worker lock, unless another worker just computed it."""
+        requested_at = time.time()
+        with _file_lock(_path(self.name, digest, 'lock')):
+            result = self._shared_result(digest, requested_at)
+            if result is not _MISSING:
+                return result, True
+            result = fn()
+            self._store(key, digest, result)
+            return result, False
+
+    def run(self, key, fn):
+        """fn() once for all the concurrent callers of `key`."""
+        digest = _digest(key)
+        with self._lock:
+            call = self._calls.get(digest)
+            leader = call is None
+            if leader:
+                call = self._calls[digest] = _Call()
+
+        if not leader:
+            call.done.wait()
+            self._count(collapsed=True)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result, shared = self._compute(key, digest, fn)
+            self._count(shared=shared)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[digest]
+            call.done.set()
+
+    def stream(self, key, events):
+        """
+        Single-flight of a (step, fields) event generator ending with ("done", result),
+        like services.stream_flashcard_infos: the leader streams every event,
+        the callers it collapsed only get ("done", result).
+        """
+        digest = _digest(key)
+        with self._lock:
+            call = self._calls.get(digest)
+            leader = call is None
+            if leader:
+                call = self._calls[digest] = _Call()
+
+        if not leader:
+            call.done.wait()
+            self._count(collapsed=True)
+            if call.error is not None:
+                raise call.error
+            yield "done", call.result
+            return
+
+        requested_at = time.time()
+        try:
+            with _file_lock(_path(self.name, digest, 'lock')):
+                result = self._shared_result(digest, requested_at)
+                if result is not _MISSING:
+                    call.result = result
+                    self._count(shared=True)
+                    yield "done", result
+                    return
+                for step, fields in events():
+                    if step == "done":
+                        call.result = fields
+                        self._store(key, digest, fields)
+                    yield step, fields
+                self._count()
+        except BaseException as e:
+            call.error = e if isinstance(e, Exception) else RuntimeError("Leader call interrupted")
+            raise
+        finally:
+            with self._lock:
+                del self._calls[digest]
+            call.done.set()
+
+    # Async variants: coroutines of the same event loop share one future per key,
+    # the cross-worker lock is waited for in a thread.
+
+    def _async_join(self, digest):
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+        future = calls.get(digest)
+        if future is not None:
+            return False, future
+        future = calls[digest] = loop.create_future()
+        return True, future
+
+    def _async_release(self, digest):
+        calls = self._async_calls.get(asyncio.get_running_loop(), {})
+        calls.pop(digest, None)
+
+    async def arun(self, key, afn):
+        """Async `run`: await afn() once for all the concurrent callers of `key`."""
+        digest = _digest(key)
+        leader, future = self._async_join(digest)
+        if not leader:
+            result = await asyncio.shield(future)
+            self._count(collapsed=True)
+            return result
+
+        requested_at = time.time()
+        lock = _file_lock(_path(self.name, digest, 'lock'))
+        try:
+            await asyncio.to_thread(lock.__enter__)
+            try:
+                result = await asyncio.to_thread(self._shared_result, digest, requested_at)
+                shared = result is not _MISSING
+                if not shared:
+                    result = await afn()
+                    await asyncio.to_thread(self._store, key, digest, result)
+            finally:
+                await asyncio.to_thread(lock.__exit__, None, None, None)
+            self._count(shared=shared)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e if isinstance(e, Exception) else RuntimeError("Leader call cancelled"))
+                # Retrieved by the followers, if any: no "exception never retrieved" warning
+                future.exception()
+            raise
+        finally:
+            self._async_release(digest)
+
+    async def astream(self, key, events):
+        """Async `stream`, `events` being an async generator function."""
+        digest = _digest(key)
+        leader, future = self._async_join(digest)
+        if not leader:
+            result = await asyncio.shield(future)
+            self._count(collapsed=True)
+            yield "done", result
+            return
+
+        requested_at = time.time()
+        lock = _file_lock(_path(self.name, digest, 'lock'))
+        try:
+            await asyncio.to_thread(lock.__enter__)
+            try:
+                result = await asyncio.to_thread(self._shared_result, digest, requested_at)
+                if result is not _MISSING:
+                    self._count(shared=True)
+                    future.set_result(result)
+                    yield "done", result
+                    return
+                async for step, fields in events():
+                    if step == "done":
+                        await asyncio.to_thread(self._store, key, digest, fields)
+                        future.set_result(fields)
+                    yield step, fields
+                self._count()
+            finally:
+                await asyncio.to_thread(lock.__exit__, None, None, None)
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e if isinstance(e, Exception) else RuntimeError("Leader call cancelled"))
+                future.exception()
+            raise
+        finally:
+            self._async_release(digest)
+
+
+class Coalescer:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.collapsed = 0
+        self._lock = threading.Lock()
+        _GROUPS[name] = self
+
+    def run(self, key, fn, since=None):
+        """
+        fn() unless a run for `key` started after this call was made (and has
+        completed: runs are serialized), in which case its result covers this call.
+        since: when the data fn() works on was read, if before this call (a result
+        computed earlier and only written by fn): the run is then dated from it.
+        Returns True if fn() ran.
+        """
+        requested_at = time.time() if since is None else since
+        digest = _digest(key)
+        with _file_lock(_path(self.name, digest, 'lock'), timeout=LOCK_TIMEOUT * 2):
+            stamp_path = _path(self.name, digest, 'json')
+            collapsed = _read_stamped(stamp_path, requested_at) is not _MISSING
+            if not collapsed:
+                started = time.time() if since is None else since
+                fn()
+                _write_stamped(stamp_path, True, started)
+        with self._lock:
+            self.calls += 1
+            self.collapsed += collapsed
+        if collapsed:
+            logger.debug("Single-flight %s: covered by a run started after the request", self.name)
+        return not collapsed
+
+
+def stats():
+    """
+    {group name: {"calls", "collapsed", "collapse_rate"}} for this process, plus
+    for the SingleFlight groups "shared" (results of another worker) and
+    "unshared" (degraded results not stored).
+    """
+    return {
+        name: {
+            "calls": group.calls,
+            "collapsed": group.collapsed,
+            "collapse_rate": group.collapsed / group.calls if group.calls else 0.0,
+            **({"shared": group.shared, "unshared": group.unshared} if isinstance(group, SingleFlight) else {}),
+        }
+        for name, group in _GROUPS.items()
+    }
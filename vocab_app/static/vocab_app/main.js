@@ -1,5 +1,5 @@
 import { GalaxyRenderer } from './renderer.js';
-import { fetchMapData } from './modules/api.js';
+import { fetchMapData, fetchGuestGalaxy } from './modules/api.js';
 import { initFilters, filterByComponent, clearComponentFilter, updateClusterDropdown } from './modules/filters.js';
 import { showFlashcard } from './modules/flashcard.js';
 import { loadSuggestions } from './modules/suggestions.js';
@@ -24,12 +24,16 @@ document.addEventListener('DOMContentLoaded', async () => {
     // However, showFlashcard needs allWords. renderer.onWordClick passes wordInfo.
     renderer.onWordClick = (wordInfo) => showFlashcard(wordInfo, allWords, refreshMap);
 
-    await refreshMap();
+    if (isGuest) {
+        await loadGuestGalaxy();
+    } else {
+        await refreshMap();
+    }
 
     // Initialize modules
     initFilters(renderer, () => allWords);
     setupAddWordListeners(refreshMap);
-    setupQuizListeners(() => allWords);
+    setupQuizListeners();
 
     // Initial setups
     setupGlobalModals();
@@ -75,6 +79,24 @@ async function refreshMap(newData = null) {
     }
 }
 
+// Guests load the precompressed static galaxy: the slim geometry draws the
+// galaxy first, the full details (flashcards) replace it when they arrive.
+async function loadGuestGalaxy() {
+    const urls = JSON.parse(document.getElementById('guest-galaxy-urls').textContent);
+    if (!urls || !urls.full) {
+        await refreshMap();
+        return;
+    }
+    const details = fetchGuestGalaxy(urls.full);
+    try {
+        if (urls.geometry) await refreshMap(await fetchGuestGalaxy(urls.geometry));
+        await refreshMap(await details);
+    } catch (err) {
+        console.error("Failed to fetch the guest galaxy, falling back to the API:", err);
+        await refreshMap();
+    }
+}
+
 function setupGlobalModals() {
     // Modal closing logic
     window.closeModal = (id) => {
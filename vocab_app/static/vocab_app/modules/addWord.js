@@ -1,7 +1,17 @@
-import { fetchPreviewWord, postAddWord } from './api.js';
+import { streamPreviewWord, streamAddWord } from './api.js';
 
 let cachedPreviewData = null;
 
+// Review inputs filled by the preview stream, by flashcard field
+const REVIEW_FIELDS = {
+    romanization: 'review-romanization',
+    word_type: 'review-word-type',
+    french_sentence: 'review-french-sentence',
+    thai_sentence: 'review-thai-sentence',
+    sentence_romanization: 'review-sentence-romanization'
+};
+const COMPONENT_FIELDS = ['review-components-parts', 'review-components-trans'];
+
 export function setupAddWordListeners(refreshCallback) {
     document.getElementById('btn-add-word').onclick = () => {
         resetAddWordModal();
@@ -10,6 +20,12 @@ export function setupAddWordListeners(refreshCallback) {
     document.getElementById('btn-generate-preview').onclick = handleGeneratePreview;
     document.getElementById('btn-confirm-add').onclick = () => handleConfirmAdd(refreshCallback);
     document.getElementById('btn-back-to-input').onclick = showInputStep;
+
+    // A field edited by the user is never overwritten by a late streamed value
+    [...Object.values(REVIEW_FIELDS), ...COMPONENT_FIELDS].forEach(id => {
+        const input = document.getElementById(id);
+        input.addEventListener('input', () => { input.dataset.edited = '1'; });
+    });
 }
 
 function resetAddWordModal() {
@@ -30,38 +46,66 @@ function showReviewStep() {
     document.getElementById('add-step-review').classList.remove('hidden');
 }
 
+function resetReviewFields() {
+    [...Object.values(REVIEW_FIELDS), ...COMPONENT_FIELDS].forEach(id => {
+        const input = document.getElementById(id);
+        input.value = '';
+        delete input.dataset.edited;
+        input.classList.add('pending');
+    });
+}
+
+function setReviewField(id, value) {
+    const input = document.getElementById(id);
+    input.classList.remove('pending');
+    if (!input.dataset.edited) input.value = value;
+}
+
+// Fills the review inputs with the flashcard fields received so far
+function fillReviewFields(fields) {
+    Object.entries(REVIEW_FIELDS).forEach(([field, id]) => {
+        if (field in fields) setReviewField(id, fields[field] || '');
+    });
+    if ('components' in fields) {
+        const comps = fields.components || [[], []];
+        setReviewField(COMPONENT_FIELDS[0], (comps[0] || []).join(', '));
+        setReviewField(COMPONENT_FIELDS[1], (comps[1] || []).join(', '));
+    }
+}
+
 async function handleGeneratePreview() {
     const thai = document.getElementById('add-thai').value;
     const french = document.getElementById('add-french').value;
     const sentence = document.getElementById('add-sentence').value;
     const btn = document.getElementById('btn-generate-preview');
+    const confirmBtn = document.getElementById('btn-confirm-add');
 
     if (!thai || !french) return alert("Thai and French words are required");
 
     btn.disabled = true;
     btn.textContent = "Generating...";
+    confirmBtn.disabled = true;
+    cachedPreviewData = {};
+    resetReviewFields();
 
     try {
-        cachedPreviewData = await fetchPreviewWord({ thai, french, sentence });
-
-        // Populate editable review fields
-        document.getElementById('review-romanization').value = cachedPreviewData.romanization || '';
-        document.getElementById('review-word-type').value = cachedPreviewData.word_type || '';
-        document.getElementById('review-french-sentence').value = cachedPreviewData.french_sentence || '';
-        document.getElementById('review-thai-sentence').value = cachedPreviewData.thai_sentence || '';
-        document.getElementById('review-sentence-romanization').value = cachedPreviewData.sentence_romanization || '';
-
-        const comps = cachedPreviewData.components || [[], []];
-        document.getElementById('review-components-parts').value = (comps[0] || []).join(', ');
-        document.getElementById('review-components-trans').value = (comps[1] || []).join(', ');
-
+        // Each part of the flashcard is shown as soon as the server has it
+        cachedPreviewData = await streamPreviewWord({ thai, french, sentence }, (event, fields) => {
+            if (event === 'done') return;
+            Object.assign(cachedPreviewData, fields);
+            fillReviewFields(fields);
+            showReviewStep();
+        });
+        fillReviewFields(cachedPreviewData);
         showReviewStep();
     } catch (err) {
         console.error(err);
         alert(err.message || "Error generating preview");
+        showInputStep();
     } finally {
         btn.disabled = false;
         btn.textContent = "Generate Info";
+        confirmBtn.disabled = false;
     }
 }
 
@@ -88,7 +132,14 @@ async function handleConfirmAdd(refreshCallback) {
     btn.textContent = "Saving...";
 
     try {
-        await postAddWord({ thai, french, sentence, flashcard_infos });
+        // The modal closes as soon as the word is stored; the galaxy is
+        // refreshed once the server has placed it
+        await streamAddWord({ thai, french, sentence, flashcard_infos }, (event) => {
+            if (event === 'saved') {
+                document.getElementById('modal-add-word').style.display = 'none';
+                resetAddWordModal();
+            }
+        });
         document.getElementById('modal-add-word').style.display = 'none';
         resetAddWordModal();
         if (refreshCallback) await refreshCallback();
@@ -6,6 +6,29 @@ export async function fetchMapData() {
     return await response.json();
 }
 
+// Static, content-hashed guest galaxy artifact (see export_guest_galaxy)
+export async function fetchGuestGalaxy(url) {
+    const response = await fetch(url);
+    if (!response.ok) throw new Error('Failed to fetch guest galaxy');
+    return await response.json();
+}
+
+export async function fetchFilteredIds(filters) {
+    const params = new URLSearchParams({
+        cluster: filters.cluster,
+        type: filters.type,
+        add_date: filters.addDate,
+        review_date: filters.reviewDate,
+        srs_level: filters.srsLevel,
+        search: filters.search || ''
+    });
+    if (filters.component) params.set('component', filters.component);
+    const response = await fetch(`/filter-words/?${params}`);
+    if (!response.ok) throw new Error('Failed to filter words');
+    const data = await response.json();
+    return data.ids;
+}
+
 export async function fetchPreviewWord(data) {
     const response = await fetch('/preview-word/', {
         method: 'POST',
@@ -22,6 +45,60 @@ export async function fetchPreviewWord(data) {
     return await response.json();
 }
 
+// POSTs `data` to a server-sent events endpoint and calls onEvent(event, data)
+// for each event as it arrives. Resolves with the data of the final "done" event.
+async function postEventStream(url, data, onEvent, errorMessage) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCookie('csrftoken')
+        },
+        body: JSON.stringify(data)
+    });
+    if (!response.ok || !response.body) {
+        const err = await response.json().catch(() => ({}));
+        throw new Error(err.error || errorMessage);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let end;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            let event = 'message';
+            let payload = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) payload += line.slice(6);
+            });
+            const eventData = payload ? JSON.parse(payload) : null;
+            if (event === 'error') throw new Error(eventData?.error || errorMessage);
+            if (event === 'done') result = eventData;
+            onEvent(event, eventData);
+        }
+    }
+    if (result === null) throw new Error(errorMessage);
+    return result;
+}
+
+export function streamPreviewWord(data, onEvent) {
+    return postEventStream('/preview-word/stream/', data, onEvent, "Failed to generate info");
+}
+
+export function streamAddWord(data, onEvent) {
+    return postEventStream('/add-word/stream/', data, onEvent, "Failed to add word");
+}
+
 export async function postAddWord(data) {
     const response = await fetch('/add-word/', {
         method: 'POST',
@@ -50,6 +127,12 @@ export async function fetchQuizWords(count) {
     return await response.json();
 }
 
+export async function fetchQuizSession(count) {
+    const response = await fetch(`/quiz-session/?count=${count}`);
+    if (!response.ok) throw new Error('Failed to fetch quiz session');
+    return await response.json();
+}
+
 export async function submitQuizResult(data) {
     const response = await fetch('/submit-quiz/', {
         method: 'POST',
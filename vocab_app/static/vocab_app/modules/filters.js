@@ -1,5 +1,13 @@
+import { fetchFilteredIds } from './api.js';
+
 export let activeComponentFilter = null;
 
+// Above this many words, filtering is answered by the server (/filter-words/)
+const SERVER_FILTER_MIN_WORDS = 5000;
+const SEARCH_DEBOUNCE_MS = 150;
+let serverRequestId = 0;
+let searchTimer = null;
+
 export function initFilters(renderer, getAllWords) {
     const clusterSelect = document.getElementById('cluster-filter');
     const typeSelect = document.getElementById('type-filter');
@@ -8,29 +16,57 @@ export function initFilters(renderer, getAllWords) {
     const srsLevelSelect = document.getElementById('srs-level-filter');
     const searchInput = document.getElementById('search-input');
 
-    const update = () => {
-        const allWords = getAllWords();
-        renderer.updateData(allWords, {
-            cluster: clusterSelect.value,
-            type: typeSelect.value,
-            addDate: addDateSelect.value,
-            reviewDate: reviewDateSelect.value,
-            srsLevel: srsLevelSelect.value,
-            component: activeComponentFilter,
-            search: searchInput.value.toLowerCase()
-        });
-    };
+    const update = () => applyFilters(renderer, getAllWords());
 
     clusterSelect.onchange = update;
     typeSelect.onchange = update;
     addDateSelect.onchange = update;
     reviewDateSelect.onchange = update;
     srsLevelSelect.onchange = update;
-    searchInput.oninput = update;
+    searchInput.oninput = () => {
+        if (!useServerFiltering(getAllWords())) return update();
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(update, SEARCH_DEBOUNCE_MS);
+    };
 
     return update; // Return update function if needed elsewhere
 }
 
+function currentFilters() {
+    return {
+        cluster: document.getElementById('cluster-filter').value,
+        type: document.getElementById('type-filter').value,
+        addDate: document.getElementById('add-date-filter').value,
+        reviewDate: document.getElementById('review-date-filter').value,
+        srsLevel: document.getElementById('srs-level-filter').value,
+        component: activeComponentFilter,
+        search: document.getElementById('search-input').value.toLowerCase()
+    };
+}
+
+function useServerFiltering(allWords) {
+    const isGuest = JSON.parse(document.getElementById('is-guest').textContent);
+    return !isGuest && allWords.length >= SERVER_FILTER_MIN_WORDS;
+}
+
+async function applyFilters(renderer, allWords) {
+    const filters = currentFilters();
+    if (!useServerFiltering(allWords)) {
+        renderer.updateData(allWords, filters);
+        return;
+    }
+
+    // Only the latest request may update the galaxy
+    const requestId = ++serverRequestId;
+    try {
+        const ids = await fetchFilteredIds(filters);
+        if (requestId === serverRequestId) renderer.showIds(allWords, ids);
+    } catch (err) {
+        console.error("Server filtering failed, filtering locally:", err);
+        if (requestId === serverRequestId) renderer.updateData(allWords, filters);
+    }
+}
+
 export function filterByComponent(component, renderer, allWords) {
     activeComponentFilter = component;
     document.getElementById('modal-flashcard').style.display = 'none'; // Close flashcard
@@ -42,32 +78,13 @@ export function filterByComponent(component, renderer, allWords) {
     banner.classList.remove('hidden');
 
     // Apply filter
-    triggerUpdate(renderer, allWords);
+    applyFilters(renderer, allWords);
 }
 
 export function clearComponentFilter(renderer, allWords) {
     activeComponentFilter = null;
     document.getElementById('component-filter-banner').classList.add('hidden');
-    triggerUpdate(renderer, allWords);
-}
-
-function triggerUpdate(renderer, allWords) {
-    const clusterSelect = document.getElementById('cluster-filter');
-    const typeSelect = document.getElementById('type-filter');
-    const addDateSelect = document.getElementById('add-date-filter');
-    const reviewDateSelect = document.getElementById('review-date-filter');
-    const srsLevelSelect = document.getElementById('srs-level-filter');
-    const searchInput = document.getElementById('search-input');
-
-    renderer.updateData(allWords, {
-        cluster: clusterSelect.value,
-        type: typeSelect.value,
-        addDate: addDateSelect.value,
-        reviewDate: reviewDateSelect.value,
-        srsLevel: srsLevelSelect.value,
-        component: activeComponentFilter,
-        search: searchInput.value.toLowerCase()
-    });
+    applyFilters(renderer, allWords);
 }
 
 export function updateClusterDropdown(allWords) {
@@ -1,5 +1,5 @@
-import { fetchQuizWords, submitQuizResult } from './api.js';
-import { shuffle, speak } from './utils.js';
+import { fetchQuizSession, submitQuizResult } from './api.js';
+import { speak } from './utils.js';
 
 let quizQuestions = [];
 let quizResults = [];
@@ -15,12 +15,12 @@ const QUIZ_TYPE_LABELS = {
     'sentence': '📝 Sentence Fill'
 };
 
-export function setupQuizListeners(allWordsGetter) {
+export function setupQuizListeners() {
     document.getElementById('btn-quiz').onclick = () => {
         resetQuizModal();
         document.getElementById('modal-quiz').style.display = 'flex';
     };
-    document.getElementById('btn-start-quiz').onclick = () => startQuiz(allWordsGetter());
+    document.getElementById('btn-start-quiz').onclick = () => startQuiz();
     document.getElementById('btn-quiz-restart').onclick = () => {
         resetQuizModal();
     };
@@ -54,7 +54,7 @@ export function resetQuizModal() {
     }
 }
 
-async function startQuiz(allWords) {
+async function startQuiz() {
     const count = parseInt(document.getElementById('quiz-count').value);
     const typeCheckboxes = document.querySelectorAll('.quiz-type-grid input[type="checkbox"]:checked');
     const selectedTypes = Array.from(typeCheckboxes).map(cb => cb.value);
@@ -69,7 +69,7 @@ async function startQuiz(allWords) {
     btn.textContent = 'Loading...';
 
     try {
-        const words = await fetchQuizWords(count);
+        const { session_id: sessionId, words } = await fetchQuizSession(count);
 
         if (words.length === 0) {
             alert('No words available for quiz. Add some words first!');
@@ -78,8 +78,8 @@ async function startQuiz(allWords) {
             return;
         }
 
-        quizSessionId = 'quiz_' + Date.now();
-        quizQuestions = words.map(w => generateQuestion(w, selectedTypes, allWords));
+        quizSessionId = sessionId;
+        quizQuestions = words.map(w => generateQuestion(w, selectedTypes));
         quizResults = [];
         quizCurrentIndex = 0;
 
@@ -97,53 +97,46 @@ async function startQuiz(allWords) {
     }
 }
 
-function generateQuestion(wordData, selectedTypes, allWords) {
+function generateQuestion(wordData, selectedTypes) {
     const type = selectedTypes[Math.floor(Math.random() * selectedTypes.length)];
     const info = wordData.flashcard_infos || {};
-
-    // Get distractors from allWords (excluding the current word)
-    const otherWords = allWords.filter(w => w.word.id !== wordData.word.id);
+    // Shuffled options built by the server, distractors among the word's nearest neighbours
+    const options = wordData.options;
 
     switch (type) {
         case 'fr2th': {
             const correctAnswer = wordData.word.thai;
-            const distractors = getRandomDistractors(otherWords, 3, 'thai');
-            const options = shuffle([correctAnswer, ...distractors]);
             return {
                 type,
                 wordData,
                 prompt: wordData.word.french,
                 promptLabel: 'What is the Thai for...',
                 correctAnswer,
-                options,
+                options: options.thai,
                 isMCQ: true
             };
         }
         case 'th2fr': {
             const correctAnswer = wordData.word.french;
-            const distractors = getRandomDistractors(otherWords, 3, 'french');
-            const options = shuffle([correctAnswer, ...distractors]);
             return {
                 type,
                 wordData,
                 prompt: wordData.word.thai,
                 promptLabel: 'What is the French for...',
                 correctAnswer,
-                options,
+                options: options.french,
                 isMCQ: true
             };
         }
         case 'audio': {
             const correctAnswer = wordData.word.french;
-            const distractors = getRandomDistractors(otherWords, 3, 'french');
-            const options = shuffle([correctAnswer, ...distractors]);
             return {
                 type,
                 wordData,
                 prompt: wordData.word.thai, // Will be spoken
                 promptLabel: 'Listen and choose the meaning...',
                 correctAnswer,
-                options,
+                options: options.french,
                 isMCQ: true,
                 isAudioMCQ: true
             };
@@ -156,8 +149,6 @@ function generateQuestion(wordData, selectedTypes, allWords) {
                 // Create fill-in-the-blank
                 const blankedSentence = thaiSentence.replace(thai, '___');
                 const correctAnswer = thai;
-                const distractors = getRandomDistractors(otherWords, 3, 'thai');
-                const options = shuffle([correctAnswer, ...distractors]);
                 return {
                     type,
                     wordData,
@@ -165,63 +156,39 @@ function generateQuestion(wordData, selectedTypes, allWords) {
                     promptLabel: 'Fill in the blank',
                     promptContext: info.french_sentence || '',
                     correctAnswer,
-                    options,
+                    options: options.thai,
                     isMCQ: true,
                     isSentence: true
                 };
             } else {
                 // Fallback to fr2th
                 const correctAnswer = wordData.word.thai;
-                const distractors = getRandomDistractors(otherWords, 3, 'thai');
-                const options = shuffle([correctAnswer, ...distractors]);
                 return {
                     type: 'fr2th',
                     wordData,
                     prompt: wordData.word.french,
                     promptLabel: 'What is the Thai for...',
                     correctAnswer,
-                    options,
+                    options: options.thai,
                     isMCQ: true
                 };
             }
         }
         default: {
             const correctAnswer = wordData.word.thai;
-            const distractors = getRandomDistractors(otherWords, 3, 'thai');
-            const options = shuffle([correctAnswer, ...distractors]);
             return {
                 type: 'fr2th',
                 wordData,
                 prompt: wordData.word.french,
                 promptLabel: 'What is the Thai for...',
                 correctAnswer,
-                options,
+                options: options.thai,
                 isMCQ: true
             };
         }
     }
 }
 
-function getRandomDistractors(otherWords, count, field) {
-    const shuffled = [...otherWords].sort(() => Math.random() - 0.5);
-    const distractors = [];
-    const seen = new Set();
-
-    for (const w of shuffled) {
-        const val = w.word[field];
-        if (val && !seen.has(val)) {
-            distractors.push(val);
-            seen.add(val);
-        }
-        if (distractors.length >= count) break;
-    }
-
-    while (distractors.length < count) {
-        distractors.push('—');
-    }
-    return distractors;
-}
-
 function showQuestion() {
     // Stop any previous audio (e.g. from previous answer)
     if (window.speechSynthesis) window.speechSynthesis.cancel();
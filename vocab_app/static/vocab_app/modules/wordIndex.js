@@ -0,0 +1,123 @@
+// Filter index over the galaxy words, built once per data load so that
+// filtering (down to one search keystroke) never re-reads the raw word objects.
+
+const ONE_DAY = 24 * 60 * 60 * 1000;
+const DATE_WINDOWS = { today: 1, week: 7, month: 30 };
+
+function srsBucket(level) {
+    if (level === 0) return '0';
+    if (level <= 3) return '1-3';
+    if (level <= 6) return '4-6';
+    return '7+';
+}
+
+function addToBucket(buckets, key, index) {
+    if (!buckets.has(key)) buckets.set(key, []);
+    const bucket = buckets.get(key);
+    if (bucket[bucket.length - 1] !== index) bucket.push(index);
+}
+
+export class WordIndex {
+    constructor(words) {
+        const n = words.length;
+        this.size = n;
+        // One lowercase key per word: fields joined by a separator no query can contain
+        this.searchKeys = new Array(n);
+        this.addTimes = new Float64Array(n);
+        this.reviewTimes = new Float64Array(n);
+        this.byCluster = new Map();
+        this.byType = new Map();
+        this.bySrs = new Map();
+        this.byComponent = new Map();
+        this._last = null;
+
+        words.forEach((item, i) => {
+            const infos = item.flashcard_infos || {};
+            this.searchKeys[i] = [
+                item.word.thai || '',
+                item.word.french || '',
+                infos.romanization || ''
+            ].join('\u0000').toLowerCase();
+            this.addTimes[i] = item.add_date ? new Date(item.add_date).getTime() : NaN;
+            this.reviewTimes[i] = item.last_review_date ? new Date(item.last_review_date).getTime() : NaN;
+
+            addToBucket(this.byCluster, String(item.cluster_id), i);
+            addToBucket(this.byType, String(infos.word_type), i);
+            addToBucket(this.bySrs, srsBucket(item.srs_level || 0), i);
+
+            // A word matches a component if it IS the component or contains it
+            addToBucket(this.byComponent, item.word.thai, i);
+            (infos.components?.[0] || []).forEach(part => addToBucket(this.byComponent, part, i));
+        });
+    }
+
+    // Returns the sorted indices of the words matching `filters`
+    query(filters) {
+        const last = this._last;
+        let candidates;
+
+        // Typing more characters only narrows the previous result
+        if (last && filters.search && last.filters.search
+            && filters.search.startsWith(last.filters.search)
+            && this._sameExceptSearch(filters, last.filters)) {
+            candidates = last.result;
+        } else {
+            candidates = this._smallestBucket(filters);
+        }
+
+        const now = Date.now();
+        const result = candidates.filter(i => this._matches(i, filters, now));
+        this._last = { filters: { ...filters }, result };
+        return result;
+    }
+
+    _smallestBucket(filters) {
+        const buckets = [];
+        if (filters.cluster !== 'all') buckets.push(this.byCluster.get(String(filters.cluster)) || []);
+        if (filters.type !== 'all') buckets.push(this.byType.get(String(filters.type)) || []);
+        if (filters.srsLevel !== 'all') buckets.push(this.bySrs.get(filters.srsLevel) || []);
+        if (filters.component) buckets.push(this.byComponent.get(filters.component) || []);
+        if (buckets.length === 0) return Array.from({ length: this.size }, (_, i) => i);
+        return buckets.reduce((a, b) => (b.length < a.length ? b : a));
+    }
+
+    _matches(i, filters, now) {
+        if (filters.cluster !== 'all' && !this._inBucket(this.byCluster, String(filters.cluster), i)) return false;
+        if (filters.type !== 'all' && !this._inBucket(this.byType, String(filters.type), i)) return false;
+        if (filters.srsLevel !== 'all' && !this._inBucket(this.bySrs, filters.srsLevel, i)) return false;
+        if (filters.component && !this._inBucket(this.byComponent, filters.component, i)) return false;
+        if (!this._checkDate(this.addTimes[i], filters.addDate, now)) return false;
+        if (!this._checkDate(this.reviewTimes[i], filters.reviewDate, now)) return false;
+        if (filters.search && !this.searchKeys[i].includes(filters.search)) return false;
+        return true;
+    }
+
+    _inBucket(buckets, key, i) {
+        // Buckets are sorted: binary search
+        const bucket = buckets.get(key);
+        if (!bucket) return false;
+        let lo = 0;
+        let hi = bucket.length - 1;
+        while (lo <= hi) {
+            const mid = (lo + hi) >> 1;
+            if (bucket[mid] === i) return true;
+            if (bucket[mid] < i) lo = mid + 1;
+            else hi = mid - 1;
+        }
+        return false;
+    }
+
+    _checkDate(time, filter, now) {
+        if (!filter || filter === 'all') return true;
+        if (filter === 'never') return Number.isNaN(time);
+        if (Number.isNaN(time)) return false;
+        const days = DATE_WINDOWS[filter];
+        if (days === undefined) return true;
+        return Math.abs(now - time) <= days * ONE_DAY;
+    }
+
+    _sameExceptSearch(a, b) {
+        return a.cluster === b.cluster && a.type === b.type && a.addDate === b.addDate
+            && a.reviewDate === b.reviewDate && a.srsLevel === b.srsLevel && a.component === b.component;
+    }
+}
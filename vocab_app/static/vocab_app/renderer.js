@@ -1,18 +1,132 @@
 import * as THREE from 'three';
 import { OrbitControls } from 'three/addons/controls/OrbitControls.js';
 import { CSS2DRenderer, CSS2DObject } from 'three/addons/renderers/CSS2DRenderer.js';
+import { WordIndex } from './modules/wordIndex.js';
+
+const PALETTE = {
+    // --- Original Colors ---
+    1: '#FF5733', // Vibrant Orange-Red
+    2: '#33FF57', // Neon Lime Green
+    3: '#3357FF', // Bright Blue
+    4: '#F333FF', // Magenta / Hot Pink
+    5: '#FFFF33', // Bright Yellow
+    6: '#33FFFF', // Cyan / Aqua
+    7: '#FF3385', // Pink
+    8: '#95A5A6', // Concrete (Medium Gray)
+    9: '#FF8C00', // Dark Orange
+    10: '#2ECC71', // Emerald Green
+    11: '#C0392B', // Strong Red
+};
+
+// Only the nearest (and hovered) words get a DOM label, the rest is drawn by the GPU
+const MAX_DOM_LABELS = 150;
+const LABEL_UPDATE_EVERY = 5; // frames
+
+// Word atlas: every word is rasterized once into a tile of a shared texture
+const ATLAS_SIZE = 2048;
+const TILE_W = 128;
+const TILE_H = 32;
+const POINT_SIZE = 90000; // on-screen size (px) = POINT_SIZE / view depth
+
+const DEFAULT_FILTERS = { cluster: 'all', type: 'all', addDate: 'all', reviewDate: 'all', srsLevel: 'all', component: null, search: '' };
+
+const WORD_VERTEX_SHADER = `
+    attribute vec3 aColor;
+    attribute float aTile;
+    attribute float aLabelled;
+    attribute float aVisible;
+    uniform float uMinDist;
+    uniform float uRange;
+    uniform float uSize;
+    varying vec3 vColor;
+    varying float vTile;
+    varying float vLabelled;
+    varying float vOpacity;
+
+    void main() {
+        // Filtered out: collapse the point outside of the clip volume
+        if (aVisible < 0.5) {
+            gl_PointSize = 0.0;
+            gl_Position = vec4(2.0, 2.0, 2.0, 1.0);
+            return;
+        }
+        vec4 mvPosition = modelViewMatrix * vec4(position, 1.0);
+        // Distance-based opacity (the camera is the origin of the view space)
+        float normDist = (length(mvPosition.xyz) - uMinDist) / uRange;
+        vOpacity = clamp(1.0 - pow(max(normDist, 0.0), 1.5), 0.1, 1.0);
+        vColor = aColor;
+        vTile = aTile;
+        vLabelled = aLabelled;
+        gl_PointSize = uSize / -mvPosition.z;
+        gl_Position = projectionMatrix * mvPosition;
+    }
+`;
+
+const WORD_FRAGMENT_SHADER = `
+    uniform sampler2D uAtlas;
+    uniform float uTilesPerRow;
+    uniform vec2 uTileScale;
+    varying vec3 vColor;
+    varying float vTile;
+    varying float vLabelled;
+    varying float vOpacity;
+
+    void main() {
+        // The DOM label is drawn on top of this word
+        if (vLabelled > 0.5) discard;
+
+        vec2 pc = gl_PointCoord;
+        if (vTile < 0.0) {
+            // No atlas tile left: draw a dot
+            float alpha = 1.0 - smoothstep(0.06, 0.12, length(pc - 0.5));
+            if (alpha <= 0.0) discard;
+            gl_FragColor = vec4(vColor, alpha * vOpacity);
+            return;
+        }
+
+        // The tile is 4x wider than high: it fills the middle band of the square point
+        float v = (pc.y - 0.375) * 4.0;
+        if (v < 0.0 || v > 1.0) discard;
+        float col = mod(vTile, uTilesPerRow);
+        float row = floor(vTile / uTilesPerRow);
+        float alpha = texture2D(uAtlas, (vec2(col, row) + vec2(pc.x, v)) * uTileScale).a;
+        if (alpha < 0.05) discard;
+        gl_FragColor = vec4(vColor, alpha * vOpacity);
+    }
+`;
 
 export class GalaxyRenderer {
-    constructor(containerId) {
+    constructor(containerId, options = {}) {
         this.container = document.getElementById(containerId);
         this.scene = null;
         this.camera = null;
         this.renderer = null;
         this.labelRenderer = null;
         this.controls = null;
-        this.labels = [];
-        this.wordsData = [];
+        this.wordsData = null;
+        this.wordIndex = new WordIndex([]);
+        this.idToIndex = new Map(); // word id -> point index
         this.scaleFactor = 400;
+        this.maxLabels = options.maxLabels ?? MAX_DOM_LABELS;
+
+        // GPU word layer
+        this.points = null;
+        this.pointItems = []; // point index -> word item
+        this.atlasTiles = new Map(); // thai text -> atlas tile index
+        this.atlasCanvas = null;
+        this.atlasTexture = null;
+
+        // Pooled DOM labels
+        this.labelPool = [];
+        this.assignedLabels = new Map(); // point index -> CSS2DObject
+        this.hoveredIndex = -1;
+        this._frame = 0;
+        this._labelsDirty = true;
+        this._pointer = null;
+        this._pointerDown = null;
+        this._raycaster = new THREE.Raycaster();
+        this._frustum = new THREE.Frustum();
+        this._projScreenMatrix = new THREE.Matrix4();
 
         // Initial "north" orientation
         this.initialCameraPos = new THREE.Vector3(0, 200, 900);
@@ -80,7 +194,105 @@ export class GalaxyRenderer {
         this.controls.autoRotate = true;
         this.controls.autoRotateSpeed = 0.5;
 
+        this.initWordLayer();
+        this.initLabelPool();
+
         window.addEventListener('resize', () => this.onWindowResize());
+
+        // Hover and click on the GPU words (DOM labels handle their own clicks)
+        const canvas = this.renderer.domElement;
+        canvas.addEventListener('pointermove', (e) => {
+            this._pointer = new THREE.Vector2(
+                (e.clientX / window.innerWidth) * 2 - 1,
+                -(e.clientY / window.innerHeight) * 2 + 1
+            );
+        });
+        canvas.addEventListener('pointerleave', () => {
+            this._pointer = null;
+            this.setHovered(-1);
+        });
+        canvas.addEventListener('pointerdown', (e) => {
+            this._pointerDown = { x: e.clientX, y: e.clientY };
+        });
+        canvas.addEventListener('pointerup', (e) => {
+            const down = this._pointerDown;
+            this._pointerDown = null;
+            // Ignore drags (camera rotation)
+            if (!down || Math.hypot(e.clientX - down.x, e.clientY - down.y) > 5) return;
+            if (this.hoveredIndex >= 0 && this.onWordClick) {
+                this.onWordClick(this.pointItems[this.hoveredIndex]);
+            }
+        });
+    }
+
+    initWordLayer() {
+        const maxTextureSize = this.renderer.capabilities.maxTextureSize;
+        this.atlasCanvas = document.createElement('canvas');
+        this.atlasCanvas.width = Math.min(ATLAS_SIZE, maxTextureSize);
+        this.atlasCanvas.height = Math.min(ATLAS_SIZE, maxTextureSize);
+        this.tilesPerRow = Math.floor(this.atlasCanvas.width / TILE_W);
+        this.atlasCapacity = this.tilesPerRow * Math.floor(this.atlasCanvas.height / TILE_H);
+
+        this.atlasTexture = new THREE.CanvasTexture(this.atlasCanvas);
+        this.atlasTexture.flipY = false; // Tile rows are addressed from the top of the canvas
+        this.atlasTexture.minFilter = THREE.LinearFilter;
+        this.atlasTexture.generateMipmaps = false;
+
+        this.wordMaterial = new THREE.ShaderMaterial({
+            uniforms: {
+                uAtlas: { value: this.atlasTexture },
+                uTilesPerRow: { value: this.tilesPerRow },
+                uTileScale: { value: new THREE.Vector2(TILE_W / this.atlasCanvas.width, TILE_H / this.atlasCanvas.height) },
+                uMinDist: { value: 0 },
+                uRange: { value: 1 },
+                uSize: { value: POINT_SIZE * this.renderer.getPixelRatio() },
+            },
+            vertexShader: WORD_VERTEX_SHADER,
+            fragmentShader: WORD_FRAGMENT_SHADER,
+            transparent: true,
+            depthWrite: false,
+        });
+    }
+
+    initLabelPool() {
+        for (let i = 0; i < this.maxLabels; i++) {
+            const div = document.createElement('div');
+            div.className = 'label';
+            div.style.pointerEvents = 'auto';
+
+            const label = new CSS2DObject(div);
+            label.visible = false;
+            div.onclick = (e) => {
+                const item = label.userData.item;
+                if (!item) return;
+                console.log("Word clicked:", item.word.thai);
+                e.stopPropagation();
+                if (this.onWordClick) this.onWordClick(item);
+            };
+
+            this.scene.add(label);
+            this.labelPool.push(label);
+        }
+    }
+
+    // Rasterize a word into the atlas once, returns its tile index (-1 when the atlas is full)
+    getAtlasTile(text) {
+        if (this.atlasTiles.has(text)) return this.atlasTiles.get(text);
+        const index = this.atlasTiles.size;
+        if (index >= this.atlasCapacity) return -1;
+
+        const x = (index % this.tilesPerRow) * TILE_W;
+        const y = Math.floor(index / this.tilesPerRow) * TILE_H;
+        const ctx = this.atlasCanvas.getContext('2d');
+        ctx.font = 'bold 20px sans-serif';
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'middle';
+        ctx.fillStyle = '#ffffff';
+        ctx.fillText(text, x + TILE_W / 2, y + TILE_H / 2, TILE_W - 8);
+
+        this.atlasTiles.set(text, index);
+        this.atlasTexture.needsUpdate = true;
+        return index;
     }
 
     onWindowResize() {
@@ -88,6 +300,7 @@ export class GalaxyRenderer {
         this.camera.updateProjectionMatrix();
         this.renderer.setSize(window.innerWidth, window.innerHeight);
         this.labelRenderer.setSize(window.innerWidth, window.innerHeight);
+        this._labelsDirty = true;
     }
 
     animate() {
@@ -108,25 +321,127 @@ export class GalaxyRenderer {
 
         this.controls.update();
 
-        // Distance-based opacity
+        // Distance-based opacity, applied per word in the vertex shader
         const sphereRadius = this.scaleFactor;
         const camDist = this.camera.position.length();
         const minDist = Math.max(0, camDist - sphereRadius);
         const maxDist = camDist + sphereRadius;
-        const range = maxDist - minDist;
-
-        this.labels.forEach(label => {
-            const dist = label.position.distanceTo(this.camera.position);
-            let normDist = (dist - minDist) / (range || 1);
-            let opacity = 1.0 - Math.pow(normDist, 1.5);
-            opacity = Math.max(0.1, Math.min(1.0, opacity));
-            label.element.style.opacity = opacity;
-        });
+        this.wordMaterial.uniforms.uMinDist.value = minDist;
+        this.wordMaterial.uniforms.uRange.value = (maxDist - minDist) || 1;
+
+        this.updateHover();
+        this._frame++;
+        if (this._labelsDirty || this._frame % LABEL_UPDATE_EVERY === 0) {
+            this.updateLabels(minDist, (maxDist - minDist) || 1);
+        }
 
         this.renderer.render(this.scene, this.camera);
         this.labelRenderer.render(this.scene, this.camera);
     }
 
+    updateHover() {
+        if (!this._pointer || !this.points) return;
+        this._raycaster.params.Points.threshold = 10;
+        this._raycaster.setFromCamera(this._pointer, this.camera);
+        const hit = this._raycaster.intersectObject(this.points).find(h => this.isVisible(h.index));
+        this.setHovered(hit ? hit.index : -1);
+        this._pointer = null; // At most one raycast per pointer move
+    }
+
+    setHovered(index) {
+        if (index === this.hoveredIndex) return;
+        this.hoveredIndex = index;
+        this.renderer.domElement.style.cursor = index >= 0 ? 'pointer' : '';
+        this._labelsDirty = true;
+    }
+
+    // Frustum + distance culling: the nearest visible words (and the hovered one) get a DOM label
+    updateLabels(minDist, range) {
+        this._labelsDirty = false;
+        if (!this.points) return;
+
+        this.camera.updateMatrixWorld();
+        this._projScreenMatrix.multiplyMatrices(this.camera.projectionMatrix, this.camera.matrixWorldInverse);
+        this._frustum.setFromProjectionMatrix(this._projScreenMatrix);
+
+        const positions = this.points.geometry.attributes.position;
+        const camPos = this.camera.position;
+        const p = new THREE.Vector3();
+        const candidates = [];
+        const visible = this.points.geometry.attributes.aVisible.array;
+        for (let i = 0; i < this.pointItems.length; i++) {
+            if (!visible[i]) continue;
+            p.fromBufferAttribute(positions, i);
+            if (!this._frustum.containsPoint(p)) continue;
+            candidates.push({ index: i, dist: p.distanceTo(camPos) });
+        }
+        candidates.sort((a, b) => a.dist - b.dist);
+
+        const wanted = new Map();
+        if (this.hoveredIndex >= 0) {
+            p.fromBufferAttribute(positions, this.hoveredIndex);
+            wanted.set(this.hoveredIndex, p.distanceTo(camPos));
+        }
+        for (const c of candidates) {
+            if (wanted.size >= this.maxLabels) break;
+            wanted.set(c.index, c.dist);
+        }
+
+        const labelled = this.points.geometry.attributes.aLabelled;
+        let changed = false;
+
+        // Release the labels of the words that left the set
+        for (const [index, label] of this.assignedLabels) {
+            if (wanted.has(index)) continue;
+            label.visible = false;
+            label.userData.item = null;
+            this.assignedLabels.delete(index);
+            labelled.setX(index, 0);
+            changed = true;
+        }
+
+        const free = this.labelPool.filter(label => !label.userData.item);
+        for (const [index, dist] of wanted) {
+            let label = this.assignedLabels.get(index);
+            if (!label) {
+                label = free.pop();
+                if (!label) break;
+                this.assignLabel(label, index);
+                this.assignedLabels.set(index, label);
+                labelled.setX(index, 1);
+                changed = true;
+            }
+            // Only the few DOM labels get an opacity write, and only when it changes
+            const normDist = (dist - minDist) / range;
+            const opacity = Math.max(0.1, Math.min(1.0, 1.0 - Math.pow(Math.max(normDist, 0), 1.5)));
+            if (Math.abs((label.userData.opacity ?? -1) - opacity) > 0.05) {
+                label.element.style.opacity = opacity;
+                label.userData.opacity = opacity;
+            }
+        }
+
+        if (changed) labelled.needsUpdate = true;
+    }
+
+    assignLabel(label, index) {
+        const item = this.pointItems[index];
+        const color = PALETTE[item.cluster_id] || '#ffffff';
+        label.element.style.color = color;
+        label.element.style.boxShadow = `0 0 10px ${color}44`;
+        label.element.textContent = item.word.thai;
+        label.userData.item = item;
+        label.position.fromBufferAttribute(this.points.geometry.attributes.position, index);
+        label.visible = true;
+    }
+
+    releaseLabels() {
+        for (const label of this.assignedLabels.values()) {
+            label.visible = false;
+            label.userData.item = null;
+        }
+        this.assignedLabels.clear();
+    }
+
     resetView() {
         this._resetFrom = this.camera.position.clone();
         this._resetTargetFrom = this.controls.target.clone();
@@ -135,114 +450,119 @@ export class GalaxyRenderer {
         this.controls.autoRotate = false; // pause during animation
     }
 
-    updateData(wordsData, filters = { cluster: 'all', type: 'all', addDate: 'all', reviewDate: 'all', srsLevel: 'all', component: null, search: '' }) {
-        console.log("Updating Galaxy with words:", wordsData.length);
-        this.wordsData = wordsData;
+    updateData(wordsData, filters = DEFAULT_FILTERS) {
+        // The scene is only rebuilt when the data itself changes, filters just toggle visibility
+        if (wordsData !== this.wordsData) {
+            console.log("Updating Galaxy with words:", wordsData.length);
+            this.setWords(wordsData);
+        }
 
-        // Remove existing labels
-        this.labels.forEach(l => this.scene.remove(l));
-        this.labels = [];
-
-        const palette = {
-            // --- Original Colors ---
-            1: '#FF5733', // Vibrant Orange-Red
-            2: '#33FF57', // Neon Lime Green
-            3: '#3357FF', // Bright Blue
-            4: '#F333FF', // Magenta / Hot Pink
-            5: '#FFFF33', // Bright Yellow
-            6: '#33FFFF', // Cyan / Aqua
-            7: '#FF3385', // Pink
-            8: '#95A5A6', // Concrete (Medium Gray)
-            9: '#FF8C00', // Dark Orange
-            10: '#2ECC71', // Emerald Green
-            11: '#C0392B', // Strong Red
-        };
-
-        const now = new Date();
-        const oneDay = 24 * 60 * 60 * 1000;
-
-        const checkDate = (dateStr, filter) => {
-            if (filter === 'all') return true;
-            if (filter === 'never') return !dateStr;
-            if (!dateStr) return false;
-
-            const date = new Date(dateStr);
-            const diffTime = Math.abs(now - date);
-            const diffDays = Math.ceil(diffTime / oneDay);
-
-            if (filter === 'today') return diffDays <= 1;
-            if (filter === 'week') return diffDays <= 7;
-            if (filter === 'month') return diffDays <= 30;
-            return true;
-        };
-
-        wordsData.forEach(item => {
-            // Apply filtering
-            if (filters.cluster !== 'all' && item.cluster_id != filters.cluster) return;
-            if (filters.type !== 'all' && (item.flashcard_infos?.word_type != filters.type)) return;
-
-            // Add Date Filter
-            if (!checkDate(item.add_date, filters.addDate)) return;
-
-            // Review Date Filter
-            if (!checkDate(item.last_review_date, filters.reviewDate)) return;
-
-            // SRS Level Filter
-            if (filters.srsLevel !== 'all') {
-                const level = item.srs_level || 0;
-                if (filters.srsLevel === '0' && level !== 0) return;
-                if (filters.srsLevel === '1-3' && (level < 1 || level > 3)) return;
-                if (filters.srsLevel === '4-6' && (level < 4 || level > 6)) return;
-                if (filters.srsLevel === '7+' && level < 7) return;
-            }
+        const matches = this.wordIndex.query({ ...DEFAULT_FILTERS, ...filters });
+        this.applyVisibility(matches);
 
-            // Component filter: show word if its Thai text IS the component, or if its components list includes it
-            if (filters.component) {
-                const comp = filters.component;
-                const parts = item.flashcard_infos?.components?.[0] || [];
-                const isMatch = item.word.thai === comp || parts.includes(comp);
-                if (!isMatch) return;
-            }
+        if (matches.length === 0 && wordsData.length > 0) {
+            console.warn("All words filtered out or missing coordinates");
+        }
+    }
+
+    // Show only the given word ids (server-side filtering, see filters.js)
+    showIds(wordsData, ids) {
+        if (wordsData !== this.wordsData) this.setWords(wordsData);
+        const matches = ids
+            .map(id => this.idToIndex.get(id))
+            .filter(i => i !== undefined)
+            .sort((a, b) => a - b);
+        this.applyVisibility(matches);
+    }
 
-            // Search filter
-            if (filters.search) {
-                const q = filters.search;
-                const thai = (item.word.thai || '').toLowerCase();
-                const french = (item.word.french || '').toLowerCase();
-                const rom = (item.flashcard_infos?.romanization || '').toLowerCase();
+    setWords(wordsData) {
+        const sameWords = this.points && wordsData.length === this.pointItems.length
+            && wordsData.every((item, i) => item.id === this.pointItems[i].id);
 
-                if (!thai.includes(q) && !french.includes(q) && !rom.includes(q)) {
-                    return;
-                }
+        this.wordsData = wordsData;
+        this.wordIndex = new WordIndex(wordsData);
+        this.idToIndex = new Map(wordsData.map((item, i) => [item.id, i]));
+
+        if (sameWords) {
+            // Same words (e.g. after a recompute): update the attributes in place
+            this.pointItems = wordsData;
+            this.writeWordAttributes(this.points.geometry, wordsData);
+            for (const [index, label] of this.assignedLabels) {
+                this.assignLabel(label, index);
             }
+        } else {
+            this.buildWordLayer(wordsData);
+        }
+    }
 
-            const div = document.createElement('div');
-            div.className = 'label';
-            const color = palette[item.cluster_id] || '#ffffff';
-            div.style.color = color;
-            div.style.boxShadow = `0 0 10px ${color}44`;
-            div.textContent = item.word.thai;
-            div.style.pointerEvents = 'auto';
+    applyVisibility(matches) {
+        if (!this.points) return;
+        const visible = this.points.geometry.attributes.aVisible;
+        const mask = new Uint8Array(this.pointItems.length);
+        matches.forEach(i => { mask[i] = 1; });
+
+        let changed = false;
+        for (let i = 0; i < mask.length; i++) {
+            if (visible.array[i] === mask[i]) continue;
+            visible.array[i] = mask[i];
+            changed = true;
+        }
+        if (!changed) return;
 
-            div.onclick = (e) => {
-                console.log("Word clicked:", item.word.thai);
-                e.stopPropagation();
-                if (this.onWordClick) this.onWordClick(item);
-            };
+        visible.needsUpdate = true;
+        if (this.hoveredIndex >= 0 && !mask[this.hoveredIndex]) this.setHovered(-1);
+        this._labelsDirty = true;
+    }
 
-            const label = new CSS2DObject(div);
-            // Coordinates from API are normalized (-1 to 1), scale to galaxy size
-            const x = (item.x || 0) * this.scaleFactor;
-            const y = (item.y || 0) * this.scaleFactor;
-            const z = (item.z || 0) * this.scaleFactor;
-            label.position.set(x, y, z);
+    isVisible(index) {
+        return this.points.geometry.attributes.aVisible.array[index] === 1;
+    }
 
-            this.scene.add(label);
-            this.labels.push(label);
+    writeWordAttributes(geometry, items) {
+        const positions = geometry.attributes.position.array;
+        const colors = geometry.attributes.aColor.array;
+        const tiles = geometry.attributes.aTile.array;
+        const color = new THREE.Color();
+
+        items.forEach((item, i) => {
+            // Coordinates from API are normalized (-1 to 1), scale to galaxy size
+            positions[i * 3] = (item.x || 0) * this.scaleFactor;
+            positions[i * 3 + 1] = (item.y || 0) * this.scaleFactor;
+            positions[i * 3 + 2] = (item.z || 0) * this.scaleFactor;
+            color.set(PALETTE[item.cluster_id] || '#ffffff');
+            colors[i * 3] = color.r;
+            colors[i * 3 + 1] = color.g;
+            colors[i * 3 + 2] = color.b;
+            tiles[i] = this.getAtlasTile(item.word.thai);
         });
 
-        if (this.labels.length === 0 && wordsData.length > 0) {
-            console.warn("All words filtered out or missing coordinates");
+        geometry.attributes.position.needsUpdate = true;
+        geometry.attributes.aColor.needsUpdate = true;
+        geometry.attributes.aTile.needsUpdate = true;
+        geometry.computeBoundingSphere();
+        this._labelsDirty = true;
+    }
+
+    buildWordLayer(items) {
+        this.releaseLabels();
+        this.hoveredIndex = -1;
+        if (this.points) {
+            this.scene.remove(this.points);
+            this.points.geometry.dispose();
+            this.points = null;
         }
+        this.pointItems = items;
+        if (items.length === 0) return;
+
+        const geometry = new THREE.BufferGeometry();
+        geometry.setAttribute('position', new THREE.BufferAttribute(new Float32Array(items.length * 3), 3));
+        geometry.setAttribute('aColor', new THREE.BufferAttribute(new Float32Array(items.length * 3), 3));
+        geometry.setAttribute('aTile', new THREE.BufferAttribute(new Float32Array(items.length), 1));
+        geometry.setAttribute('aLabelled', new THREE.BufferAttribute(new Float32Array(items.length), 1));
+        geometry.setAttribute('aVisible', new THREE.BufferAttribute(new Uint8Array(items.length).fill(1), 1));
+        this.writeWordAttributes(geometry, items);
+
+        this.points = new THREE.Points(geometry, this.wordMaterial);
+        this.scene.add(this.points);
     }
 }
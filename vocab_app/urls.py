@@ -1,17 +1,40 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the LLM-bound endpoints are served by their async versions
+if settings.ASYNC_LLM_VIEWS:
+    from . import async_views
+    add_word_view = async_views.AsyncAddWordView.as_view()
+    preview_word_view = async_views.AsyncPreviewWordView.as_view()
+    add_word_stream_view = async_views.AsyncAddWordStreamView.as_view()
+    preview_word_stream_view = async_views.AsyncPreviewWordStreamView.as_view()
+    suggest_word_view = async_views.AsyncWordSuggestionView.as_view()
+else:
+    add_word_view = views.AddWordView.as_view()
+    preview_word_view = views.PreviewWordView.as_view()
+    add_word_stream_view = views.AddWordStreamView.as_view()
+    preview_word_stream_view = views.PreviewWordStreamView.as_view()
+    suggest_word_view = views.WordSuggestionView.as_view()
+
 urlpatterns = [
     path('', views.index, name='index'),
     path('signup/', views.signup_view, name='signup'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('map-data/', views.MapDataView.as_view(), name='map-data'),
-    path('add-word/', views.AddWordView.as_view(), name='add-word'),
-    path('preview-word/', views.PreviewWordView.as_view(), name='preview-word'),
-    path('suggest-word/', views.WordSuggestionView.as_view(), name='suggest-word'),
+    path('filter-words/', views.GalaxyFilterView.as_view(), name='filter-words'),
+    path('component-words/', views.ComponentWordsView.as_view(), name='component-words'),
+    path('clusters/', views.ClusterLevelsView.as_view(), name='clusters'),
+    path('add-word/', add_word_view, name='add-word'),
+    path('preview-word/', preview_word_view, name='preview-word'),
+    path('add-word/stream/', add_word_stream_view, name='add-word-stream'),
+    path('preview-word/stream/', preview_word_stream_view, name='preview-word-stream'),
+    path('suggest-word/', suggest_word_view, name='suggest-word'),
     path('quiz-words/', views.QuizWordsView.as_view(), name='quiz-words'),
+    path('quiz-session/', views.QuizSessionView.as_view(), name='quiz-session'),
     path('submit-quiz/', views.QuizSubmissionView.as_view(), name='submit-quiz'),
+    path('analytics/', views.AnalyticsView.as_view(), name='analytics'),
     path('delete-word/<int:uwi_id>/', views.DeleteWordView.as_view(), name='delete-word'),
     path('update-word/<int:uwi_id>/', views.UpdateWordView.as_view(), name='update-word'),
 ]
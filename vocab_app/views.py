@@ -5,10 +5,9 @@ from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .models import Word, UserWordInfo, QuizResult
-from .serializers import UserWordInfoSerializer, QuizResultSerializer
-from . import services
-import numpy as np
+from .models import Word, UserWordInfo, WordComponent, WordNeighbour, normalize_thai
+from .serializers import UserWordInfoSerializer, QuizResultSerializer, serialize_user_words
+from . import services, guest_seed, cluster_tree, analytics, galaxy
 from datetime import timedelta
 import json
 
@@ -25,6 +24,14 @@ def index(request):
     context = {
         'is_guest': not request.user.is_authenticated
     }
+    if context['is_guest']:
+        # Long-cacheable hashed artifacts of the guest galaxy (geometry first, then the details)
+        from django.templatetags.static import static
+        manifest = guest_seed.get_guest_manifest()
+        context['guest_galaxy_urls'] = {
+            kind: static(f'vocab_app/data/{manifest[kind]}')
+            for kind in ('geometry', 'full') if manifest.get(kind)
+        }
     return render(request, 'vocab_app/index.html', context)
 
 
@@ -62,20 +69,184 @@ class MapDataView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        if request.user.is_authenticated:
-            user_words = UserWordInfo.objects.filter(user=request.user).select_related('word')
-            serializer = UserWordInfoSerializer(user_words, many=True)
-            return Response(serializer.data)
-        else:
-            # Serve from static JSON for guests
-            import json
-            import os
-            from django.conf import settings
-            json_path = os.path.join(settings.BASE_DIR, 'vocab_app', 'static', 'vocab_app', 'data', 'guest_galaxy.json')
-            if os.path.exists(json_path):
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    return Response(json.load(f))
-            return Response([])
+        if request.user.is_authenticated and not guest_seed.uses_shared_seed(request.user):
+            return Response(serialize_user_words(UserWordInfo.objects.filter(user=request.user)))
+        # Guests (and users still on the shared seed) see the guest galaxy, loaded once per process
+        return Response(guest_seed.get_guest_seed())
+
+
+def _get_user_word(user, uwi_id):
+    """
+    The user's UserWordInfo `uwi_id`, copying the shared seed first if needed.
+    A client that loaded the shared seed holds seed ids, also after the copy was
+    made (by this or an earlier request): an id that is not one of the user's
+    words is mapped to their copy of that seed word.
+    """
+    if not guest_seed.ensure_own_galaxy(user):
+        try:
+            return UserWordInfo.objects.get(id=uwi_id, user=user)
+        except UserWordInfo.DoesNotExist:
+            pass
+    thai = guest_seed.seed_word_thai(uwi_id)
+    if thai is None:
+        raise UserWordInfo.DoesNotExist(f"No word {uwi_id} for this user.")
+    return UserWordInfo.objects.get(user=user, word__thai=normalize_thai(thai))
+
+
+def _get_word_id(user, word_id, copied):
+    """
+    Word id of a quiz answer. The client quizzed on the shared seed submits the
+    seed's Word ids: an id that is not one of the user's words is mapped to the
+    Word of their copy (`copied`: the copy was made by this request).
+    """
+    try:
+        word_id = int(word_id)
+    except (TypeError, ValueError):
+        return word_id
+    if not copied and UserWordInfo.objects.filter(user=user, word_id=word_id).exists():
+        return word_id
+    thai = guest_seed.seed_word_thai_for_word(word_id)
+    if thai is None:
+        return word_id
+    own = (
+        UserWordInfo.objects.filter(user=user, word__thai=normalize_thai(thai))
+        .values_list('word_id', flat=True).first()
+    )
+    return word_id if own is None else own
+
+
+# Date filter windows (in days), as in the galaxy filters
+DATE_FILTER_DAYS = {'today': 1, 'week': 7, 'month': 30}
+
+def _filter_by_date(queryset, field, value, now):
+    if value == 'never':
+        return queryset.filter(**{f'{field}__isnull': True})
+    days = DATE_FILTER_DAYS.get(value)
+    if days:
+        return queryset.filter(**{f'{field}__gte': now - timedelta(days=days)})
+    return queryset
+
+
+class GalaxyFilterView(APIView):
+    """Return the ids of the user's words matching the galaxy filters."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        from django.db.models import Q
+        params = request.query_params
+        qs = UserWordInfo.objects.filter(user=request.user)
+
+        cluster = params.get('cluster', 'all')
+        if cluster != 'all':
+            try:
+                qs = qs.filter(cluster_id=int(cluster))
+            except ValueError:
+                return Response({"error": "cluster must be an integer or 'all'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        word_type = params.get('type', 'all')
+        if word_type != 'all':
+            qs = qs.filter(word_type=word_type)
+
+        now = timezone.now()
+        qs = _filter_by_date(qs, 'add_date', params.get('add_date', 'all'), now)
+        qs = _filter_by_date(qs, 'last_review_date', params.get('review_date', 'all'), now)
+
+        srs_level = params.get('srs_level', 'all')
+        if srs_level == '0':
+            qs = qs.filter(srs_level=0)
+        elif srs_level == '1-3':
+            qs = qs.filter(srs_level__gte=1, srs_level__lte=3)
+        elif srs_level == '4-6':
+            qs = qs.filter(srs_level__gte=4, srs_level__lte=6)
+        elif srs_level == '7+':
+            qs = qs.filter(srs_level__gte=7)
+
+        # Component filter: the word IS the component, or its components include it
+        component = params.get('component')
+        if component:
+            sharing = WordComponent.objects.filter(user=request.user, text=component).values('user_word_id')
+            qs = qs.filter(Q(word__thai=component) | Q(id__in=sharing))
+
+        search = params.get('search', '').strip()
+        if search:
+            qs = qs.filter(
+                Q(word__thai__icontains=search) |
+                Q(word__french__icontains=search) |
+                Q(romanization__icontains=search)
+            )
+
+        ids = list(qs.values_list('id', flat=True).distinct())
+        return Response({"ids": ids})
+
+
+class ComponentWordsView(APIView):
+    """Return the user's words sharing a component (e.g. every word containing ใจ)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        component = request.query_params.get('component', '').strip()
+        if not component:
+            return Response({"error": "A component is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if guest_seed.uses_shared_seed(request.user):
+            return Response({"component": component, "words": _seed_component_words(component)})
+
+        rows = (
+            WordComponent.objects
+            .filter(user=request.user, text=component)
+            .select_related('user_word__word')
+            .order_by('user_word__word__thai')
+        )
+        words = [{
+            "id": comp.user_word_id,
+            "thai": comp.user_word.word.thai,
+            "french": comp.user_word.word.french,
+            "position": comp.position,
+            "translation": comp.translation,
+        } for comp in rows]
+        return Response({"component": component, "words": words})
+
+
+class ClusterLevelsView(APIView):
+    """
+    The user's galaxy clustered at any granularity: ?n=<number of clusters>,
+    a cut of the stored cluster tree (cluster_tree.py). ?labels=0 skips the labels
+    not resolved yet (e.g. while a zoom slider is being dragged).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            n_clusters = int(request.query_params.get('n', 0))
+        except ValueError:
+            return Response({"error": "n must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if n_clusters < 1:
+            return Response({"error": "n must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with_labels = request.query_params.get('labels', '1') != '0'
+        clusters = cluster_tree.get_clusters(request.user, n_clusters, with_labels=with_labels)
+        if clusters is None:
+            return Response({"error": "No cluster tree yet."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(clusters)
+
+
+def _seed_component_words(component):
+    """ComponentWordsView answer over the shared seed galaxy (seed ids, as served by MapDataView)."""
+    words = []
+    for item in guest_seed.get_guest_seed():
+        components = (item.get('flashcard_infos') or {}).get('components') or []
+        parts = components[0] if components and components[0] else []
+        translations = components[1] if len(components) > 1 and components[1] else []
+        for i, part in enumerate(parts):
+            if part == component:
+                words.append({
+                    "id": item['id'],
+                    "thai": item['word']['thai'],
+                    "french": item['word']['french'],
+                    "position": i,
+                    "translation": str(translations[i] or '') if i < len(translations) else '',
+                })
+    return sorted(words, key=lambda w: w['thai'])
 
 
 class PreviewWordView(APIView):
@@ -99,7 +270,26 @@ class PreviewWordView(APIView):
         return Response(flashcard_infos, status=status.HTTP_200_OK)
 
 
-class AddWordView(APIView):
+def sse_event(event, data):
+    """One server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events):
+    from django.http import StreamingHttpResponse
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class PreviewWordStreamView(APIView):
+    """
+    Streaming PreviewWordView (server-sent events): one event per part of the
+    flashcard as soon as it is ready ("word", "sentence", "components"),
+    then "done" with the whole flashcard_infos.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
@@ -110,8 +300,92 @@ class AddWordView(APIView):
         if not thai or not french:
             return Response({"error": "Thai and French words are required."}, status=status.HTTP_400_BAD_REQUEST)
 
+        def events():
+            try:
+                for step, fields in services.stream_flashcard_infos(thai, french, sentence):
+                    yield sse_event(step, fields)
+            except Exception as e:
+                print(f"Error generating flashcard info: {e}")
+                yield sse_event("error", {"error": "Failed to generate info"})
+
+        return sse_response(events())
+
+
+class AddWordStreamView(APIView):
+    """
+    Streaming AddWordView: the flashcard events of PreviewWordStreamView (unless
+    reviewed flashcard_infos are sent), "saved" with the new word as soon as it
+    is stored, then "placed" with its coordinates and cluster once the galaxy is
+    recomputed, and "done".
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        thai = request.data.get('thai')
+        french = request.data.get('french')
+        sentence = request.data.get('sentence', '')
+        flashcard_infos = request.data.get('flashcard_infos')
+
+        # Only spaces or invisible characters: nothing to store
+        if not normalize_thai(thai) or not french:
+            return Response({"error": "Thai and French words are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        guest_seed.ensure_own_galaxy(user)
+        word = Word.objects.get_or_create_one(thai, french)
+        existing = UserWordInfo.objects.filter(user=user, word=word).select_related('word').first()
+
+        def events():
+            nonlocal flashcard_infos
+            if existing:
+                yield sse_event("done", UserWordInfoSerializer(existing).data)
+                return
+
+            if not flashcard_infos:
+                flashcard_infos = {}
+                try:
+                    for step, fields in services.stream_flashcard_infos(thai, french, sentence):
+                        if step == "done":
+                            flashcard_infos = fields
+                        else:
+                            yield sse_event(step, fields)
+                except Exception as e:
+                    print(f"Error generating flashcard info: {e}")
+
+            # A double submit may have stored it meanwhile: send that one
+            user_word, created = UserWordInfo.objects.get_or_create(
+                user=user, word=word, defaults={'flashcard_infos': flashcard_infos}
+            )
+            if not created:
+                yield sse_event("done", UserWordInfoSerializer(user_word).data)
+                return
+            yield sse_event("saved", UserWordInfoSerializer(user_word).data)
+
+            _recompute_coordinates(user)
+            user_word.refresh_from_db()
+            placed = UserWordInfoSerializer(user_word).data
+            yield sse_event("placed", placed)
+            yield sse_event("done", placed)
+
+        return sse_response(events())
+
+
+class AddWordView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        thai = request.data.get('thai')
+        french = request.data.get('french')
+        sentence = request.data.get('sentence', '')
+
+        # Only spaces or invisible characters: nothing to store
+        if not normalize_thai(thai) or not french:
+            return Response({"error": "Thai and French words are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        guest_seed.ensure_own_galaxy(request.user)
+
         # 1. Get or Create Word
-        word, created = Word.objects.get_or_create(thai=thai, defaults={'french': french})
+        word = Word.objects.get_or_create_one(thai, french)
         
         # 2. Check if user has it
         if UserWordInfo.objects.filter(user=request.user, word=word).exists():
@@ -128,58 +402,17 @@ class AddWordView(APIView):
                 print(f"Error generating flashcard info: {e}")
                 flashcard_infos = {}
 
-        # 4. Create UserWordInfo
-        user_word = UserWordInfo.objects.create(
+        # 4. Create UserWordInfo (unless a concurrent request just did)
+        user_word, created = UserWordInfo.objects.get_or_create(
             user=request.user,
             word=word,
-            flashcard_infos=flashcard_infos
+            defaults={'flashcard_infos': flashcard_infos}
         )
+        if not created:
+            return Response(UserWordInfoSerializer(user_word).data, status=status.HTTP_200_OK)
 
         # 5. Update Coordinates & Clusters for the whole user universe
-        # Fetch all words for this user
-        all_user_infos = UserWordInfo.objects.filter(user=request.user).select_related('word')
-        
-        # Filter valid words and get vectors
-        valid_infos = []
-        vectors = []
-        word_to_vector_map = {}
-        
-        for uwi in all_user_infos:
-            vec = services.get_word_vector(uwi.word)
-            if vec is not None:
-                valid_infos.append(uwi)
-                vectors.append(vec)
-                word_to_vector_map[uwi.word.thai] = vec
-        
-        if len(vectors) > 2:
-            # UMAP (needs sufficient data)
-            try:
-                # Optimized: UMAP -> Normalization -> Spacing Optimization
-                optimized_coords = services.get_optimized_3d_coordinates(vectors)
-                
-                # Clustering
-                word_to_cluster, cluster_labels = services.auto_clustering(
-                    [u.word.thai for u in valid_infos], 
-                    existing_vectors=word_to_vector_map
-                )
-
-                # Update DB objects
-                to_update = []
-                for i, uwi in enumerate(valid_infos):
-                    uwi.x = float(optimized_coords[i][0])
-                    uwi.y = float(optimized_coords[i][1])
-                    uwi.z = float(optimized_coords[i][2])
-                    
-                    c_id = word_to_cluster.get(uwi.word.thai)
-                    if c_id:
-                        uwi.cluster_id = c_id
-                        uwi.cluster_label = cluster_labels.get(c_id, "General")
-                    
-                    to_update.append(uwi)
-                
-                UserWordInfo.objects.bulk_update(to_update, ['x', 'y', 'z', 'cluster_id', 'cluster_label'])
-            except Exception as e:
-                print(f"Error updating coordinates: {e}")
+        _recompute_coordinates(request.user)
 
         # Refresh the created object from DB to get updated coords if any
         user_word.refresh_from_db()
@@ -190,6 +423,8 @@ class WordSuggestionView(APIView):
 
     def get(self, request):
         cluster = request.query_params.get('cluster', 'all')
+        if guest_seed.uses_shared_seed(request.user):
+            return Response(services.suggest_new_words(guest_seed.seed_vocabulary(cluster)))
         user_words_qs = UserWordInfo.objects.filter(user=request.user)
         if cluster != 'all':
             user_words_qs = user_words_qs.filter(cluster_id=cluster)
@@ -198,26 +433,116 @@ class WordSuggestionView(APIView):
         return Response(suggestions)
 
 
+# Words per quiz (?count=)
+QUIZ_DEFAULT_WORDS = 10
+QUIZ_MAX_WORDS = 100
+
+
+def _quiz_count(request):
+    """The ?count= of a quiz request, clamped to [1, QUIZ_MAX_WORDS]; None if it is not an integer."""
+    try:
+        count = int(request.query_params.get('count', QUIZ_DEFAULT_WORDS))
+    except ValueError:
+        return None
+    return max(1, min(count, QUIZ_MAX_WORDS))
+
+
+def _due_words(user, count):
+    """
+    The `count` words due for SRS review: next_review_date in the past (most
+    overdue first) then never reviewed, read through the (user, next_review_date) index.
+    """
+    from django.db.models import F, Q
+    return (
+        UserWordInfo.objects
+        .filter(user=user)
+        .filter(Q(next_review_date__lte=timezone.now()) | Q(next_review_date__isnull=True))
+        .order_by(F('next_review_date').asc(nulls_last=True), 'id')[:count]
+    )
+
+
 class QuizWordsView(APIView):
     """Return words due for SRS review."""
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        count = int(request.query_params.get('count', 10))
-        now = timezone.now()
-
-        # Words due: next_review_date is in the past OR null (never reviewed)
-        from django.db.models import Q
-        due_words = (
-            UserWordInfo.objects
-            .filter(user=request.user)
-            .filter(Q(next_review_date__lte=now) | Q(next_review_date__isnull=True))
-            .select_related('word')
-            .order_by('?')[:count]
-        )
+        count = _quiz_count(request)
+        if count is None:
+            return Response({"error": "count must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        # Read-only: the seed is only copied when the answers are submitted
+        if guest_seed.uses_shared_seed(request.user):
+            return Response(guest_seed.seed_quiz_words(count))
+        return Response(serialize_user_words(_due_words(request.user, count)))
+
+
+# Options per quiz question (the answer and its distractors)
+QUIZ_OPTIONS = 4
+
+
+def _quiz_options(user, words, fallback=None):
+    """
+    Add the multiple-choice options of each serialized word: {"thai": [...], "french": [...]},
+    shuffled, the distractors drawn from the word's nearest neighbours (models.WordNeighbour),
+    completed at random from the user's vocabulary when it has too few
+    (from `fallback`, [(thai, french)], if given).
+    """
+    import random
+    neighbours = {}
+    for user_word_id, thai, french in (
+        WordNeighbour.objects
+        .filter(user=user, user_word_id__in=[w['id'] for w in words])
+        .order_by('user_word_id', 'rank')
+        .values_list('user_word_id', 'neighbour__word__thai', 'neighbour__word__french')
+    ):
+        neighbours.setdefault(user_word_id, []).append((thai, french))
+
+    for word in words:
+        answer = (word['word']['thai'], word['word']['french'])
+        word['options'] = {}
+        for i, field in enumerate(('thai', 'french')):
+            near = list(dict.fromkeys(
+                n[i] for n in neighbours.get(word['id'], []) if n[i] and n[i] != answer[i]
+            ))
+            # Sampled among the closest: not always the same distractors
+            distractors = random.sample(near, min(QUIZ_OPTIONS - 1, len(near)))
+            if len(distractors) < QUIZ_OPTIONS - 1:
+                if fallback is None:
+                    fallback = list(
+                        UserWordInfo.objects.filter(user=user)
+                        .order_by('?').values_list('word__thai', 'word__french')[:QUIZ_OPTIONS * 4]
+                    )
+                others = list(dict.fromkeys(
+                    f[i] for f in fallback if f[i] and f[i] != answer[i] and f[i] not in distractors
+                ))
+                distractors += random.sample(others, min(QUIZ_OPTIONS - 1 - len(distractors), len(others)))
+            options = distractors + [answer[i]] + ['—'] * (QUIZ_OPTIONS - 1 - len(distractors))
+            random.shuffle(options)
+            word['options'][field] = options
+    return words
+
+
+class QuizSessionView(APIView):
+    """
+    A quiz session: the words due for SRS review, each with its pre-built options,
+    and the session id to submit the results with.
+    """
+    permission_classes = [permissions.IsAuthenticated]
 
-        serializer = UserWordInfoSerializer(due_words, many=True)
-        return Response(serializer.data)
+    def get(self, request):
+        import uuid
+        count = _quiz_count(request)
+        if count is None:
+            return Response({"error": "count must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        session_id = f"quiz_{uuid.uuid4().hex}"
+        # Read-only: the seed is only copied when the answers are submitted
+        if guest_seed.uses_shared_seed(request.user):
+            seed = guest_seed.get_guest_seed()
+            words = [dict(item) for item in guest_seed.seed_quiz_words(count)]
+            fallback = [(item['word']['thai'], item['word']['french']) for item in seed]
+            return Response({"session_id": session_id, "words": _quiz_options(request.user, words, fallback)})
+
+        words = _quiz_options(request.user, serialize_user_words(_due_words(request.user, count)))
+        return Response({"session_id": session_id, "words": words})
 
 
 class QuizSubmissionView(APIView):
@@ -225,8 +550,10 @@ class QuizSubmissionView(APIView):
 
     def post(self, request):
         # Expecting: word, result, quiz_type, quiz_id
+        copied = guest_seed.ensure_own_galaxy(request.user)
         data = request.data.copy()
         data['user'] = request.user.id
+        data['word'] = _get_word_id(request.user, data.get('word'), copied)
         serializer = QuizResultSerializer(data=data)
         if serializer.is_valid():
             serializer.save()
@@ -234,6 +561,7 @@ class QuizSubmissionView(APIView):
             # --- SRS Update ---
             word_id = data.get('word')
             result = data.get('result')
+            uwi = None
             try:
                 uwi = UserWordInfo.objects.get(user=request.user, word_id=word_id)
                 now = timezone.now()
@@ -258,48 +586,27 @@ class QuizSubmissionView(APIView):
             except UserWordInfo.DoesNotExist:
                 pass  # word not in user's list, skip SRS update
 
+            analytics.record_review(request.user, data.get('quiz_type'), result, user_word=uwi)
+
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-def _recompute_coordinates(user):
-    """Recalculate UMAP coordinates and clusters for all of a user's words."""
-    all_user_infos = list(UserWordInfo.objects.filter(user=user).select_related('word'))
-
-    valid_infos = []
-    vectors = []
-    word_to_vector_map = {}
-
-    for uwi in all_user_infos:
-        vec = services.get_word_vector(uwi.word)
-        if vec is not None:
-            valid_infos.append(uwi)
-            vectors.append(vec)
-            word_to_vector_map[uwi.word.thai] = vec
+class AnalyticsView(APIView):
+    """Learning statistics of the last ?days= days (default 30), from the daily rollups."""
+    permission_classes = [permissions.IsAuthenticated]
 
-    if len(vectors) > 2:
+    def get(self, request):
         try:
-            optimized_coords = services.get_optimized_3d_coordinates(vectors)
-            word_to_cluster, cluster_labels = services.auto_clustering(
-                [u.word.thai for u in valid_infos],
-                existing_vectors=word_to_vector_map
-            )
-
-            for i, uwi in enumerate(valid_infos):
-                uwi.x = float(optimized_coords[i][0])
-                uwi.y = float(optimized_coords[i][1])
-                uwi.z = float(optimized_coords[i][2])
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({"error": "days must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(analytics.get_analytics(request.user, days))
 
-                c_id = word_to_cluster.get(uwi.word.thai)
-                if c_id:
-                    uwi.cluster_id = c_id
-                    uwi.cluster_label = cluster_labels.get(c_id, "General")
 
-            UserWordInfo.objects.bulk_update(
-                valid_infos, ['x', 'y', 'z', 'cluster_id', 'cluster_label']
-            )
-        except Exception as e:
-            print(f"Error recomputing coordinates: {e}")
+def _recompute_coordinates(user):
+    """Recalculate UMAP coordinates and clusters for all of a user's words (see galaxy.recompute)."""
+    galaxy.recompute(user)
 
 
 class DeleteWordView(APIView):
@@ -307,7 +614,7 @@ class DeleteWordView(APIView):
 
     def delete(self, request, uwi_id):
         try:
-            uwi = UserWordInfo.objects.get(id=uwi_id, user=request.user)
+            uwi = _get_user_word(request.user, uwi_id)
         except UserWordInfo.DoesNotExist:
             return Response({"error": "Word not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -329,7 +636,7 @@ class UpdateWordView(APIView):
 
     def put(self, request, uwi_id):
         try:
-            uwi = UserWordInfo.objects.get(id=uwi_id, user=request.user)
+            uwi = _get_user_word(request.user, uwi_id)
         except UserWordInfo.DoesNotExist:
             return Response({"error": "Word not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -0,0 +1,84 @@
+"""
+Startup preloading of the heavy NLP resources used by services.py.
+
+The gunicorn master calls `preload()` once before forking (see gunicorn.conf.py),
+so every worker inherits the loaded modules and models copy-on-write instead of
+paying the import + model loading cost on its first request.
+This includes the numba JIT code of UMAP, compiled by a tiny fit: a worker
+(forked or recycled) never compiles on a user request. Functions numba can
+cache on disk (settings.NUMBA_CACHE_DIR) also make the next master start faster.
+"""
+import os
+import time
+
+
+def _import_umap():
+    import umap  # noqa: F401  (pulls in numba, the slowest import)
+
+
+def _compile_umap():
+    import numpy as np
+    from . import services
+    # Above PCA_DIMENSIONS words and dimensions: the PCA + UMAP path of real galaxies
+    vectors = np.random.default_rng(0).normal(size=(services.PCA_DIMENSIONS + 10, 300))
+    services.get_3d_coordinates(vectors, method='umap', n_epochs=10)
+
+
+def _import_tltk():
+    import tltk  # noqa: F401  (loads its romanization/POS data at import)
+
+
+def _load_tokenizers():
+    from pythainlp.tokenize import word_tokenize, syllable_tokenize
+    # The dictionaries are only built on first call
+    word_tokenize("สวัสดี", engine="newmm")
+    syllable_tokenize("สวัสดี")
+
+
+def _load_thai_model():
+    from . import services
+    services.get_thai_model()
+
+
+def _load_thai_word_set():
+    from . import services
+    services.get_thai_word_set()
+
+
+def _load_compound_table():
+    from . import services
+    services.get_compound_table()
+
+
+PRELOAD_STEPS = [
+    ("import umap", _import_umap),
+    ("umap JIT compilation", _compile_umap),
+    ("import tltk", _import_tltk),
+    ("pythainlp tokenizers", _load_tokenizers),
+    ("thai2fit model", _load_thai_model),
+    ("thai word set", _load_thai_word_set),
+    ("compound table", _load_compound_table),
+]
+
+
+def preload(log=print):
+    """
+    Run every preload step and report how long each one took.
+    A failing step is reported and skipped: the resource is then loaded lazily
+    by services.py on first use, as before.
+    Returns a dict mapping step name -> seconds (None if the step failed).
+    """
+    timings = {}
+    total_start = time.perf_counter()
+    log(f"Numba cache directory: {os.environ.get('NUMBA_CACHE_DIR', 'default (__pycache__)')}")
+    for name, step in PRELOAD_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+            timings[name] = time.perf_counter() - start
+            log(f"Preloaded {name} in {timings[name]:.2f}s")
+        except Exception as e:
+            timings[name] = None
+            log(f"Preload of {name} failed: {e}")
+    log(f"Warm-up finished in {time.perf_counter() - total_start:.2f}s")
+    return timings
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vocab_project.settings')
+# Under ASGI the LLM-bound endpoints are served by their async views
+os.environ.setdefault('ASYNC_LLM_VIEWS', 'True')
+# No persistent database connections by default (see DATABASES in settings.py)
+os.environ['SERVED_BY_ASGI'] = 'True'
 
 application = get_asgi_application()